@@ -4,9 +4,9 @@ __all__ = ["Annotation", "AnnotationResult"]
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from ..execution import is_complexity_tracing_enabled, MemoryFootprint
+from ..execution import CaptureFilter, is_complexity_tracing_enabled, MemoryFootprint
 
 
 _TRACKED_ANNOTATIONS = []
@@ -127,6 +127,58 @@ class Annotation(ABC):
         """
         ... # pragma: no cover
 
+    def _update_capture_filter(self, capture_filter: CaptureFilter) -> None:
+        """
+        Widen a capture filter so that it accepts any value that could satisfy this annotation.
+
+        Annotations that don't override this method accept all values, including those seen on
+        lines of student code.
+
+        Args:
+            capture_filter (:py:class:`pybryt.execution.capture_filter.CaptureFilter`): the filter
+                to update
+        """
+        capture_filter.accept_all = True
+        capture_filter.track_lines = True
+
+    def _get_online_checks(self) -> Optional[List[Callable[[MemoryFootprint, int], bool]]]:
+        """
+        Return the checks used to decide the result of this annotation while values are being
+        traced (see :py:class:`OnlineChecker<pybryt.execution.online.OnlineChecker>`).
+
+        Each check takes the memory footprint and the index of the value that was just added to it
+        and returns whether its part of the result is decided, i.e. can no longer change as more
+        values are added. The result of an annotation is decided once the results of all of its
+        children are, so by default the checks of the children are returned. Annotations without
+        children return ``None`` unless they override this method, meaning that their results can't
+        be decided before tracing finishes.
+
+        Returns:
+            ``list[callable[[MemoryFootprint, int], bool]]`` or ``None``: the checks
+        """
+        if not self.children:
+            return None
+
+        checks = []
+        for ann in self.children:
+            ann_checks = ann._get_online_checks()
+            if ann_checks is None:
+                return None
+            checks.extend(ann_checks)
+
+        return checks
+
+    def _precompute(self) -> None:
+        """
+        Compute the parts of checking this annotation that don't depend on the memory footprint,
+        so that they're stored with the annotation when it's pickled (see
+        :py:meth:`ReferenceImplementation.precompute<pybryt.ReferenceImplementation.precompute>`).
+
+        By default, the children of this annotation are precomputed.
+        """
+        for ann in self.children:
+            ann._precompute()
+
     def __eq__(self, other: Any) -> bool:
         """
         Checks whether this annotation is equal to another object.
@@ -5,8 +5,9 @@ __all__ = ["Collection"]
 from typing import Any, Dict, List, Tuple
 
 from .annotation import Annotation, AnnotationResult
+from .context import check_annotations
 
-from ..execution import MemoryFootprint
+from ..execution import CaptureFilter, MemoryFootprint
 
 
 class Collection(Annotation):
@@ -48,6 +49,10 @@ class Collection(Annotation):
         """
         return self._annotations
 
+    def _update_capture_filter(self, capture_filter: CaptureFilter) -> None:
+        for ann in self._annotations:
+            ann._update_capture_filter(capture_filter)
+
     def __eq__(self, other: Any) -> bool:
         """
         Checks whether this annotation is equal to another object.
@@ -77,9 +82,8 @@ class Collection(Annotation):
         Returns:
             :py:class:`AnnotationResult`: the results of this annotation against ``footprint``
         """
-        results = []
-        for ann in self.children:
-            results.append(ann.check(footprint))
+        # the annotation isn't satisfied if any child isn't
+        results = check_annotations(self.children, footprint, lambda res: not res.satisfied)
         
         if self.enforce_order and all(res.satisfied for res in results):
                 before = []
@@ -8,7 +8,7 @@ from . import complexities as cplx
 
 from ..annotation import Annotation, AnnotationResult
 
-from ...execution import MemoryFootprint, TimeComplexityResult
+from ...execution import CaptureFilter, MemoryFootprint, TimeComplexityResult
 
 
 EPS = 1e-6 # a value to set a slight preference for simpler methods
@@ -60,6 +60,9 @@ class ComplexityAnnotation(Annotation):
         children, an empty list.
         """
         return []
+
+    def _update_capture_filter(self, capture_filter: CaptureFilter) -> None:
+        pass  # TimeComplexityResult objects are always accepted by capture filters
     
     def __eq__(self, other: Any) -> bool:
         """
@@ -113,7 +116,8 @@ class TimeComplexity(ComplexityAnnotation):
             self.addl_complexities.insert(0, self.complexity)
 
         complexity_data = {}
-        for mfp_val in footprint:
+        for index in footprint.get_indices_of_type(TimeComplexityResult):
+            mfp_val = footprint.get_value(index)
             if not isinstance(mfp_val.value, TimeComplexityResult) or mfp_val.value.name != self.name:
                 continue
 
@@ -0,0 +1,287 @@
+"""State shared by the annotations checked against a memory footprint"""
+
+__all__ = [
+    "check_annotation", "check_annotations", "CheckContext", "check_context", "get_check_context",
+    "resolve_placeholders"]
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .annotation import Annotation, AnnotationResult
+
+from ..execution import MemoryFootprint
+
+
+# each thread (and asyncio task) has its own active context
+_CHECK_CONTEXT: ContextVar[Optional["CheckContext"]] = ContextVar("_CHECK_CONTEXT", default=None)
+
+
+class CheckContext:
+    """
+    State shared by all of the annotations checked against a single memory footprint, like the
+    values produced by applying invariants to the footprint's values and the results of the
+    annotations that have already been checked.
+
+    Contexts are created with :py:func:`check_context` and are only active during the run that
+    created them. Placeholders for the results of annotations skipped in short-circuit mode keep
+    their context, and with it the footprint, alive until they're resolved (see
+    :py:func:`resolve_placeholders`).
+
+    Args:
+        footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the memory
+            footprint being checked
+    """
+
+    footprint: MemoryFootprint
+    """the memory footprint being checked"""
+
+    short_circuit: bool
+    """
+    whether annotations stop checking their children once their results are decided (see
+    :py:func:`check_annotations`)
+    """
+
+    _invariant_values: Dict[Tuple[int, Tuple[type, ...]], List[Any]]
+    """the values produced by applying chains of invariants to values in the footprint"""
+
+    _results: Dict[int, Tuple[Annotation, AnnotationResult]]
+    """the annotations that have been checked and their results, keyed by the annotations' IDs"""
+
+    def __init__(self, footprint: MemoryFootprint):
+        self.footprint = footprint
+        self.short_circuit = False
+        self._invariant_values = {}
+        self._results = {}
+
+    def check(self, annotation: Annotation) -> AnnotationResult:
+        """
+        Check an annotation against the footprint, reusing its result if it has already been
+        checked in this context.
+
+        Annotations are identified by identity rather than equality, so an annotation that is a
+        child of several others (e.g. of several :py:class:`BeforeAnnotation<pybryt.BeforeAnnotation>`
+        objects created with :py:meth:`Annotation.before<pybryt.Annotation.before>`) is checked
+        once and its result is shared by its parents.
+
+        Args:
+            annotation (:py:class:`Annotation<pybryt.Annotation>`): the annotation
+
+        Returns:
+            :py:class:`AnnotationResult<pybryt.AnnotationResult>`: the result of the annotation
+        """
+        # the annotation is stored with its result so that its ID can't be reused
+        cached = self._results.get(id(annotation))
+        if cached is not None:
+            return cached[1]
+
+        result = annotation.check(self.footprint)
+        self._results[id(annotation)] = (annotation, result)
+        return result
+
+    def apply_invariants(self, index: int, invariants: List[type]) -> List[Any]:
+        """
+        Apply a chain of invariants to the value at an index of the footprint.
+
+        The values produced by each prefix of the chain are cached, so annotations whose invariants
+        start with the same chain share the work of applying them.
+
+        Args:
+            index (``int``): the index of the value in the footprint
+            invariants (``list[type]``): the invariants, in the order they're applied
+
+        Returns:
+            ``list[object]``: the values considered equal to the value under the invariants
+        """
+        key = (index, tuple(invariants))
+        values = self._invariant_values.get(key)
+        if values is not None:
+            return values
+
+        if invariants:
+            values = invariants[-1](self.apply_invariants(index, invariants[:-1]))
+        else:
+            values = [self.footprint.get_value(index).value]
+
+        self._invariant_values[key] = values
+        return values
+
+
+def get_check_context(footprint: MemoryFootprint) -> Optional[CheckContext]:
+    """
+    Get the active check context for a memory footprint.
+
+    Args:
+        footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the memory
+            footprint being checked
+
+    Returns:
+        :py:class:`CheckContext` or ``None``: the active context, or ``None`` if there is no active
+        context for the footprint
+    """
+    context = _CHECK_CONTEXT.get()
+    if context is not None and context.footprint is footprint:
+        return context
+    return None
+
+
+def check_annotation(annotation: Annotation, footprint: MemoryFootprint) -> AnnotationResult:
+    """
+    Check an annotation against a memory footprint, reusing its result if it has already been
+    checked in the active check context for the footprint (see :py:meth:`CheckContext.check`).
+
+    Args:
+        annotation (:py:class:`Annotation<pybryt.Annotation>`): the annotation
+        footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the memory
+            footprint to check against
+
+    Returns:
+        :py:class:`AnnotationResult<pybryt.AnnotationResult>`: the result of the annotation
+    """
+    context = get_check_context(footprint)
+    if context is None:
+        return annotation.check(footprint)
+    return context.check(annotation)
+
+
+def check_annotations(
+    annotations: List[Annotation],
+    footprint: MemoryFootprint,
+    decides: Callable[[AnnotationResult], bool],
+) -> List[AnnotationResult]:
+    """
+    Check the children of an annotation against a memory footprint in order (see
+    :py:func:`check_annotation`).
+
+    If the active check context for the footprint is in short-circuit mode, the children after the
+    first whose result decides the result of their parent aren't checked. Placeholder results that
+    check them the first time they're accessed (e.g. to generate messages for a report) are returned
+    for them instead. Parents must determine whether they're satisfied without accessing these
+    placeholders.
+
+    Args:
+        annotations (``list[Annotation]``): the child annotations
+        footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the memory
+            footprint to check against
+        decides (``callable[[AnnotationResult], bool]``): whether the result of a child decides the
+            result of the parent
+
+    Returns:
+        ``list[AnnotationResult]``: the results of the children
+    """
+    context = get_check_context(footprint)
+    results = []
+    for i, ann in enumerate(annotations):
+        result = check_annotation(ann, footprint)
+        results.append(result)
+        if context is not None and context.short_circuit and decides(result):
+            results.extend(_LazyAnnotationResult(a, context) for a in annotations[i + 1:])
+            break
+
+    return results
+
+
+@contextmanager
+def check_context(footprint: MemoryFootprint) -> Iterator[CheckContext]:
+    """
+    A context in which annotations checked against a memory footprint share a
+    :py:class:`CheckContext`.
+
+    If a context for the same footprint is already active, it is reused; otherwise, the previous
+    context is restored when this one exits, and the values produced by applying invariants are
+    discarded. Contexts are only active in the thread (or asyncio task) that created them.
+
+    Args:
+        footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the memory
+            footprint being checked
+
+    Yields:
+        :py:class:`CheckContext`: the active context
+    """
+    context = get_check_context(footprint)
+    if context is not None:
+        yield context
+        return
+
+    context = CheckContext(footprint)
+    token = _CHECK_CONTEXT.set(context)
+    try:
+        yield context
+    finally:
+        _CHECK_CONTEXT.reset(token)
+
+        # placeholders created in short-circuit mode keep the context alive, but the values
+        # produced by invariants are only worth keeping while the context is active
+        context._invariant_values.clear()
+
+
+def resolve_placeholders(results: List[AnnotationResult]) -> List[AnnotationResult]:
+    """
+    Replace the placeholders for the results of annotations skipped in short-circuit mode (see
+    :py:func:`check_annotations`) in a list of results and their children with the results they
+    stand in for, checking the annotations if they haven't been checked.
+
+    Placeholders keep the context they were created in, and with it the memory footprint, alive;
+    resolved results don't.
+
+    Args:
+        results (``list[AnnotationResult]``): the results
+
+    Returns:
+        ``list[AnnotationResult]``: the results, with their placeholders replaced
+    """
+    resolved = set()
+
+    def resolve(result: AnnotationResult) -> AnnotationResult:
+        if isinstance(result, _LazyAnnotationResult):
+            result = result._get_result()
+        if id(result) not in resolved:
+            resolved.add(id(result))
+            if result.children:
+                result.children = [resolve(c) for c in result.children]
+        return result
+
+    return [resolve(r) for r in results]
+
+
+class _LazyAnnotationResult(AnnotationResult):
+    """
+    A placeholder for the result of an annotation that was skipped in short-circuit mode (see
+    :py:func:`check_annotations`), which checks the annotation the first time any of its fields are
+    accessed. Placeholders are pickled as the results they stand in for.
+
+    Args:
+        annotation (:py:class:`Annotation<pybryt.Annotation>`): the annotation that was skipped
+        context (:py:class:`CheckContext`): the context the annotation was skipped in
+    """
+
+    _context: CheckContext
+    """the context the annotation was skipped in"""
+
+    _result: Optional[AnnotationResult]
+    """the result of the annotation, if it has been checked"""
+
+    def __init__(self, annotation: Annotation, context: CheckContext):
+        self.annotation = annotation
+        self._context = context
+        self._result = None
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for the fields of the result, which aren't set on placeholders
+        if name.startswith("__") or name in {"annotation", "_context", "_result"}:
+            raise AttributeError(name)
+        return getattr(self._get_result(), name)
+
+    def __reduce__(self):
+        return self._get_result().__reduce__()
+
+    def _get_result(self) -> AnnotationResult:
+        """
+        Get the result of the annotation, checking it if it hasn't been checked.
+
+        Returns:
+            :py:class:`AnnotationResult<pybryt.AnnotationResult>`: the result
+        """
+        if self._result is None:
+            self._result = self._context.check(self.annotation)
+        return self._result
@@ -6,11 +6,11 @@ import importlib
 import sys
 
 from abc import abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 
 from .annotation import Annotation, AnnotationResult
 
-from ..execution import MemoryFootprint
+from ..execution import CaptureFilter, MemoryFootprint
 
 
 class ImportAnnotation(Annotation):
@@ -50,6 +50,16 @@ class ImportAnnotation(Annotation):
     def children(self) -> List[Annotation]:
         return []
 
+    def _update_capture_filter(self, capture_filter: CaptureFilter) -> None:
+        # imports are detected from the modules of the values referenced by lines of student code,
+        # whether or not the capture filter accepts those values
+        capture_filter.track_lines = True
+
+    def _get_online_checks(self) -> List[Callable[[MemoryFootprint, int], bool]]:
+        # modules are never removed from the footprint's imports, so the result is decided once
+        # the module is imported
+        return [lambda footprint, index: self.module in footprint.imports]
+
     @abstractmethod
     def check(self, footprint: MemoryFootprint) -> AnnotationResult:
         ... # pragma: no cover
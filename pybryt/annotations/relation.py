@@ -9,8 +9,9 @@ from abc import abstractmethod
 from typing import Any, Dict, List, Tuple
 
 from .annotation import Annotation, AnnotationResult
+from .context import check_annotation, check_annotations
 
-from ..execution import MemoryFootprint
+from ..execution import CaptureFilter, MemoryFootprint
 
 
 class RelationalAnnotation(Annotation):
@@ -47,6 +48,10 @@ class RelationalAnnotation(Annotation):
         """
         return self._annotations
 
+    def _update_capture_filter(self, capture_filter: CaptureFilter) -> None:
+        for ann in self._annotations:
+            ann._update_capture_filter(capture_filter)
+
     def __eq__(self, other: Any) -> bool:
         """
         Checks whether this annotation is equal to another object.
@@ -97,9 +102,8 @@ class BeforeAnnotation(RelationalAnnotation):
         Returns:
             :py:class:`AnnotationResult`: the results of this annotation against ``footprint``
         """
-        results = []
-        for ann in self._annotations:
-            results.append(ann.check(footprint))
+        # the annotation isn't satisfied if any child isn't
+        results = check_annotations(self._annotations, footprint, lambda res: not res.satisfied)
 
         if all(res.satisfied for res in results):
             before = []
@@ -134,9 +138,8 @@ class AndAnnotation(RelationalAnnotation):
         Returns:
             :py:class:`AnnotationResult`: the results of this annotation against ``footprint``
         """
-        results = []
-        for ann in self._annotations:
-            results.append(ann.check(footprint))
+        # the annotation isn't satisfied if any child isn't
+        results = check_annotations(self._annotations, footprint, lambda res: not res.satisfied)
 
         return AnnotationResult(all(res.satisfied for res in results), self, children = results)
 
@@ -163,9 +166,8 @@ class OrAnnotation(RelationalAnnotation):
         Returns:
             :py:class:`AnnotationResult`: the results of this annotation against ``footprint``
         """
-        results = []
-        for ann in self._annotations:
-            results.append(ann.check(footprint))
+        # the annotation is satisfied if any child is
+        results = check_annotations(self._annotations, footprint, lambda res: res.satisfied)
 
         return AnnotationResult(any(res.satisfied for res in results), self, children = results)
 
@@ -198,7 +200,7 @@ class XorAnnotation(RelationalAnnotation):
         """
         results = []
         for ann in self._annotations:
-            results.append(ann.check(footprint))
+            results.append(check_annotation(ann, footprint))
 
         sats = [res.satisfied for res in results]
         return AnnotationResult(sats[0] ^ sats[1], self, children = results)
@@ -228,6 +230,6 @@ class NotAnnotation(RelationalAnnotation):
         """
         results = []
         for ann in self._annotations:
-            results.append(ann.check(footprint))
+            results.append(check_annotation(ann, footprint))
 
         return AnnotationResult(all(not res.satisfied for res in results), self, children = results)
@@ -4,11 +4,11 @@ __all__ = ["ForbidType"]
 
 import dill
 
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
 from .annotation import Annotation, AnnotationResult
 
-from ..execution import MemoryFootprint
+from ..execution import CaptureFilter, MemoryFootprint
 
 
 class ForbidType(Annotation):
@@ -45,6 +45,14 @@ class ForbidType(Annotation):
     def children(self) -> List[Annotation]:
         return []
 
+    def _update_capture_filter(self, capture_filter: CaptureFilter) -> None:
+        capture_filter.track_lines = True
+        capture_filter.accept_instances_of(self.type_)
+
+    def _get_online_checks(self) -> List[Callable[[MemoryFootprint, int], bool]]:
+        # decided (as unsatisfied) once a value of the forbidden type is seen
+        return [lambda footprint, index: isinstance(footprint.get_value(index).value, self.type_)]
+
     def check(self, footprint: MemoryFootprint) -> AnnotationResult:
         """
         Checks that there are no values of type ``self.type_`` in the memory footprint.
@@ -56,8 +64,8 @@ class ForbidType(Annotation):
         Returns:
             :py:class:`AnnotationResult`: the results of this annotation against ``footprint``
         """
-        for mfp_val in footprint:
-            if isinstance(mfp_val.value, self.type_):
+        for index in footprint.get_indices_of_type(self.type_):
+            if isinstance(footprint.get_value(index).value, self.type_):
                 return AnnotationResult(False, self)
         return AnnotationResult(True, self)
 
@@ -3,21 +3,347 @@
 __all__ = ["Value", "Attribute", "ReturnValue"]
 
 import dill
+import math
 import numbers
 import numpy as np
 import pandas as pd
 
+from bisect import bisect_left
 from collections.abc import Iterable, Sized
 from copy import copy
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 from .annotation import Annotation, AnnotationResult
+from .context import check_annotation, get_check_context
 from .initial_condition import InitialCondition
 from .invariants import invariant
 from .structural import _StructuralPattern
 
 from ..debug import _debug_mode_enabled
-from ..execution import Event, MemoryFootprint, MemoryFootprintValue
+from ..execution import CaptureFilter, Event, MemoryFootprint, MemoryFootprintValue
+from ..execution.memory_footprint import REAL_SCALAR_TYPES
+from ..utils import fingerprint, get_type_name, UnpickleableError
+
+
+# types whose equal instances always have the same fingerprint
+_FINGERPRINT_EXACT_TYPES = (type(None), bool, int, str, bytes)
+
+_REAL_SCALAR_TYPE_NAMES = frozenset(get_type_name(t) for t in REAL_SCALAR_TYPES)
+
+_NDARRAY_TYPE_NAME = get_type_name(np.ndarray)
+
+# the kinds of the dtypes of arrays that are compared numerically
+_NUMERIC_DTYPE_KINDS = "biuf"
+
+# the largest magnitude of the integers that can all be represented exactly as floats
+_MAX_EXACT_INTEGER = 2 ** 53
+
+
+def _get_tolerance_bounds(
+    value: Any,
+    atol: Optional[Union[float, int]],
+    rtol: Optional[Union[float, int]],
+) -> Tuple[Any, Any]:
+    """
+    Compute the lower and upper bounds of the values within the tolerances of a value as
+    :py:meth:`Value.check_values_equal` does, raising any error raised by the arithmetic.
+    """
+    atol = 0 if atol is None else atol
+    rtol = 0 if rtol is None else rtol
+    ub, lb = value + atol, value - atol
+    ub += rtol * np.abs(value)
+    lb -= rtol * np.abs(value)
+    return lb, ub
+
+
+def _compile_generic_comparator(
+    value: Any,
+    atol: Optional[Union[float, int]],
+    rtol: Optional[Union[float, int]],
+    equivalence_fn: Optional[Callable[[Any, Any], bool]] = None,
+) -> Callable[[Any], bool]:
+    return lambda other_value: \
+        Value.check_values_equal(value, other_value, atol, rtol, equivalence_fn)
+
+
+def _compile_none_comparator(value: None, atol: Any, rtol: Any) -> Callable[[Any], bool]:
+    return lambda other_value: other_value is None
+
+
+def _compile_str_comparator(value: str, atol: Any, rtol: Any) -> Callable[[Any], bool]:
+    generic = _compile_generic_comparator(value, atol, rtol)
+
+    def compare(other_value: Any) -> bool:
+        if type(other_value) is str:
+            return value == other_value
+        return generic(other_value)
+
+    return compare
+
+
+def _compile_scalar_comparator(value: Any, atol: Any, rtol: Any) -> Callable[[Any], bool]:
+    generic = _compile_generic_comparator(value, atol, rtol)
+    try:
+        lb, ub = _get_tolerance_bounds(value, atol, rtol)
+    except Exception:
+        return generic
+
+    # NumPy scalars have shapes, so they can only equal values that also have shapes
+    requires_shape = hasattr(value, "shape")
+
+    def compare(other_value: Any) -> bool:
+        if type(other_value) in _REAL_SCALAR_TYPE_SET:
+            if requires_shape and not hasattr(other_value, "shape"):
+                return False
+            return bool(ub >= other_value and other_value >= lb)
+        return generic(other_value)
+
+    return compare
+
+
+def _get_exact_floats(seq: Any) -> Optional[List[float]]:
+    """
+    Convert the elements of a sequence to floats if they're all floats or integers that can be
+    represented exactly as floats, returning ``None`` otherwise.
+    """
+    floats = []
+    for i in seq:
+        t = type(i)
+        if t is float or (t is int and -_MAX_EXACT_INTEGER <= i <= _MAX_EXACT_INTEGER):
+            floats.append(float(i))
+        else:
+            return None
+    return floats
+
+
+def _isclose(x: float, y: float, atol: Union[float, int], rtol: Union[float, int]) -> bool:
+    """
+    Check whether two floats are close as ``numpy.isclose`` does.
+    """
+    if math.isfinite(x) and math.isfinite(y):
+        return abs(x - y) <= atol + rtol * abs(y)
+    return x == y
+
+
+def _compile_sequence_comparator(value: Any, atol: Any, rtol: Any) -> Callable[[Any], bool]:
+    generic = _compile_generic_comparator(value, atol, rtol)
+    atol = 0 if atol is None else atol
+    rtol = 0 if rtol is None else rtol
+    numeric = len(value) > 0 and all(isinstance(i, numbers.Real) for i in value)
+
+    # sequences of floats of the same length can be compared without creating arrays as long as
+    # the arithmetic is done with Python floats
+    floats = None
+    if numeric and type(atol) in (int, float) and type(rtol) in (int, float):
+        floats = _get_exact_floats(value)
+
+    def compare(other_value: Any) -> bool:
+        if type(other_value) not in (list, tuple):
+            return generic(other_value)
+
+        if floats is not None and len(other_value) == len(floats):
+            other_floats = _get_exact_floats(other_value)
+            if other_floats is not None:
+                return all(_isclose(x, y, atol, rtol) for x, y in zip(floats, other_floats))
+
+        if numeric:
+            try:
+                return bool(np.allclose(value, other_value, atol=atol, rtol=rtol))
+            except (ValueError, TypeError):
+                pass
+
+        try:
+            return bool(value == other_value)
+        except:
+            if _debug_mode_enabled():
+                raise
+            return False
+
+    return compare
+
+
+def _compile_array_comparator(value: np.ndarray, atol: Any, rtol: Any) -> Callable[[Any], bool]:
+    generic = _compile_generic_comparator(value, atol, rtol)
+    if value.dtype.kind not in _NUMERIC_DTYPE_KINDS:
+        return generic
+
+    try:
+        lb, ub = _get_tolerance_bounds(value, atol, rtol)
+    except Exception:
+        return generic
+
+    def compare(other_value: Any) -> bool:
+        if type(other_value) is not np.ndarray:
+            return generic(other_value)
+
+        if other_value.shape != value.shape:
+            return False
+
+        try:
+            res = np.logical_and(ub >= other_value, other_value >= lb)
+        except (ValueError, TypeError):
+            return False
+
+        if isinstance(res, np.ndarray):
+            res = res.all(axis=None)
+        return bool(res)
+
+    return compare
+
+
+_REAL_SCALAR_TYPE_SET = frozenset(REAL_SCALAR_TYPES)
+
+_COMPARATOR_COMPILERS: Dict[type, Callable[[Any, Any, Any], Callable[[Any], bool]]] = {
+    type(None): _compile_none_comparator,
+    str: _compile_str_comparator,
+    list: _compile_sequence_comparator,
+    tuple: _compile_sequence_comparator,
+    np.ndarray: _compile_array_comparator,
+    **dict.fromkeys(REAL_SCALAR_TYPES, _compile_scalar_comparator),
+}
+
+
+def _compile_comparator(
+    value: Any,
+    atol: Optional[Union[float, int]] = None,
+    rtol: Optional[Union[float, int]] = None,
+    equivalence_fn: Optional[Callable[[Any, Any], bool]] = None,
+) -> Callable[[Any], bool]:
+    """
+    Compile a function that checks whether an observed value is equal to ``value`` with the same
+    result as :py:meth:`Value.check_values_equal`.
+
+    The comparator is specialized using the compiler registered for the exact type of ``value``,
+    which decides how the value is compared and computes its tolerance bounds once. Comparators
+    fall back to :py:meth:`Value.check_values_equal` for observed values of types they don't
+    specialize, as do the comparators of values of other types and of custom equivalence
+    functions.
+    """
+    if equivalence_fn is not None:
+        return _compile_generic_comparator(value, atol, rtol, equivalence_fn)
+
+    compiler = _COMPARATOR_COMPILERS.get(type(value))
+    if compiler is None:
+        return _compile_generic_comparator(value, atol, rtol)
+
+    return compiler(value, atol, rtol)
+
+
+class _CompiledValue:
+    """
+    The parts of checking a :py:class:`Value` against a memory footprint that don't depend on the
+    footprint.
+
+    Compiled values are pickled with their annotations, so references that are precomputed (see
+    :py:meth:`ReferenceImplementation.precompute<pybryt.ReferenceImplementation.precompute>`)
+    don't redo this work when they're loaded. Comparators are closures, so they aren't pickled and
+    are compiled from :py:attr:`values` the first time they're needed.
+    """
+
+    value: Any
+    """the expected value this was compiled for"""
+
+    settings: Tuple[Any, ...]
+    """the tolerances, equivalence function, and invariants this was compiled with"""
+
+    capture_filter: CaptureFilter
+    """a filter accepting the types of values that could satisfy the annotation"""
+
+    compares_values: bool
+    """
+    whether observed values are compared to the expected value directly, i.e. whether the
+    annotation has no invariants, equivalence function, initial condition, or structural pattern
+    """
+
+    values: Optional[List[Any]]
+    """
+    the values produced by applying the invariants to the expected value, or ``None`` if the
+    expected value is an initial condition
+    """
+
+    fingerprint: Optional[str]
+    """
+    the fingerprint of the expected value, or ``None`` if it isn't looked up by fingerprint
+    """
+
+    tolerance_bounds: Optional[Tuple[Any, Any]]
+    """
+    the bounds of the values within the tolerances of a numeric expected value, or ``None`` if
+    they aren't used to look up candidates or haven't been computed (see
+    :py:meth:`get_tolerance_bounds`)
+    """
+
+    has_array_bounds: bool
+    """
+    whether the expected value is a numeric array whose tolerance bounds are used to look up
+    candidates; these bounds are as large as the array, so they're computed when they're first
+    needed and aren't pickled
+    """
+
+    _comparators: Optional[List[Callable[[Any], bool]]]
+    """the comparators for :py:attr:`values`"""
+
+    def __init__(
+        self,
+        value: Any,
+        settings: Tuple[Any, ...],
+        capture_filter: CaptureFilter,
+        compares_values: bool,
+        values: Optional[List[Any]],
+        fingerprint: Optional[str],
+        tolerance_bounds: Optional[Tuple[Any, Any]],
+        has_array_bounds: bool = False,
+    ):
+        self.value = value
+        self.settings = settings
+        self.capture_filter = capture_filter
+        self.compares_values = compares_values
+        self.values = values
+        self.fingerprint = fingerprint
+        self.tolerance_bounds = tolerance_bounds
+        self.has_array_bounds = has_array_bounds
+        self._comparators = None
+
+    def get_comparators(self) -> List[Callable[[Any], bool]]:
+        """
+        Get the comparators for :py:attr:`values`, compiling them if needed.
+
+        Returns:
+            ``list[callable[[object], bool]]``: the comparators
+        """
+        if self._comparators is None:
+            atol, rtol, equivalence_fn, _ = self.settings
+            self._comparators = [
+                _compile_comparator(v, atol, rtol, equivalence_fn) for v in self.values]
+        return self._comparators
+
+    def get_tolerance_bounds(self) -> Optional[Tuple[Any, Any]]:
+        """
+        Get :py:attr:`tolerance_bounds`, computing the bounds of an array if needed. Without
+        tolerances, the bounds of an array are the array itself.
+
+        Returns:
+            ``tuple[object, object]`` or ``None``: the lower and upper bounds, or ``None`` if they
+            aren't used to look up candidates
+        """
+        if self.tolerance_bounds is None and self.has_array_bounds:
+            atol, rtol, _, _ = self.settings
+            if atol is None and rtol is None:
+                self.tolerance_bounds = (self.value, self.value)
+            else:
+                try:
+                    self.tolerance_bounds = _get_tolerance_bounds(self.value, atol, rtol)
+                except Exception:
+                    self.has_array_bounds = False
+
+        return self.tolerance_bounds
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_comparators"] = None
+        if self.has_array_bounds:
+            state["tolerance_bounds"] = None
+        return state
 
 
 class Value(Annotation):
@@ -63,6 +389,13 @@ class Value(Annotation):
     otherwise
     """
 
+    _compiled: Optional[_CompiledValue]
+    """the parts of checking this annotation that don't depend on the memory footprint"""
+
+    _TRACKS_LINES = True
+
+    _VALID_EVENTS: Optional[Set[Event]] = None
+
     def __init__(
         self, 
         value: Any, 
@@ -85,6 +418,7 @@ class Value(Annotation):
         self.rtol = rtol
         self.invariants = invariants
         self.equivalence_fn = equivalence_fn
+        self._compiled = None
 
         # check that there aren't any issues applying the invariants
         if not self._tracking_initial_condition:
@@ -96,6 +430,50 @@ class Value(Annotation):
     def children(self) -> List[Annotation]:
         return []
 
+    def _update_capture_filter(self, capture_filter: CaptureFilter) -> None:
+        if type(self)._TRACKS_LINES:
+            capture_filter.track_lines = True
+
+        # invariants and custom equivalence functions can make values of any type equal
+        if self.invariants or self.equivalence_fn is not None or \
+                self._tracking_initial_condition or isinstance(self.value, _StructuralPattern):
+            capture_filter.accept_all = True
+        else:
+            capture_filter.accept_value(self.value)
+
+    def _get_online_checks(self) -> Optional[List[Callable[[MemoryFootprint, int], bool]]]:
+        # initial conditions can change after the value is captured
+        if self._tracking_initial_condition:
+            return None
+
+        satisfier = None
+
+        def check_value(footprint: MemoryFootprint, index: int) -> bool:
+            """
+            Check whether the value at ``index`` is the first value that satisfies this annotation.
+            """
+            nonlocal satisfier
+            mfp_val = footprint.get_value(index)
+            if satisfier is None and self._check_online_value(mfp_val.value):
+                satisfier = index
+
+            valid_events = type(self)._VALID_EVENTS
+            return satisfier == index and (valid_events is None or mfp_val.event in valid_events)
+
+        return [check_value]
+
+    def _check_online_value(self, observed_value: Any) -> bool:
+        """
+        Check whether a value captured during tracing satisfies this annotation.
+
+        Args:
+            observed_value (``object``): the observed value
+
+        Returns:
+            ``bool``: whether the value matched
+        """
+        return self._check_observed_value(self.value, observed_value)
+
     @property
     def _tracking_initial_condition(self) -> bool:
         """
@@ -138,6 +516,27 @@ class Value(Annotation):
             values = inv(values)
         return values
 
+    def _apply_invariants_at(self, footprint: MemoryFootprint, index: int) -> List[Any]:
+        """
+        Apply the invariants on this annotation to the value at an index of a memory footprint.
+
+        If a :py:class:`CheckContext<pybryt.annotations.context.CheckContext>` is active for the
+        footprint, the values are cached in it so that other annotations with the same invariants
+        don't apply them again.
+
+        Args:
+            footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the
+                memory footprint
+            index (``int``): the index of the value
+
+        Returns:
+            ``list[object]``: the values considered equal to the value under the invariants
+        """
+        context = get_check_context(footprint)
+        if context is None or not self.invariants:
+            return self._apply_invariants(footprint.get_value(index).value)
+        return context.apply_invariants(index, self.invariants)
+
     def check(self, footprint: MemoryFootprint) -> AnnotationResult:
         """
         Checks that the value tracked by this annotation occurs in the memory footprint.
@@ -163,11 +562,155 @@ class Value(Annotation):
         Returns:
             ``int | None``: the index, or ``None`` if no value satisfies this annotation.
         """
+        compiled = self._get_compiled()
         expected_value = self.value
         if isinstance(expected_value, InitialCondition):
             expected_value = expected_value.supply_footprint(footprint)
-        satisfied = [self._check_observed_value(expected_value, mfp_val.value) for mfp_val in footprint]
-        return satisfied.index(True) if any(satisfied) else None
+
+        # only check values of types that could satisfy this annotation
+        capture_filter = compiled.capture_filter
+        accepts_type = capture_filter.accepts_type
+
+        match, indices = None, None
+        compares_values = compiled.compares_values
+
+        if compares_values and self.atol is None and self.rtol is None:
+            match = self._get_exact_match_index(footprint, expected_value, compiled.fingerprint)
+
+            # values of the same type as an exact match that aren't exact matches can only satisfy
+            # this annotation if they're approximately equal
+            expected_type = type(expected_value)
+            if expected_type in _FINGERPRINT_EXACT_TYPES and \
+                    footprint.are_fingerprints_indexed(expected_type):
+                name = get_type_name(expected_type)
+                accepts_type = lambda type_names: \
+                    type_names[0] != name and capture_filter.accepts_type(type_names)
+
+        tolerance_bounds = compiled.get_tolerance_bounds()
+        if tolerance_bounds is not None and type(expected_value) is np.ndarray:
+            indices = self._get_indices_of_close_arrays(
+                footprint, expected_value, tolerance_bounds, accepts_type)
+
+        elif tolerance_bounds is not None:
+            indices = self._get_indices_within_tolerance(
+                footprint, tolerance_bounds, accepts_type)
+
+        if indices is None:
+            indices = footprint.get_indices_by_type(accepts_type)
+
+        # an exact match satisfies this annotation unless an earlier value does
+        if match is not None:
+            indices = indices[:bisect_left(indices, match)]
+
+        for index in indices:
+            if self._check_observed_values(
+                    expected_value, self._apply_invariants_at(footprint, index)):
+                return index
+
+        return match
+
+    def _get_exact_match_index(
+        self,
+        footprint: MemoryFootprint,
+        expected_value: Any,
+        h: Optional[str],
+    ) -> Optional[int]:
+        """
+        Look up the index of the first value in the memory footprint with the same fingerprint as
+        the expected value, if it satisfies this annotation.
+
+        Args:
+            footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the
+                memory footprint to check against
+            expected_value (``object``): the expected value
+            h (``str | None``): the fingerprint of the expected value, or ``None`` if it couldn't
+                be fingerprinted
+
+        Returns:
+            ``int | None``: the index, or ``None`` if no such value satisfies this annotation
+        """
+        if h is None:
+            return None
+
+        match = footprint.get_index_of_fingerprint(h)
+        if match is None or \
+                not self._check_observed_values(
+                    expected_value, self._apply_invariants_at(footprint, match)):
+            return None
+
+        return match
+
+    def _get_indices_of_close_arrays(
+        self,
+        footprint: MemoryFootprint,
+        expected_value: np.ndarray,
+        tolerance_bounds: Tuple[np.ndarray, np.ndarray],
+        accepts_type: Callable[[Tuple[str, ...]], bool],
+    ) -> List[int]:
+        """
+        Get the indices of the values in the memory footprint that could be within the tolerances of
+        an expected array: the first array within the tolerances, which is found by comparing the
+        expected array to the footprint's stacks of arrays with the same shape (see
+        :py:meth:`MemoryFootprint.get_stacked_arrays<pybryt.execution.memory_footprint.MemoryFootprint.get_stacked_arrays>`),
+        and the earlier arrays that aren't stacked and values of other types accepted by
+        ``accepts_type``.
+
+        Args:
+            footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the
+                memory footprint to check against
+            expected_value (``numpy.ndarray``): the expected array
+            tolerance_bounds (``tuple[numpy.ndarray, numpy.ndarray]``): the lower and upper bounds
+                of the arrays within the tolerances of the expected array
+            accepts_type (``callable[[tuple[str]], bool]``): a predicate for the types of values
+                that could satisfy this annotation
+
+        Returns:
+            ``list[int]``: the indices in ascending order
+        """
+        lb, ub = tolerance_bounds
+        stacks, indices = footprint.get_stacked_arrays(expected_value.shape)
+        first = None
+        for stack, stack_indices in stacks:
+            within = np.logical_and(ub >= stack, stack >= lb).reshape(len(stack_indices), -1)
+            hits = np.flatnonzero(within.all(axis=1))
+            if len(hits) and (first is None or stack_indices[hits[0]] < first):
+                first = stack_indices[hits[0]]
+
+        indices.extend(footprint.get_indices_by_type(
+            lambda type_names: type_names[0] != _NDARRAY_TYPE_NAME and accepts_type(type_names)))
+        if first is not None:
+            indices = [i for i in indices if i < first] + [first]
+
+        return sorted(indices)
+
+    def _get_indices_within_tolerance(
+        self,
+        footprint: MemoryFootprint,
+        tolerance_bounds: Tuple[float, float],
+        accepts_type: Callable[[Tuple[str, ...]], bool],
+    ) -> List[int]:
+        """
+        Get the indices of the values in the memory footprint that could be within the tolerances of
+        a real scalar expected value: the real scalars within the tolerance bounds, which are found
+        with the footprint's sorted index of real scalars, and the values of other types accepted by
+        ``accepts_type``.
+
+        Args:
+            footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the
+                memory footprint to check against
+            tolerance_bounds (``tuple[float, float]``): the lower and upper bounds of the values
+                within the tolerances of the expected value
+            accepts_type (``callable[[tuple[str]], bool]``): a predicate for the types of values
+                that could satisfy this annotation
+
+        Returns:
+            ``list[int]``: the indices in ascending order
+        """
+        indices = footprint.get_indices_in_range(*tolerance_bounds)
+        indices.extend(footprint.get_indices_by_type(
+            lambda type_names: type_names[0] not in _REAL_SCALAR_TYPE_NAMES and \
+                accepts_type(type_names)))
+        return sorted(indices)
 
     def _generate_annotation_result(
         self,
@@ -248,15 +791,124 @@ class Value(Annotation):
         Returns:
             ``bool``: whether the value matched
         """
-        other_values = self._apply_invariants(observed_value)
+        return self._check_observed_values(expected_value, self._apply_invariants(observed_value))
+
+    def _check_observed_values(self, expected_value: Any, other_values: List[Any]) -> bool:
+        """
+        Checks whether any of the values produced by applying the invariants to an observed value
+        match any of the values produced by applying them to the expected value.
 
-        for value in self._apply_invariants(expected_value):
+        Args:
+            expected_value (``object``): the expected value
+            other_values (``list[object]``): the values produced by applying the invariants to the
+                observed value
+
+        Returns:
+            ``bool``: whether the value matched
+        """
+        for comparator in self._get_comparators(expected_value):
             for other_value in other_values:
-                if self.check_values_equal(value, other_value, self.atol, self.rtol, self.equivalence_fn):
+                if comparator(other_value):
                     return True
 
         return False
 
+    def _get_comparators(self, expected_value: Any) -> List[Callable[[Any], bool]]:
+        """
+        Get comparators for the values produced by applying the invariants to the expected value.
+
+        The comparators for :py:attr:`value` are compiled once (see :py:meth:`_get_compiled`).
+
+        Args:
+            expected_value (``object``): the expected value
+
+        Returns:
+            ``list[callable[[object], bool]]``: the comparators
+        """
+        if expected_value is self.value:
+            return self._get_compiled().get_comparators()
+
+        return [
+            _compile_comparator(value, self.atol, self.rtol, self.equivalence_fn)
+            for value in self._apply_invariants(expected_value)
+        ]
+
+    def _get_compiled(self) -> _CompiledValue:
+        """
+        Get the parts of checking this annotation that don't depend on the memory footprint,
+        compiling them if they haven't been compiled or if :py:attr:`value`, the tolerances, the
+        invariants, or the equivalence function have changed since they were.
+
+        Returns:
+            :py:class:`_CompiledValue`: the compiled value
+        """
+        settings = self._get_compiled_settings()
+        compiled = getattr(self, "_compiled", None)
+        if compiled is not None and compiled.value is self.value and compiled.settings == settings:
+            return compiled
+
+        capture_filter = CaptureFilter()
+        Value._update_capture_filter(self, capture_filter)
+
+        value = self.value
+        compares_values = not self.invariants and self.equivalence_fn is None and \
+            not self._tracking_initial_condition and not isinstance(value, _StructuralPattern)
+
+        h = None
+        if compares_values and self.atol is None and self.rtol is None:
+            try:
+                h = fingerprint(value)
+            except UnpickleableError:
+                pass
+
+        tolerance_bounds = None
+        has_array_bounds = compares_values and type(value) is np.ndarray and \
+            value.dtype.kind in _NUMERIC_DTYPE_KINDS
+
+        if compares_values and type(value) in REAL_SCALAR_TYPES:
+            # bounds with less than double precision may be compared at their own precision, and
+            # integers outside of the range of floats can't be converted at all
+            try:
+                lb, ub = _get_tolerance_bounds(value, self.atol, self.rtol)
+                if not isinstance(ub, (np.float16, np.float32)) and lb <= ub and \
+                        float(lb) == lb and float(ub) == ub:
+                    tolerance_bounds = (float(lb), float(ub))
+            except OverflowError:
+                pass
+
+        values = None if self._tracking_initial_condition else self._apply_invariants(value)
+        self._compiled = _CompiledValue(
+            value, settings, capture_filter, compares_values, values, h, tolerance_bounds,
+            has_array_bounds)
+        return self._compiled
+
+    def _get_compiled_settings(self) -> Tuple[Any, ...]:
+        """
+        Get the settings that this annotation's compiled value depends on.
+
+        Returns:
+            ``tuple``: the tolerances, equivalence function, and invariants
+        """
+        return (self.atol, self.rtol, self.equivalence_fn, tuple(self.invariants))
+
+    def _precompute(self) -> None:
+        self._get_compiled()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # compiled values are only pickled if they're current, since unpickling can't preserve the
+        # identity of the value they were compiled for
+        state = self.__dict__.copy()
+        compiled = state.get("_compiled")
+        if compiled is not None and (compiled.value is not self.value or \
+                compiled.settings != self._get_compiled_settings()):
+            state["_compiled"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if state.get("_compiled") is not None:
+            self._compiled.value = self.value
+
     @staticmethod
     def check_values_equal(value, other_value, atol = None, rtol = None, equivalence_fn = None) -> bool:
         """
@@ -409,6 +1061,20 @@ class _AttrValue(Value):
         self.enforce_type = enforce_type
         val = getattr(obj, attr)
         super().__init__(val, **kwargs)
+
+    def _update_capture_filter(self, capture_filter: CaptureFilter) -> None:
+        capture_filter.track_lines = True
+        if self.enforce_type:
+            capture_filter.accept_instances_of(type(self._object))
+        else:
+            capture_filter.accept_all = True
+
+    def _check_online_value(self, observed_value: Any) -> bool:
+        if self.enforce_type and not isinstance(observed_value, type(self._object)):
+            return False
+        if not hasattr(observed_value, self._attr):
+            return False
+        return self._check_observed_value(self.value, getattr(observed_value, self._attr))
     
     def __eq__(self, other: Any) -> bool:
         """
@@ -439,8 +1105,14 @@ class _AttrValue(Value):
         Returns:
             :py:class:`AnnotationResult`: the results of this annotation against ``footprint``
         """
+        if self.enforce_type:
+            indices = footprint.get_indices_of_type(type(self._object))
+        else:
+            indices = range(len(footprint))
+
         orig_mfp_vals, attr_mfp_vals = [], []
-        for mfp_val in footprint:
+        for index in indices:
+            mfp_val = footprint.get_value(index)
             if not self.enforce_type or isinstance(mfp_val.value, type(self._object)):
                 mfp_lst = mfp_val.to_list()
                 if hasattr(mfp_val.value, self._attr):
@@ -514,6 +1186,10 @@ class Attribute(Annotation):
     @property
     def children(self) -> List[Annotation]:
         return self._annotations
+
+    def _update_capture_filter(self, capture_filter: CaptureFilter) -> None:
+        for ann in self._annotations:
+            ann._update_capture_filter(capture_filter)
     
     def __eq__(self, other: Any) -> bool:
         """
@@ -564,7 +1240,7 @@ class Attribute(Annotation):
         Returns:
             :py:class:`AnnotationResult`: the results of this annotation against ``footprint``
         """
-        results = [v.check(footprint) for v in self._annotations]        
+        results = [check_annotation(v, footprint) for v in self._annotations]
         return AnnotationResult(None, self, children=results)
 
     def check_against(self, other_value: Any) -> bool:
@@ -607,6 +1283,8 @@ class ReturnValue(Value):
 
     _VALID_EVENTS = {Event.RETURN, Event.LINE_AND_RETURN}
 
+    _TRACKS_LINES = False
+
     def check(self, footprint: MemoryFootprint) -> AnnotationResult:
         satisfier = self._get_satisfying_index(footprint)
         if satisfier is not None and footprint.get_value(satisfier).event not in type(self)._VALID_EVENTS:
@@ -43,9 +43,11 @@ def compile_reference(src, dest, name):
               help="Path at which to write the results of the check")
 @click.option("-t", "--type", "output_type", default="pickle", show_default=True, 
               type=click.Choice(["pickle", "json", "report"]), help="Type of output to write")
+@click.option("-w", "--workers", default=None, type=click.INT, 
+              help="Number of processes to check the annotations of the reference in")
 @click.argument("ref", type=click.Path(exists=True, dir_okay=False))
 @click.argument("stu", type=click.Path(exists=True, dir_okay=False))
-def check(ref, stu, output, dest, output_type):
+def check(ref, stu, output, dest, output_type, workers):
     """
     Run a student submission against a reference implementation.
 
@@ -74,7 +76,7 @@ def check(ref, stu, output, dest, output_type):
         except:
             raise RuntimeError(f"Could not load the student implementation {stu}")
 
-    res = stu.check(ref)
+    res = stu.check(ref, workers=workers)
 
     if output_type == "pickle":
         if isinstance(res, list):
@@ -1,9 +1,11 @@
 """Submission execution internals for PyBryt"""
 
 __all__ = [
+    "CaptureFilter",
     "check_time_complexity",
     "MemoryFootprint",
     "no_tracing",
+    "OnlineChecker",
     "set_initial_conditions",
     "TimeComplexityResult",
 ]
@@ -15,11 +17,13 @@ import nbformat
 from nbconvert.preprocessors import ExecutePreprocessor
 from copy import deepcopy
 from tempfile import mkstemp
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from textwrap import dedent
 
+from .capture_filter import CaptureFilter
 from .complexity import check_time_complexity, is_complexity_tracing_enabled, TimeComplexityResult
 from .memory_footprint import Event, MemoryFootprint, MemoryFootprintValue
+from .online import OnlineChecker
 from .tracing import (
     create_collector,
     FrameTracer,
@@ -29,19 +33,28 @@ from .tracing import (
     tracing_off, 
     tracing_on,
 )
+from .transport import FootprintReceiver
 
 from ..preprocessors import NotebookPreprocessor
-from ..utils import make_secret
+from ..utils import load_out_of_band, make_secret
 
 
 NBFORMAT_VERSION = 4
 
+FOOTPRINT_TRANSPORTS = {"file", "stream"}
+
 
 def execute_notebook(
     nb: nbformat.NotebookNode, 
     nb_path: str, 
     addl_filenames: List[str] = [], 
-    timeout: Optional[int] = 1200
+    timeout: Optional[int] = 1200,
+    backend: str = "settrace",
+    scope: str = "all",
+    capture_filter: Optional[CaptureFilter] = None,
+    online_checker: Optional[OnlineChecker] = None,
+    memory_limit: Optional[int] = None,
+    transport: str = "file",
 ) -> MemoryFootprint:
     """
     Executes a submission using ``nbconvert`` and returns the memory footprint.
@@ -52,6 +65,12 @@ def execute_notebook(
     function. Errors during execution are ignored, and the executed notebook can be written to a 
     file using the ``output`` argument.
 
+    With the ``"stream"`` transport, the footprint is instead streamed out of the kernel over a
+    local socket in chunks while the notebook runs (see
+    :py:class:`FootprintReceiver<pybryt.execution.transport.FootprintReceiver>`), so it never has
+    to be pickled all at once, and the values captured before the kernel died are kept if it
+    crashes.
+
     Args:
         nb (``nbformat.NotebookNode``): the notebook to be executed
         nb_path (``str``): path to the notebook ``nb``
@@ -59,10 +78,27 @@ def execute_notebook(
         output (``str``, optional): a file path at which to write the executed notebook
         timeout (``int``, optional): number of seconds to allow for notebook execution; set to 
             ``None`` for no time limit
+        backend (``str``, optional): the tracing backend to use; one of ``{"settrace",
+            "monitoring"}``
+        scope (``str``, optional): the frames to trace locally; one of ``{"all", "student"}``
+        capture_filter (:py:class:`CaptureFilter<pybryt.execution.capture_filter.CaptureFilter>`,
+            optional): a filter for the values to track
+        online_checker (:py:class:`OnlineChecker<pybryt.execution.online.OnlineChecker>`,
+            optional): a checker used to stop capturing values once grading is decided
+        memory_limit (``int``, optional): the number of bytes of values to keep in the kernel's
+            memory before spilling new values to disk
+        transport (``str``, optional): how the footprint is sent out of the kernel; one of
+            ``{"file", "stream"}``
 
     Returns:
         :py:class:`pybryt.execution.memory_footprint.MemoryFootprint`: the memory footprint
+
+    Raises:
+        ``ValueError``: if the transport is invalid
     """
+    if transport not in FOOTPRINT_TRANSPORTS:
+        raise ValueError(f"Invalid footprint transport: {transport}")
+
     nb = deepcopy(nb)
     preprocessor = NotebookPreprocessor()
     nb = preprocessor.preprocess(nb)
@@ -72,24 +108,54 @@ def execute_notebook(
 
     secret = make_secret()
     frame_tracer_varname = f"frame_tracer_{secret}"
+    sender_varname = f"sender_{secret}"
+
+    # the capture filter and online checker may contain arbitrary objects (like the annotations of
+    # a reference), so they are pickled to a file that the kernel removes once it has loaded them;
+    # they aren't included in the notebook, which is stored in the footprint
+    _, tracing_args_fp = mkstemp()
+    with open(tracing_args_fp, "wb") as f:
+        dill.dump({"capture_filter": capture_filter, "online_checker": online_checker}, f)
+
+    # with the stream transport, the kernel connects to a receiver listening in this process
+    receiver, sender = None, "None"
+    if transport == "stream":
+        receiver = FootprintReceiver(memory_limit=memory_limit)
+        sender = f"FootprintSender({receiver.address!r}, \"{receiver.token}\")"
 
     first_cell = nbformat.v4.new_code_cell(dedent(f"""\
         import inspect
         import sys
-        from pybryt.execution import FrameTracer
+        from pybryt.execution import _load_tracing_args, FrameTracer
+        from pybryt.execution.transport import FootprintSender
+        {sender_varname} = {sender}
         {frame_tracer_varname} = FrameTracer(inspect.currentframe())
-        {frame_tracer_varname}.start_trace(addl_filenames={addl_filenames})
+        {frame_tracer_varname}.start_trace(
+            addl_filenames={addl_filenames},
+            backend="{backend}",
+            scope="{scope}",
+            memory_limit={memory_limit},
+            sender={sender_varname},
+            **_load_tracing_args("{tracing_args_fp}"),
+        )
         %cd {nb_dir}
     """))
 
-    last_cell = nbformat.v4.new_code_cell(dedent(f"""\
-        {frame_tracer_varname}.end_trace()
-        footprint = {frame_tracer_varname}.get_footprint()
-        footprint.filter_out_unpickleable_values()
-        import dill
-        with open("{footprint_fp}", "wb+") as f:
-            dill.dump(footprint, f)
-    """))
+    if receiver is not None:
+        last_cell = nbformat.v4.new_code_cell(dedent(f"""\
+            {frame_tracer_varname}.end_trace()
+            {sender_varname}.close({frame_tracer_varname}.get_footprint())
+        """))
+
+    else:
+        last_cell = nbformat.v4.new_code_cell(dedent(f"""\
+            {frame_tracer_varname}.end_trace()
+            footprint = {frame_tracer_varname}.get_footprint()
+            footprint.filter_out_unpickleable_values()
+            from pybryt.utils import dump_out_of_band
+            with open("{footprint_fp}", "wb+") as f:
+                dump_out_of_band(footprint, f)
+        """))
 
     nb['cells'].insert(0, first_cell)
     nb['cells'].append(last_cell)
@@ -97,12 +163,38 @@ def execute_notebook(
     ep = ExecutePreprocessor(timeout=timeout, allow_errors=True)
     ep.preprocess(nb)
 
-    with open(footprint_fp, "rb") as f:
-        footprint: MemoryFootprint = dill.load(f)
+    if receiver is not None:
+        footprint = receiver.get_footprint()
+
+    else:
+        # mapped files can't be removed on Windows, so the file is read into memory there
+        footprint: MemoryFootprint = load_out_of_band(footprint_fp, map_buffers=os.name != "nt")
 
     os.remove(footprint_fp)
 
+    # the kernel doesn't remove the file if it fails before loading it
+    if os.path.exists(tracing_args_fp):
+        os.remove(tracing_args_fp)
+
     footprint.add_imports(*preprocessor.get_imports())
     footprint.set_executed_notebook(nb)
 
     return footprint
+
+
+def _load_tracing_args(path: str) -> Dict[str, Any]:
+    """
+    Load the keyword arguments for :py:meth:`FrameTracer.start_trace` pickled by
+    :py:func:`execute_notebook` in a kernel and remove the file they were pickled to.
+
+    Args:
+        path (``str``): the path to the file
+
+    Returns:
+        ``dict[str, object]``: the arguments
+    """
+    try:
+        with open(path, "rb") as f:
+            return dill.load(f)
+    finally:
+        os.remove(path)
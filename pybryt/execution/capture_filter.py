@@ -0,0 +1,223 @@
+"""Filters for limiting the values captured by the trace function"""
+
+import numpy as np
+import pandas as pd
+
+from typing import Any, Optional, Set, Tuple
+
+from ..utils import get_type_name
+
+
+VALUE_KINDS = {"none", "str", "bytes", "scalar", "container", "shaped"}
+
+_KINDS_BY_TYPE_NAME = {get_type_name(t): kind for types, kind in [
+    ((type(None),), "none"),
+    ((str, np.str_), "str"),
+    ((bytes, np.bytes_), "bytes"),
+    ((int, float, complex, bool), "scalar"),
+    ((list, tuple, set, frozenset, dict), "container"),
+    ((np.ndarray, pd.DataFrame, pd.Series), "shaped"),
+] for t in types}
+
+_NUMPY_SCALAR_TYPE_NAME = get_type_name(np.generic)
+
+
+def get_value_kind(val: Any) -> Optional[str]:
+    """
+    Classify a value by how it can be compared to the values of annotations.
+
+    Values are classified only if they are instances of a built-in, NumPy, or pandas type whose
+    comparison behavior is known. The kinds are:
+
+    * ``"none"``: ``None``
+    * ``"str"`` and ``"bytes"``: strings and byte strings (including NumPy's)
+    * ``"scalar"``: non-iterable numbers, including NumPy scalars
+    * ``"container"``: lists, tuples, sets, frozensets, and dictionaries
+    * ``"shaped"``: NumPy arrays and pandas DataFrames and Series, which are compared by shape
+
+    Args:
+        val (``object``): the value
+
+    Returns:
+        ``str`` or ``None``: the kind of the value, or ``None`` if it is of any other type
+    """
+    t = type(val)
+    if val is None:
+        return "none"
+    if t is str or t is np.str_:
+        return "str"
+    if t is bytes or t is np.bytes_:
+        return "bytes"
+    if t in (int, float, complex, bool) or isinstance(val, np.generic):
+        return "scalar"
+    if t in (list, tuple, set, frozenset, dict):
+        return "container"
+    if t in (np.ndarray, pd.DataFrame, pd.Series):
+        return "shaped"
+    return None
+
+
+def get_type_kind(type_names: Tuple[str, ...]) -> Optional[str]:
+    """
+    Classify the values of a type by how they can be compared to the values of annotations (see
+    :py:func:`get_value_kind`).
+
+    Args:
+        type_names (``tuple[str]``): the qualified names of the type and its base classes, in
+            method resolution order (see
+            :py:meth:`MemoryFootprint.get_indices_by_type<pybryt.execution.memory_footprint.MemoryFootprint.get_indices_by_type>`)
+
+    Returns:
+        ``str`` or ``None``: the kind of the values, or ``None`` if they are of any other type
+    """
+    kind = _KINDS_BY_TYPE_NAME.get(type_names[0])
+    if kind is None and _NUMPY_SCALAR_TYPE_NAME in type_names:
+        return "scalar"
+    return kind
+
+
+class CaptureFilter:
+    """
+    A filter describing which values can satisfy the annotations of one or more reference
+    implementations, used by the trace function to drop values before they're snapshotted and
+    fingerprinted.
+
+    Filters start out accepting nothing and are widened by the annotations that use them (see
+    :py:meth:`ReferenceImplementation.get_capture_filter<pybryt.ReferenceImplementation.get_capture_filter>`).
+    Values that are not of a kind known to the filter (see :py:func:`get_value_kind`), like
+    instances of user-defined classes or ``TimeComplexityResult`` objects, are always accepted.
+    Imports and function calls are tracked regardless of the filter.
+
+    If no annotations need the values seen on lines of student code (e.g. if the references only
+    contain :py:class:`ReturnValue<pybryt.ReturnValue>` and import annotations), the filter also
+    tells the trace function to skip ``line`` events entirely.
+    """
+
+    accept_all: bool
+    """whether all values are accepted"""
+
+    track_lines: bool
+    """whether values should be captured from ``line`` events"""
+
+    kinds: Set[str]
+    """the kinds of values (see :py:func:`get_value_kind`) that are accepted"""
+
+    shapes: Set[Tuple[int, ...]]
+    """the shapes of arrays, DataFrames, and Series that are accepted"""
+
+    instance_types: Tuple[type, ...]
+    """types whose instances are accepted"""
+
+    def __init__(self):
+        self.accept_all = False
+        self.track_lines = False
+        self.kinds = set()
+        self.shapes = set()
+        self.instance_types = ()
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, type(self)) and self.accept_all == other.accept_all and \
+            self.track_lines == other.track_lines and self.kinds == other.kinds and \
+            self.shapes == other.shapes and set(self.instance_types) == set(other.instance_types)
+
+    def __repr__(self):
+        return f"CaptureFilter(accept_all={self.accept_all}, track_lines={self.track_lines}, " \
+            f"kinds={self.kinds}, shapes={self.shapes}, instance_types={self.instance_types})"
+
+    def accept_value(self, val: Any) -> None:
+        """
+        Widen this filter to accept values that could be equal to the provided value.
+
+        Args:
+            val (``object``): the expected value
+        """
+        kind = get_value_kind(val)
+        if kind is None:
+            self.accept_all = True
+        elif kind == "shaped":
+            self.shapes.add(tuple(val.shape))
+        elif kind == "container":
+            # numeric containers are compared to other iterables with np.allclose, so strings,
+            # bytes, and arrays of any shape could also satisfy them
+            self.kinds.update({"container", "str", "bytes", "shaped"})
+        else:
+            self.kinds.add(kind)
+
+    def accept_instances_of(self, type_: type) -> None:
+        """
+        Widen this filter to accept all instances of a type.
+
+        Args:
+            type_ (``type``): the type
+        """
+        self.instance_types += (type_,)
+
+    def accepts(self, val: Any) -> bool:
+        """
+        Determine whether a value should be captured.
+
+        Args:
+            val (``object``): the value
+
+        Returns:
+            ``bool``: whether the value passes through this filter
+        """
+        if self.accept_all:
+            return True
+
+        kind = get_value_kind(val)
+        if kind is None or kind in self.kinds:
+            return True
+
+        if kind == "shaped" and val.shape in self.shapes:
+            return True
+
+        return bool(self.instance_types) and isinstance(val, self.instance_types)
+
+    def accepts_type(self, type_names: Tuple[str, ...]) -> bool:
+        """
+        Determine whether any values of a type could pass through this filter.
+
+        Arrays, DataFrames, and Series are accepted if the filter accepts any shape, since their
+        shapes aren't known from their type.
+
+        Args:
+            type_names (``tuple[str]``): the qualified names of the type and its base classes, in
+                method resolution order
+
+        Returns:
+            ``bool``: whether values of the type could pass through this filter
+        """
+        if self.accept_all:
+            return True
+
+        kind = get_type_kind(type_names)
+        if kind is None or kind in self.kinds or (kind == "shaped" and self.shapes):
+            return True
+
+        # types that customize instance checks, like abstract base classes, can have instances
+        # that aren't subclasses
+        return any(
+            type(t).__instancecheck__ is not type.__instancecheck__ or get_type_name(t) in type_names
+            for t in self.instance_types
+        )
+
+    @classmethod
+    def combine(cls, *filters: "CaptureFilter") -> "CaptureFilter":
+        """
+        Create a filter that accepts any value accepted by any of the provided filters.
+
+        Args:
+            *filters (:py:class:`CaptureFilter`): the filters to combine
+
+        Returns:
+            :py:class:`CaptureFilter`: the combined filter
+        """
+        new = cls()
+        for f in filters:
+            new.accept_all |= f.accept_all
+            new.track_lines |= f.track_lines
+            new.kinds |= f.kinds
+            new.shapes |= f.shapes
+            new.instance_types += tuple(t for t in f.instance_types if t not in new.instance_types)
+        return new
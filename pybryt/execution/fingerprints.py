@@ -0,0 +1,136 @@
+"""Caching of value fingerprints for the trace function"""
+
+import weakref
+import zlib
+import numpy as np
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+from ..utils import fingerprint
+
+
+FINGERPRINT_CACHE_SIZE = 1024
+FINGERPRINT_CACHE_MIN_LENGTH = 64
+
+IMMUTABLE_ELEMENT_TYPES = {int, float, complex, bool, str, bytes, type(None)}
+
+
+def _is_cacheable_immutable(obj: Any) -> bool:
+    """
+    Determine whether an object is an immutable value large enough to be worth caching.
+    """
+    if type(obj) is str or type(obj) is bytes:
+        return len(obj) >= FINGERPRINT_CACHE_MIN_LENGTH
+    if type(obj) is tuple:
+        return len(obj) >= FINGERPRINT_CACHE_MIN_LENGTH and \
+            all(type(e) in IMMUTABLE_ELEMENT_TYPES for e in obj)
+    return False
+
+
+def _get_array_witness(arr: np.ndarray) -> Tuple[Hashable, ...]:
+    """
+    Compute a change witness for an array: its dtype, shape, strides, data pointer, and the CRC-32
+    checksum of its buffer.
+    """
+    return (
+        arr.dtype.str,
+        arr.shape,
+        arr.strides,
+        arr.__array_interface__["data"][0],
+        zlib.crc32(np.ascontiguousarray(arr).data),
+    )
+
+
+class FingerprintCache:
+    """
+    A cache of the fingerprints of objects keyed on their identity, used to avoid re-fingerprinting
+    objects that are captured repeatedly without changing.
+
+    Two kinds of objects are cached. Large immutable values (strings, bytes, and tuples of immutable
+    scalars) are cached with a strong reference, so their IDs can't be recycled while they're in the
+    cache; these entries are evicted in least-recently-used order once there are more than
+    ``max_size`` of them. NumPy arrays are cached with a weak reference and a change witness
+    containing the CRC-32 checksum of their buffer; the fingerprint is only reused if the
+    referenced array is still alive, is the same object, and has the same witness. Entries for
+    arrays are removed when the arrays are garbage collected.
+
+    Other mutable objects (e.g. lists and dictionaries) are not cached because there is no change
+    witness for them that is much cheaper than fingerprinting them.
+
+    Args:
+        max_size (``int``, optional): the maximum number of immutable values to cache
+    """
+
+    max_size: int
+    """the maximum number of immutable values to cache"""
+
+    _immutable_entries: Dict[int, Tuple[Any, bytes]]
+    """cached immutable values and their fingerprints keyed on their IDs"""
+
+    _array_entries: Dict[int, Tuple[weakref.ref, Tuple[Hashable, ...], bytes]]
+    """weak references to cached arrays, their witnesses, and their fingerprints keyed on their IDs"""
+
+    def __init__(self, max_size: int = FINGERPRINT_CACHE_SIZE):
+        self.max_size = max_size
+        self._immutable_entries = OrderedDict()
+        self._array_entries = {}
+
+    def _remove_array_entry(self, key: int, ref: weakref.ref) -> None:
+        """
+        Weak reference callback that removes the entry for an array that was garbage collected.
+        """
+        entry = self._array_entries.get(key)
+        if entry is not None and entry[0] is ref:
+            del self._array_entries[key]
+
+    def get_fingerprint(self, obj: Any) -> bytes:
+        """
+        Return the fingerprint of an object, using the cached fingerprint if the object has not
+        changed since it was last fingerprinted.
+
+        Args:
+            obj (``object``): the object
+
+        Returns:
+            ``bytes``: the fingerprint of the object
+
+        Raises:
+            :py:class:`pybryt.utils.UnpickleableError`: if the object cannot be fingerprinted
+        """
+        key = id(obj)
+
+        if type(obj) is np.ndarray and not obj.dtype.hasobject:
+            witness = _get_array_witness(obj)
+            entry = self._array_entries.get(key)
+            if entry is not None and entry[0]() is obj and entry[1] == witness:
+                return entry[2]
+
+            h = fingerprint(obj)
+            ref = weakref.ref(obj, lambda r, key=key: self._remove_array_entry(key, r))
+            self._array_entries[key] = (ref, witness, h)
+            return h
+
+        if _is_cacheable_immutable(obj):
+            entry = self._immutable_entries.get(key)
+            if entry is not None and entry[0] is obj:
+                self._immutable_entries.move_to_end(key)
+                return entry[1]
+
+            h = fingerprint(obj)
+            self._immutable_entries[key] = (obj, h)
+            if len(self._immutable_entries) > self.max_size:
+                self._immutable_entries.popitem(last=False)
+            return h
+
+        return fingerprint(obj)
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache.
+        """
+        self._immutable_entries.clear()
+        self._array_entries.clear()
+
+    def __len__(self):
+        return len(self._immutable_entries) + len(self._array_entries)
@@ -1,12 +1,24 @@
 """Memory footprint container for PyBryt"""
 
 import nbformat
+import numpy as np
 
-from dataclasses import astuple, dataclass
+from array import array
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
-from ..utils import filter_pickleable_list, pickle_and_hash
+from .segments import estimate_size, SegmentFile, SpilledValue
+
+from ..utils import (
+    filter_pickleable_list,
+    fingerprint,
+    FINGERPRINT_SIZE,
+    get_type_name,
+    LazyValue,
+    UnpickleableError,
+)
 
 
 class Event(Enum):
@@ -77,15 +89,17 @@ class Counter:
         self.val += val
 
 
-@dataclass
 class MemoryFootprintValue:
     """
-    A data class for an observed value in the memory footprint.
+    A lightweight row object for an observed value in the memory footprint.
 
-    The fields and their order should correspond to the structure of the tuples in
-    :py:attribute:`MemoryFootprint.values`.
+    Rows are created on demand from the columns of a
+    :py:class:`MemoryFootprint<pybryt.execution.memory_footprint.MemoryFootprint>`, so changing
+    their fields does not change the footprint.
     """
 
+    __slots__ = ("value", "timestamp", "event")
+
     value: Any
     """the value"""
 
@@ -95,27 +109,287 @@ class MemoryFootprintValue:
     event: Optional[Event]
     """the trace function event that created this value, if applicable"""
 
+    def __init__(self, value: Any, timestamp: int, event: Optional[Event]):
+        self.value = value
+        self.timestamp = timestamp
+        self.event = event
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, type(self)) and self.to_list() == other.to_list()
+
+    def __repr__(self):
+        return f"MemoryFootprintValue(value={self.value!r}, timestamp={self.timestamp!r}, " \
+            f"event={self.event!r})"
+
     def to_list(self):
-        return list(astuple(self))
+        return [self.value, self.timestamp, self.event]
+
+
+EVENT_CODES: Dict[Optional[Event], int] = {
+    None: 0,
+    Event.LINE: 1,
+    Event.RETURN: 2,
+    Event.LINE_AND_RETURN: 3,
+}
+"""
+the codes used to store events in memory footprints; the code for an event seen in more than one
+event type is the bitwise OR of their codes
+"""
+
+_EVENTS_BY_CODE: Tuple[Optional[Event], ...] = tuple(sorted(EVENT_CODES, key=EVENT_CODES.get))
+
+REAL_SCALAR_TYPES: Tuple[type, ...] = tuple(dict.fromkeys([
+    bool, int, float, np.bool_, np.int8, np.int16, np.int32, np.int64, np.longlong, np.uint8,
+    np.uint16, np.uint32, np.uint64, np.ulonglong, np.float16, np.float32, np.float64,
+]))
+"""
+the types of the real scalars that memory footprints index by value (see
+:py:meth:`MemoryFootprint.get_indices_in_range`)
+"""
+
+_REAL_SCALAR_TYPE_NAMES = frozenset(get_type_name(t) for t in REAL_SCALAR_TYPES)
+
+# the largest magnitude of the integers that can all be represented exactly as floats
+_MAX_EXACT_INTEGER = 2 ** 53
+
+# floats whose comparisons with Python floats are done at their own precision by some versions of
+# NumPy
+_LOW_PRECISION_FLOAT_TYPES = (np.float16, np.float32)
+
+_NDARRAY_TYPE_NAME = get_type_name(np.ndarray)
+
+# the kinds of the dtypes of arrays that memory footprints stack (see
+# MemoryFootprint.get_stacked_arrays)
+_NUMERIC_DTYPE_KINDS = "biuf"
+
+_NULL_FINGERPRINT = bytes(FINGERPRINT_SIZE)
+
+# codes for whether the values in a footprint can be pickled
+_PICKLEABILITY_UNKNOWN = 0
+_PICKLEABLE = 1
+_UNPICKLEABLE = 2
+
+
+@lru_cache(maxsize=1024)
+def _get_type_names(type_: type) -> Tuple[str, ...]:
+    """
+    Return the qualified names of a type and its base classes, in method resolution order.
+    """
+    return tuple(get_type_name(t) for t in type_.__mro__)
+
+
+class _Column:
+    """
+    A growable column of fixed-width values backed by an ``array.array``.
+
+    Views of the column share memory with it. Because arrays can't be resized while they are
+    exporting buffers, appending to a column with live views first copies the column, leaving the
+    views pointing to the rows they were created with.
+
+    Args:
+        typecode (``str``): the type code of the array
+        dtype (``numpy.dtype``): the NumPy data type of the views
+        width (``int``, optional): the number of elements in each row
+    """
+
+    __slots__ = ("_data", "_dtype", "_width")
+
+    _data: array
+    """the backing array"""
+
+    _dtype: np.dtype
+    """the NumPy data type of the views"""
+
+    _width: int
+    """the number of elements in each row"""
+
+    def __init__(self, typecode: str, dtype: np.dtype, width: int = 1):
+        self._data = array(typecode)
+        self._dtype = dtype
+        self._width = width
+
+    def __getstate__(self):
+        return self._data, self._dtype, self._width
+
+    def __setstate__(self, state):
+        self._data, self._dtype, self._width = state
+
+    def __len__(self):
+        return len(self._data) // self._width
+
+    def __getitem__(self, index: int) -> int:
+        return self._data[index]
+
+    def __setitem__(self, index: int, val: int) -> None:
+        self._data[index] = val
+
+    def append(self, val: int) -> None:
+        """
+        Append a value to a column with rows of width 1.
+
+        Args:
+            val (``int``): the value
+        """
+        try:
+            self._data.append(val)
+        except BufferError:
+            self._data = array(self._data.typecode, self._data)
+            self._data.append(val)
+
+    def append_bytes(self, val: bytes) -> None:
+        """
+        Append a row to the column from its bytes.
+
+        Args:
+            val (``bytes``): the row
+        """
+        try:
+            self._data.frombytes(val)
+        except BufferError:
+            self._data = array(self._data.typecode, self._data)
+            self._data.frombytes(val)
+
+    def get_bytes(self, index: int) -> bytes:
+        """
+        Return the bytes of a row.
+
+        Args:
+            index (``int``): the index of the row
+
+        Returns:
+            ``bytes``: the bytes of the row
+        """
+        if index < 0:
+            index += len(self)
+        return self._data[index * self._width:(index + 1) * self._width].tobytes()
+
+    def view(self) -> np.ndarray:
+        """
+        Return a read-only view of the rows in the column.
+
+        Returns:
+            ``numpy.ndarray``: the view
+        """
+        arr = np.frombuffer(self._data, dtype=self._dtype)
+        if self._width != 1:
+            arr = arr.reshape(-1, self._width)
+        arr.flags.writeable = False
+        return arr
+
+    def take(self, indices: List[int]) -> None:
+        """
+        Keep only the rows at the specified indices.
+
+        Args:
+            indices (``list[int]``): the indices
+        """
+        data = array(self._data.typecode)
+        for i in indices:
+            data.extend(self._data[i * self._width:(i + 1) * self._width])
+        self._data = data
 
 
 class MemoryFootprint:
     """
     A memory footprint for an executed notebook.
 
+    Values are stored by column: the observed objects are kept in a list, and their timestamps,
+    event codes (see :py:data:`EVENT_CODES`), and fingerprints are kept in compact arrays. The
+    columns can be accessed without copying using :py:attr:`objects`, :py:attr:`timestamps`,
+    :py:attr:`event_codes`, and :py:attr:`fingerprints`; the latter three are read-only NumPy
+    views.
+
+    If ``memory_limit`` is set, the footprint estimates the memory used by the values it stores
+    (see :py:func:`estimate_size<pybryt.execution.segments.estimate_size>`). Once the limit is
+    reached, new values are pickled and appended to a temporary
+    :py:class:`SegmentFile<pybryt.execution.segments.SegmentFile>` instead of being kept in memory;
+    only their fingerprints, timestamps, events, and offsets stay in memory, and the values are
+    loaded from the file whenever they're accessed. In :py:attr:`objects`, spilled values appear as
+    :py:class:`SpilledValue<pybryt.execution.segments.SpilledValue>` placeholders.
+
+    Footprints loaded from lazy containers (see :py:func:`dump_lazy<pybryt.utils.dump_lazy>`) hold
+    :py:class:`LazyValue<pybryt.utils.LazyValue>` placeholders for their values and executed
+    notebook, which are unpickled the first time they're accessed. Their fingerprints, type names
+    (see :py:meth:`get_type_name`), timestamps, and events are available without loading them.
+
+    The footprint also indexes the positions of its values by type, so that annotations can only
+    check the values that could satisfy them (see :py:meth:`get_indices_by_type` and
+    :py:meth:`get_indices_of_type`).
+
     Args:
         counter (:py:class:`pybryt.execution.memory_footprint.Counter`, optional): a counter to use 
             for this footprint; if unprovided, a new one is initialized
+        memory_limit (``int``, optional): the number of bytes of values to keep in memory before
+            spilling new values to disk; if unprovided, all values are kept in memory
+        spill_dir (``str``, optional): the directory in which to create the segment file
     """
 
     counter: Counter
     """the counter used to construct this footprint"""
 
-    _value_indices_by_hash: Dict[str, int]
-    """indices of values keyed on their hashes"""
+    _value_indices_by_hash: Dict[bytes, int]
+    """indices of values keyed on their fingerprints"""
+
+    _unindexed_type_codes: Set[int]
+    """the codes of types with values that may not be indexed by their fingerprints"""
+
+    _objects: List[Any]
+    """the observed values"""
+
+    _timestamps: _Column
+    """the timestamps of the values"""
+
+    _event_codes: _Column
+    """the codes of the events that produced the values"""
+
+    _fingerprints: _Column
+    """the fingerprints of the values; all zeros if a fingerprint hasn't been computed"""
+
+    _pickleability: _Column
+    """codes for whether the values are known to be pickleable or unpickleable"""
+
+    _type_codes: _Column
+    """the codes of the types of the values, which index :py:attr:`_type_names`"""
+
+    _type_names: List[Tuple[str, ...]]
+    """the qualified names of each type seen and its base classes, keyed by type code"""
+
+    _type_codes_by_names: Dict[Tuple[str, ...], int]
+    """the codes of the types seen keyed on their names"""
+
+    _indices_by_type: Dict[int, List[int]]
+    """the indices of the values keyed on their type codes, in ascending order"""
+
+    _scalar_index: Optional[Tuple[np.ndarray, np.ndarray, List[int], int]]
+    """
+    the sorted real scalar values as floats, their indices, the indices of the values that can't be
+    compared exactly as floats, and the number of values when the index was built
+    """
+
+    _array_index: Optional[Tuple[
+        Dict[Tuple[Tuple[int, ...], np.dtype], List[int]], Dict[Tuple[int, ...], List[int]], int]]
+    """
+    the indices of the arrays with numeric dtypes keyed on their shapes and dtypes, the indices of
+    other arrays keyed on their shapes, and the number of values when the index was built
+    """
+
+    _array_stacks: Dict[Tuple[int, ...], List[Tuple[np.ndarray, List[int]]]]
+    """the arrays with numeric dtypes stacked by dtype and their indices, keyed on their shapes"""
+
+    _max_timestamp: int
+    """the largest timestamp of the values, or -1 if there are none"""
+
+    memory_limit: Optional[int]
+    """the number of bytes of values to keep in memory before spilling new values to disk"""
 
-    values: List[Tuple[Any, int, Optional[Event]]]
-    """the values, timestamps, and event types in the footprint"""
+    spill_dir: Optional[str]
+    """the directory in which to create the segment file"""
+
+    _memory_usage: int
+    """the estimated number of bytes used by the values kept in memory"""
+
+    _segment: Optional[SegmentFile]
+    """the segment file containing values spilled to disk, if any"""
 
     calls: List[Tuple[str, str]]
     """the list of function calls tracked by the trace function"""
@@ -123,21 +397,82 @@ class MemoryFootprint:
     imports: Set[str]
     """the set of modules imported during execution"""
 
-    executed_notebook: Optional[nbformat.NotebookNode]
+    _executed_notebook: Optional[Union[nbformat.NotebookNode, LazyValue]]
     """the final (pre-processed) notebook that was executed, with outputs"""
 
     initial_conditions: Dict[str, Any]
     """initial conditions set during execution"""
 
-    def __init__(self, counter: Optional[Counter] = None):
+    def __init__(
+        self,
+        counter: Optional[Counter] = None,
+        memory_limit: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+    ):
         self.counter = counter if counter is not None else Counter()
-        self._value_indices_by_hash = {}
-        self.values = []
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self._segment = None
+        self._init_columns()
         self.calls = []
         self.imports = set()
-        self.executed_notebook = None
+        self._executed_notebook = None
         self.initial_conditions = {}
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # the scalar and array indices are caches, which are rebuilt when they're next needed
+        state = self.__dict__.copy()
+        state["_scalar_index"] = None
+        state["_array_index"] = None
+        state["_array_stacks"] = {}
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # footprints pickled by older versions store the executed notebook publicly and their
+        # values as a list of (value, timestamp, event) tuples
+        if "executed_notebook" in state:
+            state["_executed_notebook"] = state.pop("executed_notebook")
+
+        values = None
+        if "_objects" not in state:
+            values = state.pop("values", [])
+            state.pop("_value_indices_by_hash", None)  # keyed on hashes that are no longer used
+
+        state.setdefault("memory_limit", None)
+        state.setdefault("spill_dir", None)
+        state.setdefault("_segment", None)
+        self.__dict__.update(state)
+
+        if values is not None:
+            self._init_columns()
+            for val, timestamp, event in values:
+                try:
+                    h = fingerprint(val)
+                except UnpickleableError:
+                    h = None
+                self._index_fingerprint(self._append(val, timestamp, event, h), h)
+
+    def _init_columns(self) -> None:
+        """
+        Initialize empty value columns.
+        """
+        self._value_indices_by_hash = {}
+        self._unindexed_type_codes = set()
+        self._objects = []
+        self._timestamps = _Column("q", np.int64)
+        self._event_codes = _Column("B", np.uint8)
+        self._fingerprints = _Column("B", np.uint8, FINGERPRINT_SIZE)
+        self._pickleability = _Column("B", np.uint8)
+        self._type_codes = _Column("I", np.uint32)
+        self._type_names = []
+        self._type_codes_by_names = {}
+        self._indices_by_type = {}
+        self._scalar_index = None
+        self._array_index = None
+        self._array_stacks = {}
+        self._max_timestamp = -1
+        self._memory_usage = 0
+
     @classmethod
     def from_values(cls, *values: MemoryFootprintValue) -> 'MemoryFootprint':
         """
@@ -154,10 +489,9 @@ class MemoryFootprint:
         if not all(isinstance(v, MemoryFootprintValue) for v in values):
             raise TypeError("Arguments to from_values must be of type MemoryFootprintValue")
 
-        values = [astuple(v) for v in values]
-
         footprint = cls()
-        footprint.values.extend(values)
+        for v in values:
+            footprint._index_fingerprint(footprint._append(v.value, v.timestamp, v.event, None), None)
         footprint.offset_counter(footprint.num_steps)
         return footprint
 
@@ -181,16 +515,21 @@ class MemoryFootprint:
         timestamp_offset = 0  # offset for timestamps in the new memory footprint
         for fp in footprints:
             map(lambda c: new_fp.add_call(*c), fp.calls)
-            for fp_val in fp:
-                h = pickle_and_hash(fp_val.value)
+            for i in range(len(fp)):
+                h = fp.get_fingerprint(i)
                 if h not in seen:
-                    fp_val.timestamp += timestamp_offset
-                    new_fp.add_value(
-                        fp_val.value,
-                        fp_val.timestamp,
-                        fp_val.event,
-                        allow_duplicates=True,
+                    # values in lazy containers are copied without loading them
+                    val = fp._objects[i]
+                    if type(val) is not LazyValue:
+                        val = fp._get_object(i)
+                    index = new_fp._append(
+                        val,
+                        fp._timestamps[i] + timestamp_offset,
+                        _EVENTS_BY_CODE[fp._event_codes[i]],
+                        h,
+                        type_names=fp._type_names[fp._type_codes[i]],
                     )
+                    new_fp._index_fingerprint(index, h)
                     seen.add(h)
 
             timestamp_offset += fp.num_steps
@@ -213,48 +552,388 @@ class MemoryFootprint:
         """
         self.counter.offset(val)
 
+    def _append(
+        self,
+        val: Any,
+        timestamp: int,
+        event: Optional[Event],
+        h: Optional[bytes],
+        pickleability: Optional[int] = None,
+        type_names: Optional[Tuple[str, ...]] = None,
+    ) -> int:
+        """
+        Append a row to the value columns and return its index. Values with fingerprints are known
+        to be pickleable unless otherwise specified, since computing a fingerprint pickles any part
+        of the value that isn't hashed natively. The names of the value's type default to those of
+        ``type(val)``, and must be provided if ``val`` is a placeholder.
+        """
+        if pickleability is None:
+            pickleability = _PICKLEABLE if h is not None else _PICKLEABILITY_UNKNOWN
+
+        if type_names is None:
+            type_names = _get_type_names(type(val))
+
+        code = self._type_codes_by_names.get(type_names)
+        if code is None:
+            code = self._type_codes_by_names[type_names] = len(self._type_names)
+            self._type_names.append(type_names)
+
+        index = len(self._objects)
+        self._indices_by_type.setdefault(code, []).append(index)
+        self._type_codes.append(code)
+        self._objects.append(val)
+        self._timestamps.append(timestamp)
+        self._event_codes.append(EVENT_CODES[event])
+        self._fingerprints.append_bytes(h if h is not None else _NULL_FINGERPRINT)
+        self._pickleability.append(pickleability)
+        if timestamp > self._max_timestamp:
+            self._max_timestamp = timestamp
+        return index
+
     def add_value(
         self,
         val: Any,
         timestamp: Optional[int] = None,
         event: Optional[Event] = None,
         allow_duplicates: bool = False,
-    ) -> None:
+        snapshot: Optional[Callable[[Any], Any]] = None,
+        value_hash: Optional[bytes] = None,
+    ) -> int:
         """
-        Add a value to the memory footprint.
+        Add a value to the memory footprint and return its index.
 
         If the timestamp is unspeficied, the step counter is polled for the current value. By default,
         this method does not allow duplicate values to be entered into the footprint; this can be
-        disabled using ``allow_duplicates``.
+        disabled using ``allow_duplicates``. If a snapshot function is provided, it is applied to
+        the value before it is stored, and only if the value is not a duplicate. If the
+        fingerprint of the value has already been computed, it can be provided as ``value_hash``.
 
         Args:
             value (``object``): the value to add
             timestamp (``int``, optional): the timestamp
             event (:py:class:`Event`, optional): the event that produced the value
             allow_duplicates(``bool``): whether duplicate values should be allowed in the footprint
+            snapshot (``callable[[object], object]``, optional): a function that copies the value
+            value_hash (``bytes``, optional): the fingerprint of the value
+
+        Returns:
+            ``int``: the index of the value in the footprint, which is the index of the existing
+            value if the value is a duplicate
         """
+        h = value_hash
         if not allow_duplicates:
-            h = pickle_and_hash(val)
+            if h is None:
+                h = fingerprint(val)
             if h in self._value_indices_by_hash:
-                tup = self.values[self._value_indices_by_hash[h]]
-                tup_event = tup[2]
+                # update the event type if necessary; codes are combined with a bitwise OR so that
+                # values seen in both line and return events have the LINE_AND_RETURN code
+                index = self._value_indices_by_hash[h]
+                self._event_codes[index] |= EVENT_CODES[event]
+                return index
 
-                # update the event type if necessary
-                if tup_event is None and event is not None:
-                    tup_event = event
-                elif tup_event is not None and event is not None and tup_event != event:
-                    tup_event = Event.LINE_AND_RETURN
-                
-                self.values[self._value_indices_by_hash[h]] = (tup[0], tup[1], tup_event)
+        type_names = _get_type_names(type(val))
+        spilled, pickleability = None, None
+        if self.memory_limit is not None and self._memory_usage >= self.memory_limit:
+            spilled = self._spill(val)
+            pickleability = _PICKLEABLE if spilled is not None else _UNPICKLEABLE
 
-                return
+        if spilled is not None:
+            val = spilled  # pickling the value already snapshots it
 
-            self._value_indices_by_hash[h] = len(self.values)
+        else:
+            if snapshot is not None:
+                val = snapshot(val)
+
+            if self.memory_limit is not None:
+                self._memory_usage += estimate_size(val)
 
         if timestamp is None:
             timestamp = self.counter.get_value()
 
-        self.values.append((val, timestamp, event))
+        index = self._append(val, timestamp, event, h, pickleability, type_names)
+        self._index_fingerprint(index, h)
+
+        return index
+
+    def _get_row(self, index: int) -> Tuple[Any, int, int, bytes]:
+        """
+        Return the value, timestamp, event code, and stored fingerprint (which is all zeros if it
+        hasn't been computed) of the row at the specified index.
+        """
+        return (
+            self._get_object(index),
+            self._timestamps[index],
+            self._event_codes[index],
+            self._fingerprints.get_bytes(index),
+        )
+
+    def _add_row(self, val: Any, timestamp: int, code: int, h: bytes) -> int:
+        """
+        Append a row returned by :py:meth:`_get_row` and return its index.
+        """
+        # rows are only received if their values could be pickled
+        index = self._append(val, timestamp, _EVENTS_BY_CODE[code], h, _PICKLEABLE)
+        self._index_fingerprint(index, h)
+        return index
+
+    def _index_fingerprint(self, index: int, h: Optional[bytes]) -> None:
+        """
+        Index the row at the specified index by its fingerprint, or record that the values of its
+        type aren't all indexed if its fingerprint hasn't been computed.
+        """
+        if h is None or h == _NULL_FINGERPRINT:
+            self._unindexed_type_codes.add(self._type_codes[index])
+        else:
+            self._value_indices_by_hash.setdefault(h, index)
+
+    def _update_event_code(self, index: int, code: int) -> None:
+        """
+        Combine an event code with the code of the row at the specified index.
+        """
+        self._event_codes[index] |= code
+
+    def _spill(self, val: Any) -> Optional[SpilledValue]:
+        """
+        Append a value to the segment file, creating it if needed, and return its placeholder, or
+        ``None`` if the value can't be pickled.
+        """
+        if self._segment is None:
+            self._segment = SegmentFile(self.spill_dir)
+
+        try:
+            return self._segment.dump(val)
+        except Exception:
+            return None
+
+    def _get_object(self, index: int, cache: bool = True) -> Any:
+        """
+        Return the value at the specified index, loading it from the segment file or the lazy
+        container it's stored in if necessary. Values loaded from lazy containers replace their
+        placeholders unless ``cache`` is false.
+        """
+        val = self._objects[index]
+        if type(val) is SpilledValue:
+            val = self._segment.load(val)
+        elif type(val) is LazyValue:
+            val = val.load()
+            if cache:
+                self._objects[index] = val
+        return val
+
+    def _lazy_copy(self, blobs: Any) -> "MemoryFootprint":
+        """
+        Return a copy of this footprint whose values and executed notebook are dumped to the blobs
+        of a lazy container (see :py:func:`dump_lazy<pybryt.utils.dump_lazy>`).
+        """
+        copy = type(self).__new__(type(self))
+        copy.__dict__.update(self.__dict__)
+        copy._objects = [blobs.dump(self._get_object(i, cache=False)) for i in range(len(self))]
+        copy._segment = None
+        copy._scalar_index = None
+        copy._array_index = None
+        copy._array_stacks = {}
+        if self._executed_notebook is not None:
+            copy._executed_notebook = blobs.dump(self.executed_notebook)
+        return copy
+
+    @property
+    def num_unloaded(self) -> int:
+        """
+        ``int``: the number of values stored in a lazy container that haven't been loaded
+        """
+        return sum(type(v) is LazyValue for v in self._objects)
+
+    def get_type_name(self, index: int) -> str:
+        """
+        Get the qualified name of the type of the value at the specified index without loading it.
+
+        Args:
+            index (``int``): the index
+
+        Returns:
+            ``str``: the name of the type, including its module
+        """
+        return self._type_names[self._type_codes[index]][0]
+
+    def get_indices_by_type(self, predicate: Callable[[Tuple[str, ...]], bool]) -> List[int]:
+        """
+        Get the indices of the values whose types satisfy a predicate without loading them.
+
+        The predicate is called once for each type of value in the footprint with the qualified
+        names (see :py:meth:`get_type_name`) of the type and its base classes, in method resolution
+        order. Annotations use this to only check the values that could satisfy them.
+
+        Args:
+            predicate (``callable[[tuple[str]], bool]``): the predicate
+
+        Returns:
+            ``list[int]``: the indices, in ascending order
+        """
+        groups = [
+            self._indices_by_type[code] for code, type_names in enumerate(self._type_names)
+            if code in self._indices_by_type and predicate(type_names)
+        ]
+        if len(groups) == 1:
+            return list(groups[0])
+        return sorted(chain.from_iterable(groups))
+
+    def get_index_of_fingerprint(self, h: bytes) -> Optional[int]:
+        """
+        Look up the index of the first value with the specified fingerprint.
+
+        Values are indexed by their fingerprints when they're added with :py:meth:`add_value` or
+        combined with :py:meth:`combine`. Values added by :py:meth:`from_values` or without being
+        fingerprinted (e.g. with ``allow_duplicates``) are not indexed; use
+        :py:meth:`are_fingerprints_indexed` to check whether all values of a type are.
+
+        Args:
+            h (``bytes``): the fingerprint
+
+        Returns:
+            ``int`` or ``None``: the index, or ``None`` if no indexed value has the fingerprint
+        """
+        return self._value_indices_by_hash.get(h)
+
+    def are_fingerprints_indexed(self, type_: type) -> bool:
+        """
+        Determine whether all values whose type is exactly ``type_`` are indexed by their
+        fingerprints (see :py:meth:`get_index_of_fingerprint`).
+
+        Args:
+            type_ (``type``): the type
+
+        Returns:
+            ``bool``: whether all values of the type are indexed
+        """
+        return self._type_codes_by_names.get(_get_type_names(type_)) not in \
+            self._unindexed_type_codes
+
+    def _get_scalar_index(self) -> Tuple[np.ndarray, np.ndarray, List[int], int]:
+        """
+        Return the index of the real scalar values, building it if values were added since it was
+        last built.
+        """
+        if self._scalar_index is not None and self._scalar_index[3] == len(self):
+            return self._scalar_index
+
+        values, indices, inexact = [], [], []
+        is_real_scalar = lambda type_names: type_names[0] in _REAL_SCALAR_TYPE_NAMES
+        for i in self.get_indices_by_type(is_real_scalar):
+            val = self._get_object(i)
+            if isinstance(val, _LOW_PRECISION_FLOAT_TYPES) or \
+                    not isinstance(val, (float, np.floating)) and \
+                    not -_MAX_EXACT_INTEGER <= val <= _MAX_EXACT_INTEGER:
+                inexact.append(i)
+            elif val == val:  # NaNs aren't equal to any value
+                values.append(float(val))
+                indices.append(i)
+
+        order = np.argsort(values, kind="stable")
+        self._scalar_index = (
+            np.array(values, dtype=np.float64)[order],
+            np.array(indices, dtype=np.int64)[order],
+            inexact,
+            len(self),
+        )
+        return self._scalar_index
+
+    def get_indices_in_range(self, lb: float, ub: float) -> List[int]:
+        """
+        Get the indices of the real scalar values (see :py:data:`REAL_SCALAR_TYPES`) in a closed
+        interval.
+
+        The values are found by binary search in a sorted index, which is built the first time it's
+        needed after values are added. Values that can't be compared exactly as double-precision
+        floats (large integers and NumPy half- and single-precision floats) are always included.
+
+        Args:
+            lb (``float``): the lower bound of the interval
+            ub (``float``): the upper bound of the interval
+
+        Returns:
+            ``list[int]``: the indices, in ascending order
+        """
+        values, indices, inexact, _ = self._get_scalar_index()
+        start, stop = np.searchsorted(values, lb, "left"), np.searchsorted(values, ub, "right")
+        return sorted(indices[start:stop].tolist() + inexact)
+
+    def _get_array_index(self) -> Tuple[
+        Dict[Tuple[Tuple[int, ...], np.dtype], List[int]], Dict[Tuple[int, ...], List[int]], int]:
+        """
+        Return the index of the arrays by shape and dtype, building it and discarding any stacked
+        arrays if values were added since it was last built.
+        """
+        if self._array_index is not None and self._array_index[2] == len(self):
+            return self._array_index
+
+        buckets, others = {}, {}
+        is_array = lambda type_names: type_names[0] == _NDARRAY_TYPE_NAME
+        for i in self.get_indices_by_type(is_array):
+            arr = self._get_object(i)
+            if arr.dtype.kind in _NUMERIC_DTYPE_KINDS:
+                buckets.setdefault((arr.shape, arr.dtype), []).append(i)
+            else:
+                others.setdefault(arr.shape, []).append(i)
+
+        self._array_index = (buckets, others, len(self))
+        self._array_stacks = {}
+        return self._array_index
+
+    def get_stacked_arrays(
+        self,
+        shape: Tuple[int, ...],
+    ) -> Tuple[List[Tuple[np.ndarray, List[int]]], List[int]]:
+        """
+        Get the NumPy arrays with the specified shape, with those of the same numeric dtype stacked
+        along a new first axis so that they can be compared to another array at once.
+
+        Only instances of ``numpy.ndarray`` itself are included. The stacks are cached until values
+        are added to or removed from the footprint.
+
+        Args:
+            shape (``tuple[int]``): the shape of the arrays
+
+        Returns:
+            ``tuple[list[tuple[numpy.ndarray, list[int]]], list[int]]``: the stacks and the indices
+            of the arrays in each, in ascending order, and the indices of the arrays with
+            non-numeric dtypes, which aren't stacked
+        """
+        buckets, others, _ = self._get_array_index()
+        shape = tuple(shape)
+        if shape not in self._array_stacks:
+            self._array_stacks[shape] = [
+                (np.stack([self._get_object(i) for i in indices]), indices)
+                for (s, _), indices in buckets.items() if s == shape
+            ]
+        return self._array_stacks[shape], list(others.get(shape, []))
+
+    def get_indices_of_type(self, type_: type) -> List[int]:
+        """
+        Get the indices of the values that may be instances of a type without loading them.
+
+        Types are matched by their qualified names, so values whose type has the same name as
+        ``type_`` or one of its subclasses but is a different class are also included; callers
+        should check the values with ``isinstance``. If ``type_`` customizes instance checks (e.g.
+        if it's an abstract base class), all indices are returned.
+
+        Args:
+            type_ (``type``): the type
+
+        Returns:
+            ``list[int]``: the indices, in ascending order
+        """
+        if type(type_).__instancecheck__ is not type.__instancecheck__:
+            return list(range(len(self)))
+
+        name = get_type_name(type_)
+        return self.get_indices_by_type(lambda type_names: name in type_names)
+
+    @property
+    def num_spilled(self) -> int:
+        """
+        ``int``: the number of values stored on disk
+        """
+        return sum(type(v) is SpilledValue for v in self._objects)
 
     def get_value(self, index: int) -> MemoryFootprintValue: # TODO: change name??
         """
@@ -266,7 +945,78 @@ class MemoryFootprint:
         Returns:
             :py:class:`MemoryFootprintValue`: the value
         """
-        return MemoryFootprintValue(*self.values[index])
+        return MemoryFootprintValue(
+            self._get_object(index),
+            self._timestamps[index],
+            _EVENTS_BY_CODE[self._event_codes[index]],
+        )
+
+    def get_fingerprint(self, index: int) -> bytes:
+        """
+        Get the fingerprint of the value at the specified index, computing it if necessary.
+
+        Args:
+            index (``int``): the index
+
+        Returns:
+            ``bytes``: the fingerprint
+
+        Raises:
+            :py:class:`pybryt.utils.UnpickleableError`: if the value cannot be fingerprinted
+        """
+        h = self._fingerprints.get_bytes(index)
+        if h == _NULL_FINGERPRINT:
+            if index < 0:
+                index += len(self)
+            try:
+                h = fingerprint(self._get_object(index))
+            except UnpickleableError:
+                self._pickleability[index] = _UNPICKLEABLE
+                raise
+
+            for i, b in enumerate(h):
+                self._fingerprints[index * FINGERPRINT_SIZE + i] = b
+            self._pickleability[index] = _PICKLEABLE
+        return h
+
+    @property
+    def objects(self) -> List[Any]:
+        """
+        ``list[object]``: the observed values, with placeholders for values spilled to disk; this
+        list should not be modified
+        """
+        return self._objects
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """
+        ``numpy.ndarray``: a read-only view of the timestamps of the values
+        """
+        return self._timestamps.view()
+
+    @property
+    def event_codes(self) -> np.ndarray:
+        """
+        ``numpy.ndarray``: a read-only view of the codes (see :py:data:`EVENT_CODES`) of the events
+        that produced the values
+        """
+        return self._event_codes.view()
+
+    @property
+    def fingerprints(self) -> np.ndarray:
+        """
+        ``numpy.ndarray``: a read-only view of the fingerprints of the values as rows of bytes;
+        rows are all zeros if the fingerprint hasn't been computed (see :py:meth:`get_fingerprint`)
+        """
+        return self._fingerprints.view()
+
+    @property
+    def values(self) -> List[Tuple[Any, int, Optional[Event]]]:
+        """
+        ``list[tuple[object, int, Event]]``: the values, timestamps, and event types in the
+        footprint; this list is created each time it is accessed
+        """
+        return [tuple(v.to_list()) for v in self]
 
     def add_call(self, filename: str, fn_name: str) -> None:
         """
@@ -287,6 +1037,16 @@ class MemoryFootprint:
         """
         self.imports.update(modules)
 
+    @property
+    def executed_notebook(self) -> Optional[nbformat.NotebookNode]:
+        """
+        ``nbformat.NotebookNode``: the final (pre-processed) notebook that was executed, with
+        outputs
+        """
+        if type(self._executed_notebook) is LazyValue:
+            self._executed_notebook = self._executed_notebook.load()
+        return self._executed_notebook
+
     def set_executed_notebook(self, nb: nbformat.NotebookNode) -> None:
         """
         Set the executed notebook of this memory footprint.
@@ -294,18 +1054,47 @@ class MemoryFootprint:
         Args:
             nb (``nbformat.NotebookNode``): the notebook
         """
-        self.executed_notebook = nb
+        self._executed_notebook = nb
 
     def filter_out_unpickleable_values(self) -> None:
         """
-        Filter any unpickleable objects out of the list of value-timestamp tuples in-place.
+        Filter any unpickleable objects out of the values in-place.
+
+        Only values whose pickleability wasn't already determined when they were fingerprinted or
+        spilled to disk are pickled to check them.
         """
-        filter_pickleable_list(self.values)
+        unknown = np.flatnonzero(self._pickleability.view() == _PICKLEABILITY_UNKNOWN).tolist()
+        rows = [(i, self._objects[i]) for i in unknown]
+        filter_pickleable_list(rows)
+        pickleable = {i for i, _ in rows}
+        for i in unknown:
+            self._pickleability[i] = _PICKLEABLE if i in pickleable else _UNPICKLEABLE
+
+        indices = np.flatnonzero(self._pickleability.view() == _PICKLEABLE).tolist()
+        if len(indices) == len(self._objects):
+            return
+
+        new_indices = {old: new for new, old in enumerate(indices)}
+        self._value_indices_by_hash = {
+            h: new_indices[i] for h, i in self._value_indices_by_hash.items() if i in new_indices}
+        self._objects = [self._objects[i] for i in indices]
+        for col in (self._timestamps, self._event_codes, self._fingerprints, self._pickleability,
+                self._type_codes):
+            col.take(indices)
+
+        self._indices_by_type = {}
+        self._scalar_index = None
+        self._array_index = None
+        for i, code in enumerate(self._type_codes.view().tolist()):
+            self._indices_by_type.setdefault(code, []).append(i)
+        timestamps = self._timestamps.view()
+        self._max_timestamp = int(timestamps.max()) if len(timestamps) else -1
 
     def clear(self) -> None:
         """
+        Remove all values from the memory footprint.
         """
-        self.values.clear()
+        self._init_columns()
 
     def set_initial_conditions(self, initial_conditions: Dict[str, Any]) -> None:
         """
@@ -330,11 +1119,10 @@ class MemoryFootprint:
         """
         ``int``: the total number of steps this implementation took
         """
-        timestamps = [t[1] for t in self.values]
-        return max(timestamps) if len(timestamps) else -1
+        return self._max_timestamp
 
     def __len__(self):
-        return len(self.values)
+        return len(self._objects)
 
     def __iter__(self):
         return MemoryFootprintIterator(self)
@@ -349,7 +1137,9 @@ class MemoryFootprint:
         return isinstance(other, type(self)) and self.calls == other.calls \
             and self.imports == other.imports \
             and self.executed_notebook == other.executed_notebook \
-            and pickle_and_hash(self.values) == pickle_and_hash(other.values)
+            and np.array_equal(self.timestamps, other.timestamps) \
+            and np.array_equal(self.event_codes, other.event_codes) \
+            and all(self.get_fingerprint(i) == other.get_fingerprint(i) for i in range(len(self)))
 
 
 class MemoryFootprintIterator:
@@ -0,0 +1,316 @@
+"""Tracing backend built on ``sys.monitoring`` (PEP 669) for Python 3.12+"""
+
+import sys
+
+from bisect import bisect_right
+from types import CodeType, FrameType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+ACTIVE_COLLECTOR = None
+TOOL_NAME = "pybryt"
+
+
+def is_monitoring_available() -> bool:
+    """
+    Return whether the ``sys.monitoring`` API is available in this version of Python.
+
+    Returns:
+        ``bool``: whether ``sys.monitoring`` is available
+    """
+    return hasattr(sys, "monitoring")
+
+
+def get_active_monitoring_collector() -> Optional["MonitoringCollector"]:
+    """
+    Return the monitoring collector that is currently enabled, if any.
+
+    Returns:
+        :py:class:`MonitoringCollector` or ``None``: the enabled collector
+    """
+    return ACTIVE_COLLECTOR
+
+
+class MonitoringCollector:
+    """
+    A tracing backend that drives a PyBryt trace function with ``sys.monitoring`` events.
+
+    ``sys.settrace`` calls the trace function for every line of every frame, including frames in
+    library code that PyBryt never inspects. This backend instead listens for function starts
+    globally and only enables line and return events on the code objects of traced frames, so
+    library code runs without line events. Each event is translated into its ``sys.settrace``
+    equivalent and passed to the trace function created by
+    :py:func:`create_collector<pybryt.execution.tracing.create_collector>`, so the memory footprint
+    is the same as the one produced by ``sys.settrace``.
+
+    The events that ``sys.settrace`` generates differently from ``sys.monitoring`` are emulated the
+    same way CPython implements ``sys.settrace`` on top of ``sys.monitoring``: backward jumps to
+    the same line (like the iterations of a loop written on one line) generate line events,
+    ``PY_THROW`` events (a generator resumed by ``throw`` or ``close``) generate call events, and
+    ``STOP_ITERATION`` events generate exception events.
+
+    Args:
+        trace_func (``callable[[frame, str, object], callable]``): the trace function to drive
+        is_traced_frame (``callable[[frame], bool]``): a function that determines whether a frame
+            is being traced
+        is_return_target (``callable[[frame], bool]``, optional): a function that determines
+            whether the return values of untraced frames called by a frame should be tracked
+
+    Raises:
+        ``RuntimeError``: if ``sys.monitoring`` is not available
+    """
+
+    trace_func: Callable[[FrameType, str, Any], Any]
+    """the trace function being driven"""
+
+    is_traced_frame: Callable[[FrameType], bool]
+    """a function that determines whether a frame is being traced"""
+
+    is_return_target: Optional[Callable[[FrameType], bool]]
+    """
+    a function that determines whether the return values of untraced frames called by a frame
+    should be tracked
+    """
+
+    tool_id: Optional[int]
+    """the ``sys.monitoring`` tool ID in use while this collector is enabled"""
+
+    _instrumented: List[CodeType]
+    """the code objects that have had local events enabled"""
+
+    _line_tables: Dict[CodeType, Tuple[List[int], List[Optional[int]]]]
+    """
+    the start offsets of the instruction ranges of code objects and their line numbers, keyed on
+    the code objects
+    """
+
+    def __init__(
+        self,
+        trace_func: Callable[[FrameType, str, Any], Any],
+        is_traced_frame: Callable[[FrameType], bool],
+        is_return_target: Optional[Callable[[FrameType], bool]] = None,
+    ):
+        if not is_monitoring_available():
+            raise RuntimeError("The sys.monitoring tracing backend requires Python 3.12 or later")
+
+        self.trace_func = trace_func
+        self.is_traced_frame = is_traced_frame
+        self.is_return_target = is_return_target
+        self.tool_id = None
+        self._instrumented = []
+        self._line_tables = {}
+
+    @property
+    def enabled(self) -> bool:
+        """
+        ``bool``: whether this collector is currently receiving events
+        """
+        return self.tool_id is not None
+
+    @staticmethod
+    def _get_free_tool_id() -> int:
+        """
+        Find a ``sys.monitoring`` tool ID that is not in use, preferring IDs that are not reserved
+        for debuggers, coverage tools, profilers, or optimizers.
+
+        Returns:
+            ``int``: the tool ID
+
+        Raises:
+            ``RuntimeError``: if all tool IDs are in use
+        """
+        for tool_id in (3, 4, 0, 1, 2, 5):
+            if sys.monitoring.get_tool(tool_id) is None:
+                return tool_id
+        raise RuntimeError("No free sys.monitoring tool IDs are available")
+
+    def _instrument(self, code: CodeType, events: int) -> None:
+        """
+        Enable local events on a code object if they are not already enabled.
+
+        Args:
+            code (``types.CodeType``): the code object
+            events (``int``): the events to enable
+        """
+        current = sys.monitoring.get_local_events(self.tool_id, code)
+        if current | events != current:
+            if current == 0:
+                self._instrumented.append(code)
+            sys.monitoring.set_local_events(self.tool_id, code, current | events)
+
+    def _get_line(self, code: CodeType, instruction_offset: int) -> Optional[int]:
+        """
+        Return the line number of the instruction at an offset in a code object.
+
+        Args:
+            code (``types.CodeType``): the code object
+            instruction_offset (``int``): the offset of the instruction
+
+        Returns:
+            ``int`` or ``None``: the line number, or ``None`` if the instruction has no line number
+        """
+        table = self._line_tables.get(code)
+        if table is None:
+            starts, lines = [], []
+            for start, _, line in code.co_lines():
+                starts.append(start)
+                lines.append(line)
+            table = self._line_tables[code] = (starts, lines)
+
+        i = bisect_right(table[0], instruction_offset) - 1
+        return table[1][i] if i >= 0 else None
+
+    def _start(self, frame: FrameType, code: CodeType) -> None:
+        """
+        Report a call event for a frame that is starting or resuming, and enable the local events
+        needed for it on its code object.
+
+        Args:
+            frame (``types.FrameType``): the frame
+            code (``types.CodeType``): the code object executing in the frame
+        """
+        self.trace_func(frame, "call", None)
+
+        if self.is_traced_frame(frame):
+            self._instrument(code, self._get_traced_events())
+
+        elif self.is_return_target is not None and frame.f_back is not None and \
+                self.is_return_target(frame.f_back):
+            E = sys.monitoring.events
+            self._instrument(code, E.PY_RETURN | E.PY_YIELD)
+
+    def _handle_start(self, code: CodeType, instruction_offset: int) -> None:
+        """
+        Callback for ``PY_START`` and ``PY_RESUME`` events.
+        """
+        self._start(sys._getframe(1), code)
+
+    def _handle_throw(self, code: CodeType, instruction_offset: int, exception: BaseException) -> None:
+        """
+        Callback for ``PY_THROW`` events, which ``sys.settrace`` reports as calls.
+        """
+        self._start(sys._getframe(1), code)
+
+    def _handle_line(self, code: CodeType, line_number: int) -> None:
+        """
+        Callback for ``LINE`` events.
+        """
+        self.trace_func(sys._getframe(1), "line", None)
+
+    def _handle_jump(self, code: CodeType, instruction_offset: int, destination_offset: int) -> Any:
+        """
+        Callback for ``JUMP`` events. ``sys.settrace`` generates a line event for every backward
+        jump, but ``LINE`` events are only generated when the line changes, so backward jumps to
+        the same line are reported as line events here. Other jumps are disabled.
+        """
+        if destination_offset > instruction_offset:
+            return sys.monitoring.DISABLE
+
+        line = self._get_line(code, destination_offset)
+        if line is None or line != self._get_line(code, instruction_offset):
+            return sys.monitoring.DISABLE
+
+        self.trace_func(sys._getframe(1), "line", None)
+
+    def _handle_return(self, code: CodeType, instruction_offset: int, retval: Any) -> None:
+        """
+        Callback for ``PY_RETURN`` and ``PY_YIELD`` events.
+        """
+        self.trace_func(sys._getframe(1), "return", retval)
+
+    def _handle_raise(self, code: CodeType, instruction_offset: int, exception: BaseException) -> None:
+        """
+        Callback for ``RAISE`` and ``STOP_ITERATION`` events.
+        """
+        self.trace_func(
+            sys._getframe(1), "exception", (type(exception), exception, exception.__traceback__))
+
+    def _handle_unwind(self, code: CodeType, instruction_offset: int, exception: BaseException) -> None:
+        """
+        Callback for ``PY_UNWIND`` events, which ``sys.settrace`` reports as a return of ``None``.
+        """
+        self.trace_func(sys._getframe(1), "return", None)
+
+    @staticmethod
+    def _get_traced_events() -> int:
+        """
+        Return the local events enabled on the code objects of traced frames.
+
+        Returns:
+            ``int``: the events
+        """
+        E = sys.monitoring.events
+        return E.LINE | E.JUMP | E.PY_RETURN | E.PY_YIELD | E.STOP_ITERATION
+
+    def _get_callbacks(self) -> List[Tuple[int, Callable[..., None]]]:
+        """
+        Return the ``sys.monitoring`` events this collector listens for and their callbacks.
+
+        Returns:
+            ``list[tuple[int, callable]]``: the events and callbacks
+        """
+        E = sys.monitoring.events
+        return [
+            (E.PY_START, self._handle_start),
+            (E.PY_RESUME, self._handle_start),
+            (E.PY_THROW, self._handle_throw),
+            (E.LINE, self._handle_line),
+            (E.JUMP, self._handle_jump),
+            (E.PY_RETURN, self._handle_return),
+            (E.PY_YIELD, self._handle_return),
+            (E.RAISE, self._handle_raise),
+            (E.STOP_ITERATION, self._handle_raise),
+            (E.PY_UNWIND, self._handle_unwind),
+        ]
+
+    def enable(self, frame: Optional[FrameType] = None) -> None:
+        """
+        Start receiving events. If a frame is provided and it is being traced, line events are
+        enabled for the code currently executing in that frame.
+
+        Args:
+            frame (``types.FrameType``, optional): the frame in which tracing is being enabled
+        """
+        global ACTIVE_COLLECTOR
+
+        if self.enabled:
+            return
+
+        self.tool_id = self._get_free_tool_id()
+        sys.monitoring.use_tool_id(self.tool_id, TOOL_NAME)
+
+        for event, callback in self._get_callbacks():
+            sys.monitoring.register_callback(self.tool_id, event, callback)
+
+        E = sys.monitoring.events
+        sys.monitoring.set_events(
+            self.tool_id, E.PY_START | E.PY_RESUME | E.PY_THROW | E.RAISE | E.PY_UNWIND)
+
+        if frame is not None and self.is_traced_frame(frame):
+            self._instrument(frame.f_code, self._get_traced_events())
+
+        ACTIVE_COLLECTOR = self
+
+    def disable(self) -> None:
+        """
+        Stop receiving events, remove all local events, and release the tool ID.
+        """
+        global ACTIVE_COLLECTOR
+
+        if not self.enabled:
+            return
+
+        sys.monitoring.set_events(self.tool_id, 0)
+        for code in self._instrumented:
+            sys.monitoring.set_local_events(self.tool_id, code, 0)
+        self._instrumented.clear()
+        self._line_tables.clear()
+
+        for event, _ in self._get_callbacks():
+            sys.monitoring.register_callback(self.tool_id, event, None)
+
+        sys.monitoring.free_tool_id(self.tool_id)
+        self.tool_id = None
+
+        if ACTIVE_COLLECTOR is self:
+            ACTIVE_COLLECTOR = None
@@ -0,0 +1,81 @@
+"""Online checking of annotations while student code is being traced"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from .memory_footprint import MemoryFootprint
+
+
+OnlineCheck = Callable[[MemoryFootprint, int], bool]
+
+
+class OnlineChecker:
+    """
+    A checker that tests each value captured by the trace function against the leaf annotations of
+    one or more reference implementations to determine when the outcome of grading is decided.
+
+    Each annotation provides a list of online checks (functions that take the memory footprint and
+    the index of the value that was just added and return whether the check has been decided) or
+    ``None`` if its outcome can't be known until execution finishes (e.g. because it asserts that a
+    value is *not* present). Once every check is decided, no values captured afterwards can change
+    the results of running the references against the footprint, so the trace function stops
+    capturing values.
+
+    Only the annotations are pickled; the checks are recreated when the checker is unpickled.
+
+    Args:
+        annotations (``list[Annotation]``): the annotations to check
+    """
+
+    annotations: List[Any]
+    """the annotations being checked"""
+
+    _pending: Optional[List[OnlineCheck]]
+    """the checks that are not yet decided, or ``None`` if the outcome can't be decided early"""
+
+    def __init__(self, annotations: List[Any]):
+        self.annotations = annotations
+        self._pending = []
+        for ann in annotations:
+            checks = ann._get_online_checks()
+            if checks is None:
+                self._pending = None
+                break
+            self._pending.extend(checks)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"annotations": self.annotations}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["annotations"])
+
+    @property
+    def decidable(self) -> bool:
+        """
+        ``bool``: whether the outcome of the annotations can be decided before execution finishes
+        """
+        return self._pending is not None
+
+    @property
+    def decided(self) -> bool:
+        """
+        ``bool``: whether the outcome of the annotations has been decided
+        """
+        return self._pending is not None and len(self._pending) == 0
+
+    def update(self, footprint: MemoryFootprint, index: int) -> bool:
+        """
+        Run the pending checks against a value that was just added to the memory footprint.
+
+        Args:
+            footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the memory
+                footprint
+            index (``int``): the index of the value in the footprint
+
+        Returns:
+            ``bool``: whether the outcome of the annotations has been decided
+        """
+        if self._pending is None:
+            return False
+
+        self._pending = [c for c in self._pending if not c(footprint, index)]
+        return len(self._pending) == 0
@@ -0,0 +1,174 @@
+"""Append-only segment files for values spilled to disk by memory footprints"""
+
+import dill
+import mmap
+import os
+import sys
+import weakref
+import numpy as np
+import pandas as pd
+
+from pickle import PickleBuffer
+from tempfile import mkstemp
+from typing import Any, IO, Optional, Tuple, Union
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    Estimate the number of bytes of memory used by an object.
+
+    The estimate includes the data buffers of NumPy arrays and pandas objects and the immediate
+    elements of lists, tuples, sets, and dictionaries, but does not recurse any further.
+
+    Args:
+        obj (``object``): the object
+
+    Returns:
+        ``int``: the estimated size in bytes
+    """
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is not None else 0)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(sys.getsizeof(e) for e in obj)
+
+    return size
+
+
+class SpilledValue:
+    """
+    A placeholder for a value stored in a :py:class:`SegmentFile`.
+
+    Args:
+        offset (``int``): the offset of the pickled value in the segment file
+        length (``int``): the length of the pickled value
+    """
+
+    __slots__ = ("offset", "length")
+
+    offset: int
+    """the offset of the pickled value in the segment file"""
+
+    length: int
+    """the length of the pickled value"""
+
+    def __init__(self, offset: int, length: int):
+        self.offset = offset
+        self.length = length
+
+    def __getstate__(self):
+        return self.offset, self.length
+
+    def __setstate__(self, state):
+        self.offset, self.length = state
+
+
+def _close_and_remove(f: IO[bytes], path: str) -> None:
+    """
+    Close a file and remove it, ignoring errors.
+    """
+    try:
+        f.close()
+        os.remove(path)
+    except OSError:  # pragma: no cover
+        pass
+
+
+class SegmentFile:
+    """
+    An append-only temporary file of ``dill``-pickled values.
+
+    The file is removed when this object is garbage collected. When a segment file is pickled, its
+    contents are included in the pickle and written to a new temporary file when it is unpickled.
+    With pickle protocol 5, the contents are pickled as a buffer mapped from the file, so picklers
+    that store buffers out-of-band (like :py:func:`dump_out_of_band<pybryt.utils.dump_out_of_band>`)
+    copy them to their output without reading the whole file into memory.
+
+    Args:
+        dir (``str``, optional): the directory in which to create the file; defaults to the system
+            temporary directory
+    """
+
+    dir: Optional[str]
+    """the directory containing the file"""
+
+    path: str
+    """the path to the file"""
+
+    size: int
+    """the number of bytes written to the file"""
+
+    _file: IO[bytes]
+    """the open file"""
+
+    def __init__(self, dir: Optional[str] = None):
+        self.dir = dir
+        fd, self.path = mkstemp(prefix="pybryt-footprint-", suffix=".seg", dir=dir)
+        self._file = os.fdopen(fd, "w+b")
+        self.size = 0
+        weakref.finalize(self, _close_and_remove, self._file, self.path)
+
+    def __reduce_ex__(self, protocol: int) -> Tuple[Any, ...]:
+        if self.size == 0:
+            data = b""
+
+        elif protocol >= 5:
+            self._file.flush()
+            data = PickleBuffer(
+                mmap.mmap(self._file.fileno(), self.size, access=mmap.ACCESS_READ))
+
+        else:
+            self._file.seek(0)
+            data = self._file.read(self.size)
+
+        return _load_segment_file, (self.dir, data)
+
+    def dump(self, obj: Any) -> SpilledValue:
+        """
+        Pickle an object and append it to the file.
+
+        Args:
+            obj (``object``): the object
+
+        Returns:
+            :py:class:`SpilledValue`: a placeholder for loading the object
+
+        Raises:
+            ``Exception``: if the object can't be pickled
+        """
+        data = dill.dumps(obj)
+        self._file.seek(self.size)
+        self._file.write(data)
+        spilled = SpilledValue(self.size, len(data))
+        self.size += len(data)
+        return spilled
+
+    def load(self, spilled: SpilledValue) -> Any:
+        """
+        Load an object from the file.
+
+        Args:
+            spilled (:py:class:`SpilledValue`): the placeholder returned when the object was dumped
+
+        Returns:
+            ``object``: the object
+        """
+        self._file.seek(spilled.offset)
+        return dill.loads(self._file.read(spilled.length))
+
+
+def _load_segment_file(dir: Optional[str], data: Union[bytes, memoryview]) -> SegmentFile:
+    """
+    Create a segment file containing the contents of a pickled segment file.
+    """
+    segment = SegmentFile(dir)
+    segment._file.write(data)
+    segment.size = memoryview(data).nbytes
+    return segment
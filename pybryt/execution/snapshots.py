@@ -0,0 +1,113 @@
+"""Snapshot strategies for values captured by the trace function"""
+
+import numpy as np
+import pandas as pd
+
+from copy import copy, deepcopy
+from typing import Any, Callable, Dict, Set, Union
+
+
+IMMUTABLE_TYPES = (int, float, complex, bool, str, bytes, type(None), np.generic)
+
+
+def shallow_snapshot(val: Any) -> Any:
+    """
+    Snapshot a value by shallow-copying it with ``copy.copy``.
+
+    Args:
+        val (``object``): the value
+
+    Returns:
+        ``object``: the snapshot
+    """
+    return copy(val)
+
+
+def deep_snapshot(val: Any) -> Any:
+    """
+    Snapshot a value by deep-copying it with ``copy.deepcopy``.
+
+    Args:
+        val (``object``): the value
+
+    Returns:
+        ``object``: the snapshot
+    """
+    return deepcopy(val)
+
+
+def _buffer_snapshot(val: Any, active: Set[int]) -> Any:
+    """
+    Recursive helper for :py:func:`buffer_snapshot`.
+    """
+    if isinstance(val, IMMUTABLE_TYPES):
+        return val
+
+    if type(val) is np.ndarray:
+        return val.copy()
+
+    if isinstance(val, (pd.DataFrame, pd.Series, pd.Index)):
+        return val.copy(deep=True)
+
+    if type(val) in (list, tuple, dict):
+        if id(val) in active:
+            raise RecursionError()
+        active.add(id(val))
+        if type(val) is dict:
+            snapshot = {k: _buffer_snapshot(v, active) for k, v in val.items()}
+        else:
+            snapshot = type(val)(_buffer_snapshot(e, active) for e in val)
+        active.remove(id(val))
+        return snapshot
+
+    return copy(val)
+
+
+def buffer_snapshot(val: Any) -> Any:
+    """
+    Snapshot a value by copying the data buffers of any NumPy arrays and pandas objects it
+    contains.
+
+    Immutable scalars are not copied, arrays and pandas objects have their data copied, and lists,
+    tuples, and dictionaries are rebuilt with snapshots of their elements so that arrays stored
+    inside of them are also copied. All other objects are shallow-copied. Self-referential
+    containers are shallow-copied.
+
+    Args:
+        val (``object``): the value
+
+    Returns:
+        ``object``: the snapshot
+    """
+    try:
+        return _buffer_snapshot(val, set())
+    except RecursionError:
+        return copy(val)
+
+
+SNAPSHOT_STRATEGIES: Dict[str, Callable[[Any], Any]] = {
+    "shallow": shallow_snapshot,
+    "deep": deep_snapshot,
+    "buffer": buffer_snapshot,
+}
+
+
+def get_snapshot_strategy(strategy: Union[str, Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    """
+    Return the snapshot function for a snapshot strategy.
+
+    Args:
+        strategy (``str`` or ``callable[[object], object]``): the name of a strategy in
+            ``SNAPSHOT_STRATEGIES`` or a function that takes a value and returns a snapshot of it
+
+    Returns:
+        ``callable[[object], object]``: the snapshot function
+
+    Raises:
+        ``ValueError``: if the strategy name is invalid
+    """
+    if callable(strategy):
+        return strategy
+    if strategy not in SNAPSHOT_STRATEGIES:
+        raise ValueError(f"Invalid snapshot strategy: {strategy}")
+    return SNAPSHOT_STRATEGIES[strategy]
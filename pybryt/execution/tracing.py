@@ -4,26 +4,116 @@ import inspect
 import linecache
 import re
 
-from copy import copy
-from types import FrameType, FunctionType, ModuleType
-from typing import Any, Dict, List, Optional, Tuple, Callable
+from functools import lru_cache
+from types import CodeType, FrameType, FunctionType, ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+from .capture_filter import CaptureFilter
 from .complexity import is_complexity_tracing_enabled
+from .fingerprints import FingerprintCache
 from .memory_footprint import Event, MemoryFootprint
+from .online import OnlineChecker
+from .monitoring import get_active_monitoring_collector, is_monitoring_available, MonitoringCollector
+from .snapshots import get_snapshot_strategy
+from .transport import FootprintSender
 from .utils import is_ipython_frame
 
-from ..utils import make_secret, pickle_and_hash, UnpickleableError
+from ..utils import make_secret
 
 
 ACTIVE_FOOTPRINT = None
 TRACING_FUNC = None
 TRACING_VARNAME = "__PYBRYT_TRACING__"
+TRACING_BACKENDS = {"settrace", "monitoring"}
+TRACING_SCOPES = {"all", "student"}
+LINE_INFO_CACHE_SIZE = 16384
+
+ASSIGNMENT_REGEX = re.compile(r"^\s*(\w+)(\[[^\]]\]|(\.\w+)+)*\s=.*")
+
+
+class LineInfo:
+    """
+    The tokens of a single line of source code that the trace function needs to inspect.
+
+    Tokens are stored in sorted order for stable ordering of the values they produce. Each token is
+    paired with a compiled expression if it is a dotted attribute access (e.g. ``data.T``) that must
+    be evaluated in the frame, or ``None`` if it is a plain name that can be looked up in the
+    frame's locals or globals.
+
+    Args:
+        line (``str``): the line of source code
+    """
+
+    __slots__ = ("tokens", "assignment_target")
+
+    tokens: Tuple[Tuple[str, Optional[CodeType]], ...]
+    """the tokens of the line and the compiled expressions for dotted tokens"""
+
+    assignment_target: Optional[str]
+    """the name of the variable assigned to by this line, if any"""
+
+    def __init__(self, line: str):
+        names = set("".join(char if char.isalnum() or char == '_' else "\n" for char in line).split("\n"))
+        for t in "".join(char if char.isalnum() or char == '_' or char == '.' else "\n" for char in line).split("\n"):
+            names.add(t)
+
+        tokens = []
+        for t in sorted(names):  # sort for stable ordering
+            if "." in t:
+                try:
+                    float(t)  # prevent adding floats prematurely
+                    continue
+                except ValueError:
+                    pass
+
+                try:
+                    tokens.append((t, compile(t, "<pybryt>", "eval")))
+                except SyntaxError:
+                    pass
+
+            elif t.isidentifier():
+                tokens.append((t, None))
+
+        self.tokens = tuple(tokens)
+
+        m = ASSIGNMENT_REGEX.match(line)
+        self.assignment_target = m.group(1) if m else None
+
+
+@lru_cache(maxsize=LINE_INFO_CACHE_SIZE)
+def get_line_info(filename: str, lineno: int) -> LineInfo:
+    """
+    Return the tokens of a line of source code, reading and tokenizing the line only the first time
+    it is requested.
+
+    The results are kept in a bounded LRU cache so that lines executed repeatedly (e.g. in loops)
+    are only tokenized once. The cache is keyed on the filename rather than the code object because
+    code objects recompute their hash on each lookup, while filename strings cache theirs. Use
+    ``get_line_info.cache_clear()`` to reset the cache.
+
+    Args:
+        filename (``str``): the filename of the code being traced
+        lineno (``int``): the line number
+
+    Returns:
+        :py:class:`LineInfo`: the tokens of the line
+    """
+    return LineInfo(linecache.getline(filename, lineno))
 
 
 def create_collector(
     skip_types: List[type] = [type, type(len), FunctionType],
     addl_filenames: List[str] = [],
-) -> Tuple[MemoryFootprint, Callable[[FrameType, str, Any], Callable]]:
+    backend: str = "settrace",
+    scope: str = "all",
+    library_call_cost: Union[int, Callable[[FrameType], int]] = 1,
+    snapshot: Union[str, Callable[[Any], Any]] = "shallow",
+    capture_filter: Optional[CaptureFilter] = None,
+    online_checker: Optional[OnlineChecker] = None,
+    memory_limit: Optional[int] = None,
+    spill_dir: Optional[str] = None,
+    sender: Optional[FootprintSender] = None,
+) -> Tuple[MemoryFootprint, Union[Callable[[FrameType, str, Any], Callable], MonitoringCollector]]:
     """
     Creates a memory footprint to collect observed values and a trace function.
 
@@ -32,30 +122,117 @@ def create_collector(
     ``addl_filenames`` argument, which should be a list absolute paths to files that should also be
     traced inside of.
 
+    The ``backend`` argument determines how the trace function receives events. The default,
+    ``"settrace"``, uses ``sys.settrace``. On Python 3.12+, ``"monitoring"`` uses
+    ``sys.monitoring`` to only generate line events inside of traced code, which avoids the cost of
+    tracing library code; in this case, a
+    :py:class:`MonitoringCollector<pybryt.execution.monitoring.MonitoringCollector>` wrapping the
+    trace function is returned instead of the trace function itself.
+
+    The ``scope`` argument determines which frames receive a local trace function. With the default,
+    ``"all"``, every frame is traced line-by-line, even though only lines in traced files are
+    inspected. With ``"student"``, frames outside of the traced files are not traced locally: their
+    calls are still recorded and the return values of frames called from files in
+    ``addl_filenames`` are still tracked, but the lines inside them never reach the trace function.
+    Because the lines of these frames are no longer seen, the step counter is instead charged
+    ``library_call_cost`` steps for each call, which can be an integer or a function that takes the
+    frame of the call and returns the number of steps to charge.
+
+    The ``snapshot`` argument determines how values are copied before being stored in the memory
+    footprint. Values are only copied if they are not already in the footprint. The available
+    strategies are ``"shallow"`` (the default), ``"deep"``, and ``"buffer"``, which copies the data
+    of NumPy arrays and pandas objects (see :py:mod:`pybryt.execution.snapshots`); a function that
+    takes a value and returns a copy of it can also be provided.
+
+    If a ``capture_filter`` is provided (e.g. one created with
+    :py:meth:`ReferenceImplementation.get_capture_filter<pybryt.ReferenceImplementation.get_capture_filter>`),
+    values it rejects are dropped before they are copied or fingerprinted, and ``line`` events are
+    not inspected at all if the filter doesn't need them. Imports and calls are tracked regardless.
+
+    If an ``online_checker`` is provided (e.g. one created with
+    :py:meth:`ReferenceImplementation.get_online_checker<pybryt.ReferenceImplementation.get_online_checker>`),
+    each value is checked against it as it is added to the footprint. Once the checker reports that
+    the outcome of grading is decided, the trace function switches to a counting-only mode in which
+    it only increments the step counter and records calls.
+
+    If ``memory_limit`` is set, values captured after the footprint's values use that many bytes
+    are spilled to a temporary file in ``spill_dir`` (see
+    :py:class:`MemoryFootprint<pybryt.execution.memory_footprint.MemoryFootprint>`).
+
+    If a ``sender`` is provided, the footprint is streamed through it as values are added (see
+    :py:class:`FootprintSender<pybryt.execution.transport.FootprintSender>`).
+
     Args:
         skip_types (``list[type]``, optional): object types not to track
         addl_filenames (``list[str]``, optional): filenames to trace inside of in addition to 
             IPython
+        backend (``str``, optional): the tracing backend to use; one of ``{"settrace",
+            "monitoring"}``
+        scope (``str``, optional): the frames to trace locally; one of ``{"all", "student"}``
+        library_call_cost (``int`` or ``callable[[frame], int]``, optional): the number of steps
+            charged to the step counter for each call outside of the traced files when ``scope`` is
+            ``"student"``
+        snapshot (``str`` or ``callable[[object], object]``, optional): the strategy used to copy
+            new values; one of ``{"shallow", "deep", "buffer"}`` or a function
+        capture_filter (:py:class:`CaptureFilter<pybryt.execution.capture_filter.CaptureFilter>`,
+            optional): a filter for the values to track
+        online_checker (:py:class:`OnlineChecker<pybryt.execution.online.OnlineChecker>`,
+            optional): a checker used to stop capturing values once grading is decided
+        memory_limit (``int``, optional): the number of bytes of values to keep in memory before
+            spilling new values to disk
+        spill_dir (``str``, optional): the directory in which to store spilled values
+        sender (:py:class:`FootprintSender<pybryt.execution.transport.FootprintSender>`,
+            optional): a sender to stream the footprint through
         
     Returns:
         ``tuple[MemoryFootprint, callable[[frame, str, object], callable]]``: the memory footprint
-        and the trace function
+        and the trace function (or the monitoring collector driving it)
+
+    Raises:
+        ``ValueError``: if the backend, scope, or snapshot strategy is invalid or the backend is
+            unavailable in this version of Python
     """
     global ACTIVE_FOOTPRINT
+
+    if backend not in TRACING_BACKENDS:
+        raise ValueError(f"Invalid tracing backend: {backend}")
+    if backend == "monitoring" and not is_monitoring_available():
+        raise ValueError("The 'monitoring' tracing backend requires Python 3.12 or later")
+    if scope not in TRACING_SCOPES:
+        raise ValueError(f"Invalid tracing scope: {scope}")
+    snapshot = get_snapshot_strategy(snapshot)
+
     vars_not_found: Dict[str, List[Tuple[str, str, int]]] = {}
-    footprint = MemoryFootprint()
+    footprint = MemoryFootprint(memory_limit=memory_limit, spill_dir=spill_dir)
+    fingerprint_cache = FingerprintCache()
+    track_lines = capture_filter is None or capture_filter.track_lines
+    decided = online_checker is not None and online_checker.decided
+
+    def is_traced_frame(frame: FrameType) -> bool:
+        """
+        Determines whether a frame is in student code that is being traced.
+
+        Args:
+            frame (``types.FrameType``): the frame
+
+        Returns:
+            ``bool``: whether the frame is being traced
+        """
+        return is_ipython_frame(frame) or frame.f_code.co_filename in addl_filenames
 
     def track_value(val: Any, event_name: str, seen_at: Optional[int] = None):
         """
         Tracks a value in ``footprint``. Checks that the value has not already been tracked by 
-        pickling it and hashing the pickled object and comparing it to ``hashes``. If pickling is
-        unsuccessful, the value is not tracked.
+        comparing its fingerprint to those of the values in the footprint, and only takes a snapshot
+        of it if it is new. Fingerprints of unchanged objects are reused from ``fingerprint_cache``.
+        If fingerprinting is unsuccessful, the value is not tracked.
 
         Args:
             val (``object``): the object to be tracked
             event_name (``str``): the event name provided by ``sys.settrace``
             seen_at (``int``, optional): an overriding step counter value
         """
+        nonlocal decided
         try:
             if hasattr(val, "__module__"):
                 footprint.add_imports(val.__module__.split(".")[0])
@@ -67,8 +244,19 @@ def create_collector(
                 footprint.add_imports(val.__name__.split(".")[0])
                 return
 
+            if capture_filter is not None and not capture_filter.accepts(val):
+                return
+
             event = Event.from_event_name(event_name)
-            footprint.add_value(copy(val), seen_at, event)
+            index = footprint.add_value(
+                val, seen_at, event, snapshot=snapshot,
+                value_hash=fingerprint_cache.get_fingerprint(val))
+
+            if sender is not None:
+                sender.update(footprint, index)
+
+            if online_checker is not None and online_checker.update(footprint, index):
+                decided = True
 
         # if something fails, don't track
         except:
@@ -83,62 +271,80 @@ def create_collector(
         """
         footprint.add_call(frame.f_code.co_filename, frame.f_code.co_name)
 
+    def charge_library_call(frame: FrameType):
+        """
+        Charges the step counter for a call outside of the traced files.
+
+        Args:
+            frame (``types.FrameType``): the frame of the call
+        """
+        cost = library_call_cost(frame) if callable(library_call_cost) else library_call_cost
+        if cost:
+            footprint.offset_counter(cost)
+
+    def collect_library_return(frame: FrameType, event: str, arg: Any):
+        """
+        Local trace function for untraced frames whose return values are tracked when ``scope`` is
+        ``"student"``.
+        """
+        if event == "return" and not decided and not is_complexity_tracing_enabled():
+            track_value(arg, event)
+        return collect_library_return
+
     # TODO: a way to track the cell of execution
     def collect_intermidiate_results(frame: FrameType, event: str, arg: Any):
         """
         Trace function for PyBryt.
         """
-        if is_ipython_frame(frame) or frame.f_code.co_filename in addl_filenames:
+        traced = is_traced_frame(frame)
+        if traced:
             footprint.increment_counter()  # increment student code step counter
 
         if event == "call":
             track_call(frame)
+            if scope == "student" and not traced:
+                charge_library_call(frame)
+                if frame.f_back is not None and frame.f_back.f_code.co_filename in addl_filenames:
+                    frame.f_trace_lines = False  # only the return event is needed
+                    return collect_library_return
+                return None
             return collect_intermidiate_results
 
         # return if tracking is disabled by a compelxity check
         if is_complexity_tracing_enabled():
             return collect_intermidiate_results
 
+        if decided or (event == "line" and not track_lines):
+            return collect_intermidiate_results
+
         name = frame.f_code.co_filename + frame.f_code.co_name
 
-        if is_ipython_frame(frame) or frame.f_code.co_filename in addl_filenames:
+        if traced:
             if event == "line" or event == "return":
 
-                line = linecache.getline(frame.f_code.co_filename, frame.f_lineno)
-                tokens = set("".join(char if char.isalnum() or char == '_' else "\n" for char in line).split("\n"))
-                for t in "".join(char if char.isalnum() or char == '_' or char == '.' else "\n" for char in line).split("\n"):
-                    tokens.add(t)
-                tokens = sorted(tokens)  # sort for stable ordering
-                
-                for t in tokens:
-                    if "." in t:
-                        try:
-                            float(t)  # prevent adding floats prematurely
-                            continue
-                        except ValueError:
-                            pass
-
+                line_info = get_line_info(frame.f_code.co_filename, frame.f_lineno)
+                for t, expr in line_info.tokens:
+                    if expr is not None:
                         try:
-                            val = eval(t, frame.f_globals, frame.f_locals)
+                            val = eval(expr, frame.f_globals, frame.f_locals)
                             track_value(val, event)
                         except:
                             pass
 
-                    else:
-                        if t in frame.f_locals:
-                            val = frame.f_locals[t]
-                            track_value(val, event)
-                                
-                        elif t in frame.f_globals:
-                            val = frame.f_globals[t]
-                            track_value(val, event)
-                
+                    elif t in frame.f_locals:
+                        val = frame.f_locals[t]
+                        track_value(val, event)
+
+                    elif t in frame.f_globals:
+                        val = frame.f_globals[t]
+                        track_value(val, event)
+
                 # for tracking the results of an assignment statement
-                m = re.match(r"^\s*(\w+)(\[[^\]]\]|(\.\w+)+)*\s=.*", line)
-                if m:
+                if line_info.assignment_target is not None:
                     if name not in vars_not_found:
                         vars_not_found[name] = []
-                    vars_not_found[name].append((m.group(1), event, footprint.counter.get_value()))
+                    vars_not_found[name].append(
+                        (line_info.assignment_target, event, footprint.counter.get_value()))
 
             if event == "return":
                 track_value(arg, event)
@@ -161,6 +367,14 @@ def create_collector(
         return collect_intermidiate_results
 
     ACTIVE_FOOTPRINT = footprint
+
+    if backend == "monitoring":
+        return footprint, MonitoringCollector(
+            collect_intermidiate_results,
+            is_traced_frame,
+            is_return_target=lambda frame: frame.f_code.co_filename in addl_filenames,
+        )
+
     return footprint, collect_intermidiate_results
 
 
@@ -202,6 +416,14 @@ def tracing_off(frame=None, save_func=True):
     frame = get_tracing_frame() if frame is None else frame
     if frame is None:
         return
+
+    monitoring_collector = get_active_monitoring_collector()
+    if monitoring_collector is not None:
+        if save_func:
+            TRACING_FUNC = monitoring_collector
+        monitoring_collector.disable()
+        return
+
     if save_func:
         TRACING_FUNC = frame.f_trace
     vn = f"sys_{make_secret()}"
@@ -236,6 +458,9 @@ def tracing_on(frame=None, tracing_func=None):
         return
     if TRACING_FUNC is not None and tracing_func is None:
         tracing_func = TRACING_FUNC
+    if isinstance(tracing_func, MonitoringCollector):
+        tracing_func.enable(frame)
+        return
     vn = f"cir_{make_secret()}"
     vn2 = f"sys_{make_secret()}"
     frame.f_globals[vn] = tracing_func
@@ -0,0 +1,287 @@
+"""Streaming of memory footprints out of notebook kernels over a local socket"""
+
+import dill
+import hmac
+import socket
+import struct
+import threading
+
+from typing import Any, List, Optional, Tuple
+
+from .memory_footprint import Counter, MemoryFootprint
+
+from ..utils import make_secret
+
+
+STREAM_CHUNK_SIZE = 1024
+
+_HEADER = struct.Struct("!Q")
+
+
+def _send_frame(sock: socket.socket, data: bytes) -> None:
+    """
+    Send a length-prefixed frame over a socket.
+    """
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(sock: socket.socket, n: int) -> Optional[bytes]:
+    """
+    Receive exactly ``n`` bytes from a socket, or return ``None`` if the socket is closed first.
+    """
+    buf = bytearray()
+    while len(buf) < n:
+        data = sock.recv(min(n - len(buf), 1 << 20))
+        if not data:
+            return None
+        buf += data
+    return bytes(buf)
+
+
+def _recv_frame(sock: socket.socket) -> Optional[bytes]:
+    """
+    Receive a length-prefixed frame from a socket, or return ``None`` if the socket is closed.
+    """
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    return _recv_exactly(sock, _HEADER.unpack(header)[0])
+
+
+class FootprintSender:
+    """
+    Streams the rows of a memory footprint to a :py:class:`FootprintReceiver` while it is being
+    populated.
+
+    The trace function calls :py:meth:`update` each time it adds a value to the footprint. New rows
+    and changes to the events of rows that were already sent are buffered and sent in chunks of
+    ``chunk_size`` records, so that serialization overlaps with execution. Values that can't be
+    pickled are skipped. :py:meth:`close` sends any remaining rows and the footprint's calls,
+    imports, initial conditions, and step counter.
+
+    Args:
+        address (``tuple[str, int]``): the address of the receiver
+        token (``str``): the token used to authenticate with the receiver
+        chunk_size (``int``, optional): the number of records to send at once
+    """
+
+    chunk_size: int
+    """the number of records to send at once"""
+
+    _socket: socket.socket
+    """the connection to the receiver"""
+
+    _buffer: List[Tuple[Any, ...]]
+    """the records that have not been sent yet"""
+
+    _codes: bytearray
+    """the most recent event codes of the rows that have been buffered"""
+
+    def __init__(self, address: Tuple[str, int], token: str, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._socket = socket.create_connection(address)
+        _send_frame(self._socket, token.encode())
+        self._buffer = []
+        self._codes = bytearray()
+
+    def update(self, footprint: MemoryFootprint, index: Optional[int] = None) -> None:
+        """
+        Buffer the rows added to a footprint since the last update, as well as the event of the
+        row at ``index`` if it has changed, sending them if the buffer is full.
+
+        Args:
+            footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the
+                footprint
+            index (``int``, optional): the index of a row whose event may have changed
+        """
+        if index is not None and index < len(self._codes):
+            self._update_code(footprint, index)
+
+        for i in range(len(self._codes), len(footprint)):
+            row = footprint._get_row(i)
+            self._codes.append(row[2])
+            self._buffer.append(("row", i, *row))
+
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def _update_code(self, footprint: MemoryFootprint, index: int) -> None:
+        """
+        Buffer the event code of a row that was already buffered if it has changed.
+        """
+        code = footprint._event_codes[index]
+        if code != self._codes[index]:
+            self._codes[index] = code
+            self._buffer.append(("event", index, code))
+
+    def flush(self) -> None:
+        """
+        Send the buffered records.
+        """
+        if not self._buffer:
+            return
+
+        try:
+            data = dill.dumps(self._buffer)
+        except Exception:
+            # pickle the records one-by-one to drop those containing unpickleable values
+            records = []
+            for record in self._buffer:
+                try:
+                    records.append(dill.dumps(record))
+                except Exception:
+                    records.append(dill.dumps(("skip", record[1])))
+            data = dill.dumps([dill.loads(r) for r in records])
+
+        _send_frame(self._socket, data)
+        self._buffer.clear()
+
+    def close(self, footprint: MemoryFootprint) -> None:
+        """
+        Send any remaining rows and changed events and the rest of the footprint's data, and close
+        the connection.
+
+        Args:
+            footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the
+                footprint
+        """
+        self.update(footprint)
+        for i in range(len(self._codes)):
+            self._update_code(footprint, i)
+
+        self._buffer.append((
+            "meta",
+            footprint.calls,
+            footprint.imports,
+            footprint.initial_conditions,
+            footprint.counter.get_value(),
+        ))
+        self.flush()
+        self._socket.close()
+
+
+class FootprintReceiver:
+    """
+    Receives a memory footprint streamed by a :py:class:`FootprintSender` and rebuilds it
+    incrementally in a background thread.
+
+    The receiver listens on a local port and accepts a single connection presenting its
+    :py:attr:`token`. If the sender stops before sending the rest of the footprint's data (e.g.
+    because the kernel died), the rows received so far are kept.
+
+    Args:
+        memory_limit (``int``, optional): the memory limit of the rebuilt footprint (see
+            :py:class:`MemoryFootprint<pybryt.execution.memory_footprint.MemoryFootprint>`)
+    """
+
+    token: str
+    """the token the sender must present"""
+
+    footprint: MemoryFootprint
+    """the footprint being rebuilt"""
+
+    _server: socket.socket
+    """the listening socket"""
+
+    _indices: List[Optional[int]]
+    """the indices in :py:attr:`footprint` of the rows received, keyed by the sender's indices"""
+
+    _stopped: threading.Event
+    """an event set to stop waiting for a connection"""
+
+    _thread: threading.Thread
+    """the thread receiving the footprint"""
+
+    def __init__(self, memory_limit: Optional[int] = None):
+        self.token = make_secret(32)
+        self.footprint = MemoryFootprint(memory_limit=memory_limit)
+        self._indices = []
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(1)
+        self._server.settimeout(0.1)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """
+        ``tuple[str, int]``: the address that the receiver is listening on
+        """
+        return self._server.getsockname()
+
+    def _accept(self) -> Optional[socket.socket]:
+        """
+        Wait for an authenticated connection until one is made or the receiver is stopped.
+        """
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                # only give up once no connection is pending
+                if self._stopped.is_set():
+                    return None
+                continue
+
+            conn.settimeout(None)
+            token = _recv_frame(conn)
+            if token is not None and hmac.compare_digest(token, self.token.encode()):
+                return conn
+            conn.close()
+
+    def _receive(self) -> None:
+        """
+        Accept a connection and rebuild the footprint from the records received over it.
+        """
+        conn = self._accept()
+        self._server.close()
+        if conn is None:
+            return
+
+        with conn:
+            while True:
+                data = _recv_frame(conn)
+                if data is None:
+                    break
+                for record in dill.loads(data):
+                    self._handle_record(record)
+
+    def _handle_record(self, record: Tuple[Any, ...]) -> None:
+        """
+        Apply a record received from the sender to the footprint.
+        """
+        kind = record[0]
+        if kind == "row":
+            _, index, val, timestamp, code, h = record
+            self._indices.extend([None] * (index + 1 - len(self._indices)))
+            self._indices[index] = self.footprint._add_row(val, timestamp, code, h)
+
+        elif kind == "event":
+            _, index, code = record
+            if index < len(self._indices) and self._indices[index] is not None:
+                self.footprint._update_event_code(self._indices[index], code)
+
+        elif kind == "meta":
+            _, calls, imports, initial_conditions, counter = record
+            self.footprint.calls.extend(calls)
+            self.footprint.add_imports(*imports)
+            self.footprint.set_initial_conditions(initial_conditions)
+            self.footprint.counter = Counter(counter)
+
+        # "skip" records hold the indices of rows whose values couldn't be pickled
+
+    def get_footprint(self, timeout: Optional[float] = None) -> MemoryFootprint:
+        """
+        Stop waiting for a connection if none has been made, wait for the footprint to be received,
+        and return it.
+
+        Args:
+            timeout (``float``, optional): the number of seconds to wait for the footprint
+
+        Returns:
+            :py:class:`pybryt.execution.memory_footprint.MemoryFootprint`: the footprint
+        """
+        self._stopped.set()
+        self._thread.join(timeout)
+        return self.footprint
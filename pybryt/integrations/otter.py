@@ -17,7 +17,7 @@ from typing import Any, Dict, List, Optional, Union
 
 from .. import ReferenceImplementation, StudentImplementation
 from ..execution import NBFORMAT_VERSION
-from ..utils import save_notebook
+from ..utils import dumps_out_of_band, load_out_of_band, loads_out_of_band, save_notebook
 
 
 class OtterPlugin(AbstractOtterPlugin):
@@ -82,7 +82,7 @@ class OtterPlugin(AbstractOtterPlugin):
             # if during_assign was run, this should be the same
             refs = self._cached_refs
         
-        refs = base64.b64encode(dill.dumps(refs)).decode("ascii")
+        refs = base64.b64encode(dumps_out_of_band(refs)).decode("ascii")
         otter_config["plugins"][cfg_idx][self.IMPORTABLE_NAME]["reference_bytes"] = refs
 
         if assignment is not None:
@@ -175,8 +175,7 @@ class OtterPlugin(AbstractOtterPlugin):
 
         refs = []
         for rp in ref_paths:
-            with open(rp, "rb") as f:
-                ref = dill.load(f)
+            ref = load_out_of_band(rp)
             # ref = ReferenceImplementation.load(rp)
             if isinstance(ref, ReferenceImplementation):
                 refs.append(ref)
@@ -223,7 +222,7 @@ class OtterPlugin(AbstractOtterPlugin):
         """
         if self._student_impl is None:
             ref_bytes = base64.b64decode(self.plugin_config["reference_bytes"])
-            refs = dill.loads(ref_bytes)
+            refs = loads_out_of_band(bytearray(ref_bytes))
             self._generate_impl_report(refs)
         
         self._cache_student_impl(results, self._student_impl)
@@ -238,7 +237,7 @@ class OtterPlugin(AbstractOtterPlugin):
         """
         if self._generated_report is None:
             ref_bytes = base64.b64decode(self.plugin_config["reference_bytes"])
-            refs = dill.loads(ref_bytes)
+            refs = loads_out_of_band(bytearray(ref_bytes))
             self._generate_impl_report(refs)
         
         return self._generated_report
@@ -42,12 +42,10 @@ def get_impl_results(ref_impl: ReferenceImplementation, student_impls: List["Stu
     #         ref_results.append(stu.check(ref))
     #     results.append(ref_results)
 
-    results = []
-    for stu in student_impls:
-        results.append(stu.check(ref_impl))
+    matrix, results = ref_impl.run_many(student_impls, workers=kwargs.get("workers"))
     
     if arr:
-        return np.array([r.to_array() for r in results])
+        return matrix
     else:
         return results
 
@@ -2,6 +2,9 @@
 
 __all__ = ["ReferenceImplementation", "ReferenceResult", "generate_report"]
 
+import dill
+import io
+import multiprocessing as mp
 import nbformat
 import numpy as np
 import os
@@ -9,10 +12,12 @@ import warnings
 
 from copy import deepcopy
 from textwrap import indent
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from .annotations import Annotation, AnnotationResult
-from .execution import MemoryFootprint
+from .annotations.context import (
+    _LazyAnnotationResult, check_annotation, check_context, CheckContext, resolve_placeholders)
+from .execution import CaptureFilter, MemoryFootprint, OnlineChecker
 from .utils import get_stem, notebook_to_string, Serializable
 
 
@@ -24,6 +29,9 @@ class ReferenceImplementation(Serializable):
     Args:
         name (``str``): the name of the reference implementation
         annotations (``list[Annotation]``): the annotations comprising this reference implementation
+        display_name (``str``, optional): a name to use for this reference in text reports
+        short_circuit (``bool``, optional): whether to run this reference in short-circuit mode by
+            default (see :py:meth:`run`)
     """
     
     annotations: List[Annotation]
@@ -35,7 +43,16 @@ class ReferenceImplementation(Serializable):
     display_name: Optional[str]
     """a name to use for this reference in text reports generated by PyBryt"""
 
-    def __init__(self, name: str, annotations: List[Annotation], display_name: Optional[str] = None):
+    short_circuit: bool = False
+    """whether to run this reference in short-circuit mode by default"""
+
+    def __init__(
+        self,
+        name: str,
+        annotations: List[Annotation],
+        display_name: Optional[str] = None,
+        short_circuit: bool = False,
+    ):
         if not isinstance(annotations, list):
             raise TypeError("annotations should be a list of Annotations")
         if not all(isinstance(ann, Annotation) for ann in annotations):
@@ -56,6 +73,7 @@ class ReferenceImplementation(Serializable):
 
         self.name = name
         self.display_name = display_name
+        self.short_circuit = short_circuit
 
     def __eq__(self, other: Any) -> bool:
         """
@@ -104,20 +122,15 @@ class ReferenceImplementation(Serializable):
         else:
             return annots
 
-    def run(self, footprint: MemoryFootprint, group: Optional[str] = None) -> 'ReferenceResult':        
+    def _get_annotations(self, group: Optional[str] = None) -> List[Annotation]:
         """
-        Runs the annotations tracked by this reference implementation against a memory footprint.
-
-        Can run only specific annotations by specifying the ``group`` argument. Returns a 
-        :py:class:`ReferenceResult<pybryt.ReferenceResult>` object.
+        Return the annotations in a group, or all annotations if no group is specified.
 
         Args:
-            footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the
-                memory footprint to check against
-            group (``str``, optional): if specified, only annotations in this group will be run
+            group (``str``, optional): the group name
 
         Returns:
-            :py:class:`ReferenceResult<pybryt.ReferenceResult>`: the results of this check
+            ``list[Annotation]``: the annotations
 
         Raises:
             ``ValueError``: if ``group`` is specified but there are no annotations with that group
@@ -132,13 +145,254 @@ class ReferenceImplementation(Serializable):
         
         else:
             annots = self.annotations
+
+        return annots
+
+    def get_capture_filter(self, group: Optional[str] = None) -> CaptureFilter:
+        """
+        Creates a capture filter that accepts only values that could satisfy the annotations in
+        this reference implementation.
+
+        The filter can be passed to :py:func:`create_collector<pybryt.execution.create_collector>`
+        (e.g. through :py:class:`check<pybryt.check>` or 
+        :py:class:`StudentImplementation<pybryt.StudentImplementation>`) to avoid capturing values
+        that can't affect the results of running this reference.
+
+        Args:
+            group (``str``, optional): if specified, only annotations in this group are considered
+
+        Returns:
+            :py:class:`CaptureFilter<pybryt.execution.capture_filter.CaptureFilter>`: the filter
+
+        Raises:
+            ``ValueError``: if ``group`` is specified but there are no annotations with that group
+        """
+        capture_filter = CaptureFilter()
+        for ann in self._get_annotations(group):
+            ann._update_capture_filter(capture_filter)
+        return capture_filter
+
+    def get_online_checker(self, group: Optional[str] = None) -> OnlineChecker:
+        """
+        Creates an online checker for the annotations in this reference implementation.
+
+        The checker can be passed to :py:func:`create_collector<pybryt.execution.create_collector>`
+        (e.g. through :py:class:`check<pybryt.check>` or 
+        :py:class:`StudentImplementation<pybryt.StudentImplementation>`) to stop capturing values
+        once no more values can change the results of running this reference.
+
+        Args:
+            group (``str``, optional): if specified, only annotations in this group are considered
+
+        Returns:
+            :py:class:`OnlineChecker<pybryt.execution.online.OnlineChecker>`: the checker
+
+        Raises:
+            ``ValueError``: if ``group`` is specified but there are no annotations with that group
+        """
+        return OnlineChecker(self._get_annotations(group))
+
+    def precompute(self) -> None:
+        """
+        Compute the parts of checking the annotations in this reference that don't depend on the
+        memory footprint being checked, like the values produced by applying the invariants of
+        :py:class:`Value<pybryt.Value>` annotations to their values and the fingerprints of those
+        values.
+
+        The results are stored on the annotations, so they're saved when this reference is pickled
+        and aren't recomputed when it's loaded and run. References created by :py:meth:`compile`
+        are precomputed.
+        """
+        for ann in self.annotations:
+            ann._precompute()
+
+    def run(
+        self,
+        footprint: MemoryFootprint,
+        group: Optional[str] = None,
+        short_circuit: Optional[bool] = None,
+        workers: Optional[int] = None,
+    ) -> 'ReferenceResult':
+        """
+        Runs the annotations tracked by this reference implementation against a memory footprint.
+
+        Can run only specific annotations by specifying the ``group`` argument. Returns a 
+        :py:class:`ReferenceResult<pybryt.ReferenceResult>` object.
+
+        In short-circuit mode, annotations like :py:class:`AndAnnotation<pybryt.AndAnnotation>` and
+        :py:class:`OrAnnotation<pybryt.OrAnnotation>` stop checking their children once their
+        results are decided. The results of the skipped children are computed when they're first
+        accessed, e.g. to generate the messages in a report, so determining whether annotations are
+        satisfied (e.g. with :py:attr:`ReferenceResult.correct<pybryt.ReferenceResult.correct>` or
+        :py:meth:`ReferenceResult.to_array<pybryt.ReferenceResult.to_array>`) does less work.
+        Until the results of the skipped children are accessed or the result is pickled, the result
+        keeps a reference to the memory footprint, so the footprint stays in memory as long as the
+        result does.
+
+        Args:
+            footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the
+                memory footprint to check against
+            group (``str``, optional): if specified, only annotations in this group will be run
+            short_circuit (``bool``, optional): whether to run in short-circuit mode; defaults to
+                :py:attr:`short_circuit`
+            workers (``int``, optional): if greater than 1, the number of processes to check the
+                annotations in (see :py:meth:`_run_parallel`)
+
+        Returns:
+            :py:class:`ReferenceResult<pybryt.ReferenceResult>`: the results of this check
+
+        Raises:
+            ``ValueError``: if ``group`` is specified but there are no annotations with that group
+        """
+        annots = self._get_annotations(group)
         
+        # annotations share the values produced by applying invariants to the footprint's values,
+        # and annotations that are children of several others are only checked once
+        if short_circuit is None:
+            short_circuit = self.short_circuit
+
+        if workers is not None and workers > 1 and len(annots) > 1:
+            results = self._run_parallel(footprint, group, short_circuit, workers)
+            return ReferenceResult(self, results, group=group)
+
         results = []
-        for exp in annots:
-            results.append(exp.check(footprint))
+        with check_context(footprint) as context:
+            previous, context.short_circuit = context.short_circuit, short_circuit
+            try:
+                for exp in annots:
+                    results.append(check_annotation(exp, footprint))
+            finally:
+                context.short_circuit = previous
         
         return ReferenceResult(self, results, group=group)
 
+    def _run_parallel(
+        self,
+        footprint: MemoryFootprint,
+        group: Optional[str],
+        short_circuit: bool,
+        workers: int,
+    ) -> List[AnnotationResult]:
+        """
+        Check the annotations in a group against a memory footprint in a pool of processes.
+
+        The annotations are split into contiguous shards, one per process, so that annotations
+        that share children are likely to be checked in the same process. This reference and the
+        footprint are pickled with ``dill`` and sent to each process once, when it starts, using the
+        platform's default start method. The results are pickled with references to the annotations
+        in this reference instead of copies of them, so the merged results are for this
+        reference's annotations.
+
+        Args:
+            footprint (:py:class:`pybryt.execution.memory_footprint.MemoryFootprint`): the
+                memory footprint to check against
+            group (``str`` or ``None``): the group of annotations to check
+            short_circuit (``bool``): whether to run in short-circuit mode
+            workers (``int``): the number of processes
+
+        Returns:
+            ``list[AnnotationResult]``: the results of the annotations, in order
+        """
+        num_annots = len(self._get_annotations(group))
+        shards = [
+            s.tolist() for s in np.array_split(np.arange(num_annots), min(workers, num_annots))]
+
+        with mp.get_context().Pool(
+            len(shards),
+            initializer=_init_parallel_run,
+            initargs=(dill.dumps((self, footprint, group, short_circuit)),),
+        ) as pool:
+            pickled_shards = pool.map(_run_parallel_shard, shards)
+
+        # results of annotations that were skipped in short-circuit mode are checked on demand
+        context = CheckContext(footprint)
+        annots = _get_all_annotations(self.annotations)
+        results = []
+        for pickled_results in pickled_shards:
+            results.extend(_load_results(pickled_results, annots, context))
+
+        return results
+
+    def run_many(
+        self,
+        footprints_or_paths: List[Union[MemoryFootprint, "StudentImplementation", str]],
+        group: Optional[str] = None,
+        short_circuit: Optional[bool] = None,
+        workers: Optional[int] = None,
+        callback: Optional[Callable[[int, "ReferenceResult"], None]] = None,
+    ) -> Tuple[np.ndarray, List["ReferenceResult"]]:
+        """
+        Runs this reference implementation against the memory footprints of a cohort of students.
+
+        Footprints can be provided as memory footprints, student implementations, or paths to
+        pickled student implementations or to notebooks to execute. Paths are loaded (or executed)
+        by the process that checks them, so only one footprint per process is in memory at a time.
+
+        If ``workers`` is greater than 1, footprints are checked in a pool of that many processes,
+        each of which receives this reference once, and results are passed to ``callback`` in the
+        order they complete. The results of annotations skipped in short-circuit mode are computed
+        as soon as each footprint is checked, so the results don't keep the footprints in memory.
+
+        Args:
+            footprints_or_paths (``list[Union[MemoryFootprint, StudentImplementation, str]]``): the
+                footprints to check
+            group (``str``, optional): if specified, only annotations in this group will be run
+            short_circuit (``bool``, optional): whether to run in short-circuit mode; defaults to
+                :py:attr:`short_circuit`
+            workers (``int``, optional): if greater than 1, the number of processes to check
+                footprints in
+            callback (``callable[[int, ReferenceResult], None]``, optional): a function called
+                with the index of each footprint and its result as soon as it's checked
+
+        Returns:
+            ``tuple[numpy.ndarray, list[ReferenceResult]]``: a matrix with a row for each footprint
+            and a column for each annotation indicating whether it was satisfied (see
+            :py:meth:`ReferenceResult.to_array<pybryt.ReferenceResult.to_array>`), and the results
+            for each footprint
+
+        Raises:
+            ``ValueError``: if ``group`` is specified but there are no annotations with that group
+            ``TypeError``: if any of the footprints is of an unsupported type
+        """
+        annots = self._get_annotations(group)
+        for fp in footprints_or_paths:
+            _check_cohort_footprint_type(fp)
+
+        if short_circuit is None:
+            short_circuit = self.short_circuit
+
+        results = [None] * len(footprints_or_paths)
+        if workers is None or workers <= 1 or len(footprints_or_paths) <= 1:
+            for i, fp in enumerate(footprints_or_paths):
+                results[i] = self.run(_load_cohort_footprint(fp), group, short_circuit)
+
+                # placeholders would keep every footprint in memory until the run is over
+                results[i].results = resolve_placeholders(results[i].results)
+                if callback is not None:
+                    callback(i, results[i])
+
+        else:
+            # footprints are pickled with dill, since processes that aren't forked receive their
+            # tasks pickled with the standard library's pickler; paths are loaded by the workers
+            tasks = ((i, fp if isinstance(fp, str) else dill.dumps(fp)) \
+                for i, fp in enumerate(footprints_or_paths))
+
+            all_annots = _get_all_annotations(self.annotations)
+            with mp.get_context().Pool(
+                min(workers, len(footprints_or_paths)),
+                initializer=_init_parallel_run,
+                initargs=(dill.dumps((self, None, group, short_circuit)),),
+            ) as pool:
+                for i, pickled_results in pool.imap_unordered(_run_cohort_footprint, tasks):
+                    annot_results = _load_results(pickled_results, all_annots, None)
+                    results[i] = ReferenceResult(self, annot_results, group=group)
+                    if callback is not None:
+                        callback(i, results[i])
+
+        matrix = np.array([r.to_array() for r in results], dtype=int).reshape(
+            len(results), len(annots))
+        return matrix, results
+
     @classmethod
     def compile(
         cls,
@@ -190,7 +444,10 @@ class ReferenceImplementation(Serializable):
                 refs = [cls(name, deepcopy(Annotation.get_tracked_annotations()), **kwargs)]
 
         Annotation.reset_tracked_annotations()
-        
+
+        for ref in refs:
+            ref.precompute()
+
         if len(refs) == 1:
             return refs[0]
         return refs
@@ -205,6 +462,225 @@ class ReferenceImplementation(Serializable):
         return self.display_name if self.display_name is not None else self.name
 
 
+_PARALLEL_RUN = None
+
+
+def _get_all_annotations(annotations: List[Annotation]) -> List[Annotation]:
+    """
+    Get the annotations in a forest of annotations and their descendants, each listed once in the
+    order they're first visited by a depth-first traversal.
+
+    Args:
+        annotations (``list[Annotation]``): the roots of the forest
+
+    Returns:
+        ``list[Annotation]``: the annotations
+    """
+    visited, all_annots = set(), []
+    stack = list(reversed(annotations))
+    while stack:
+        ann = stack.pop()
+        if id(ann) in visited:
+            continue
+
+        visited.add(id(ann))
+        all_annots.append(ann)
+        stack.extend(reversed(ann.children))
+
+    return all_annots
+
+
+class _ResultPickler(dill.Pickler):
+    """
+    A pickler for annotation results that pickles the annotations of a reference and placeholders
+    for their results by their indices in :py:func:`_get_all_annotations`.
+
+    Args:
+        file (file-like object): the file to write to
+        annotations (``list[Annotation]``): the annotations in the reference
+        keep_placeholders (``bool``, optional): whether to pickle placeholders instead of the
+            results they stand in for
+    """
+
+    _indices: Dict[int, int]
+    """the indices of the annotations, keyed by their IDs"""
+
+    _keep_placeholders: bool
+    """whether to pickle placeholders instead of the results they stand in for"""
+
+    def __init__(
+        self, file: io.BytesIO, annotations: List[Annotation], keep_placeholders: bool = True
+    ):
+        super().__init__(file)
+        self._indices = {id(ann): i for i, ann in enumerate(annotations)}
+        self._keep_placeholders = keep_placeholders
+
+    def persistent_id(self, obj: Any) -> Optional[Tuple[str, int]]:
+        if isinstance(obj, _LazyAnnotationResult):
+            if not self._keep_placeholders:
+                return None
+            index = self._indices.get(id(obj.annotation))
+            return None if index is None else ("lazy", index)
+
+        if isinstance(obj, Annotation):
+            index = self._indices.get(id(obj))
+            return None if index is None else ("annotation", index)
+
+        return None
+
+
+class _ResultUnpickler(dill.Unpickler):
+    """
+    An unpickler for annotation results pickled with :py:class:`_ResultPickler`.
+
+    Args:
+        file (file-like object): the file to read from
+        annotations (``list[Annotation]``): the annotations in the reference
+        context (:py:class:`pybryt.annotations.context.CheckContext` or ``None``): the context
+            in which to check the annotations whose results are placeholders, if they were pickled
+    """
+
+    _annotations: List[Annotation]
+    """the annotations in the reference"""
+
+    _context: Optional[CheckContext]
+    """the context in which to check the annotations whose results are placeholders"""
+
+    def __init__(
+        self, file: io.BytesIO, annotations: List[Annotation], context: Optional[CheckContext]
+    ):
+        super().__init__(file)
+        self._annotations = annotations
+        self._context = context
+
+    def persistent_load(self, pid: Tuple[str, int]) -> Any:
+        kind, index = pid
+        if kind == "lazy":
+            return _LazyAnnotationResult(self._annotations[index], self._context)
+        return self._annotations[index]
+
+
+def _load_results(
+    pickled_results: bytes,
+    annotations: List[Annotation],
+    context: Optional[CheckContext],
+) -> List[AnnotationResult]:
+    """
+    Unpickle annotation results pickled with :py:class:`_ResultPickler`.
+
+    Args:
+        pickled_results (``bytes``): the pickled results
+        annotations (``list[Annotation]``): the annotations in the reference
+        context (:py:class:`pybryt.annotations.context.CheckContext` or ``None``): the context
+            in which to check the annotations whose results are placeholders, if they were pickled
+
+    Returns:
+        ``list[AnnotationResult]``: the results
+    """
+    return _ResultUnpickler(io.BytesIO(pickled_results), annotations, context).load()
+
+
+def _init_parallel_run(pickled_args: bytes) -> None:
+    """
+    Store the arguments of a parallel run in a worker process.
+
+    The reference, footprint, group, and short-circuit mode are pickled with ``dill`` by the parent
+    process, since processes that aren't forked receive their initializer arguments pickled with
+    the standard library's pickler, which can't pickle annotations with e.g. lambda
+    ``equivalence_fn`` arguments.
+
+    Args:
+        pickled_args (``bytes``): the pickled arguments
+    """
+    global _PARALLEL_RUN
+    _PARALLEL_RUN = dill.loads(pickled_args)
+
+
+def _run_parallel_shard(indices: List[int]) -> bytes:
+    """
+    Check a shard of the annotations of a parallel run in a worker process.
+
+    Args:
+        indices (``list[int]``): the indices of the annotations to check
+
+    Returns:
+        ``bytes``: the results, pickled with :py:class:`_ResultPickler`
+    """
+    ref, footprint, group, short_circuit = _PARALLEL_RUN
+    annots = ref._get_annotations(group)
+    with check_context(footprint) as context:
+        context.short_circuit = short_circuit
+        results = [check_annotation(annots[i], footprint) for i in indices]
+
+    f = io.BytesIO()
+    _ResultPickler(f, _get_all_annotations(ref.annotations)).dump(results)
+    return f.getvalue()
+
+
+def _check_cohort_footprint_type(footprint_or_path: Any) -> None:
+    """
+    Check that a footprint passed to :py:meth:`ReferenceImplementation.run_many` is of a supported
+    type.
+
+    Args:
+        footprint_or_path (``object``): the footprint
+
+    Raises:
+        ``TypeError``: if the footprint is of an unsupported type
+    """
+    if not isinstance(footprint_or_path, (MemoryFootprint, StudentImplementation, str)):
+        raise TypeError(f"run_many cannot take values of type {type(footprint_or_path)}")
+
+
+def _load_cohort_footprint(
+    footprint_or_path: Union[MemoryFootprint, "StudentImplementation", str],
+) -> MemoryFootprint:
+    """
+    Get the memory footprint of a footprint passed to
+    :py:meth:`ReferenceImplementation.run_many`, loading or executing it if it's a path.
+
+    Args:
+        footprint_or_path (``Union[MemoryFootprint, StudentImplementation, str]``): the footprint,
+            the student implementation, or the path to a pickled student implementation or a
+            notebook
+
+    Returns:
+        :py:class:`pybryt.execution.memory_footprint.MemoryFootprint`: the memory footprint
+    """
+    if isinstance(footprint_or_path, MemoryFootprint):
+        return footprint_or_path
+    if isinstance(footprint_or_path, StudentImplementation):
+        return footprint_or_path.footprint
+    if os.path.splitext(footprint_or_path)[1] == ".ipynb":
+        return StudentImplementation(footprint_or_path).footprint
+    return StudentImplementation.load(footprint_or_path).footprint
+
+
+def _run_cohort_footprint(task: Tuple[int, Union[bytes, str]]) -> Tuple[int, bytes]:
+    """
+    Check a footprint of a cohort run in a worker process.
+
+    Args:
+        task (``tuple[int, Union[bytes, str]]``): the index of the footprint and the footprint or
+            student implementation pickled with ``dill``, or the path to load it from
+
+    Returns:
+        ``tuple[int, bytes]``: the index of the footprint and the results, pickled with
+        :py:class:`_ResultPickler`
+    """
+    index, footprint_or_path = task
+    if isinstance(footprint_or_path, bytes):
+        footprint_or_path = dill.loads(footprint_or_path)
+
+    ref, _, group, short_circuit = _PARALLEL_RUN
+    res = ref.run(_load_cohort_footprint(footprint_or_path), group, short_circuit)
+
+    f = io.BytesIO()
+    _ResultPickler(f, _get_all_annotations(ref.annotations), keep_placeholders=False) \
+        .dump(res.results)
+    return index, f.getvalue()
+
+
 class ReferenceResult(Serializable):
     """
     Class for wrangling and managing the results of a reference implementation. Collects a series of
@@ -368,3 +844,6 @@ def generate_report(
             report += "\n\n"
 
     return report
+
+
+from .student import StudentImplementation
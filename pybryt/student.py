@@ -12,7 +12,8 @@ from glob import glob
 from multiprocessing import Process, Queue
 from typing import Any, Dict, List, Optional, Union
 
-from .execution import execute_notebook, FrameTracer, MemoryFootprint, NBFORMAT_VERSION
+from .annotations.context import check_context
+from .execution import CaptureFilter, execute_notebook, OnlineChecker, FrameTracer, MemoryFootprint, NBFORMAT_VERSION
 from .reference import generate_report, ReferenceImplementation, ReferenceResult
 from .utils import Serializable
 
@@ -33,6 +34,20 @@ class StudentImplementation(Serializable):
         output (``str``, optional): a path at which to write executed notebook
         timeout (``int``, optional): number of seconds to allow for notebook execution; set to 
             ``None`` for no time limit
+        backend (``str``, optional): the tracing backend to use; one of ``{"settrace",
+            "monitoring"}``
+        scope (``str``, optional): the frames to trace locally; one of ``{"all", "student"}``
+        capture_filter (:py:class:`CaptureFilter<pybryt.execution.capture_filter.CaptureFilter>`,
+            optional): a filter for the values to track, e.g. one created with
+            :py:meth:`ReferenceImplementation.get_capture_filter<pybryt.ReferenceImplementation.get_capture_filter>`
+        online_checker (:py:class:`OnlineChecker<pybryt.execution.online.OnlineChecker>`,
+            optional): a checker used to stop capturing values once grading is decided, e.g. one
+            created with
+            :py:meth:`ReferenceImplementation.get_online_checker<pybryt.ReferenceImplementation.get_online_checker>`
+        memory_limit (``int``, optional): the number of bytes of values to keep in memory during
+            execution before spilling new values to disk
+        transport (``str``, optional): how the memory footprint is sent out of the notebook
+            kernel; one of ``{"file", "stream"}``
     """
 
     nb: Optional[nbformat.NotebookNode]
@@ -50,6 +65,12 @@ class StudentImplementation(Serializable):
         addl_filenames: List[str] = [],
         output: Optional[str] = None,
         timeout: Optional[int] = 1200,
+        backend: str = "settrace",
+        scope: str = "all",
+        capture_filter: Optional[CaptureFilter] = None,
+        online_checker: Optional[OnlineChecker] = None,
+        memory_limit: Optional[int] = None,
+        transport: str = "file",
     ):
         if path_or_nb is None:
             self.nb = None
@@ -64,13 +85,22 @@ class StudentImplementation(Serializable):
         else:
             raise TypeError(f"path_or_nb is of unsupported type {type(path_or_nb)}")
 
-        self._execute(timeout, addl_filenames=addl_filenames, output=output)
+        self._execute(
+            timeout, addl_filenames=addl_filenames, output=output, backend=backend, scope=scope,
+            capture_filter=capture_filter, online_checker=online_checker,
+            memory_limit=memory_limit, transport=transport)
 
     def _execute(
         self, 
         timeout: Optional[int], 
         addl_filenames: List[str] = [], 
-        output: Optional[str] = None
+        output: Optional[str] = None,
+        backend: str = "settrace",
+        scope: str = "all",
+        capture_filter: Optional[CaptureFilter] = None,
+        online_checker: Optional[OnlineChecker] = None,
+        memory_limit: Optional[int] = None,
+        transport: str = "file",
     ) -> None:
         """
         Executes the notebook ``self.nb``.
@@ -81,12 +111,26 @@ class StudentImplementation(Serializable):
             addl_filenames (``list[str]``, optional): additional filenames to trace inside during 
                 execution
             output (``str``, optional): a path at which to write executed notebook
+            backend (``str``, optional): the tracing backend to use
+            scope (``str``, optional): the frames to trace locally
+            capture_filter (``CaptureFilter``, optional): a filter for the values to track
+            online_checker (``OnlineChecker``, optional): a checker used to stop capturing values
+                once grading is decided
+            memory_limit (``int``, optional): the number of bytes of values to keep in memory
+                before spilling new values to disk
+            transport (``str``, optional): how the memory footprint is sent out of the kernel
         """
         self.footprint = execute_notebook(
             self.nb, 
             self.nb_path, 
             addl_filenames=addl_filenames, 
             timeout=timeout,
+            backend=backend,
+            scope=scope,
+            capture_filter=capture_filter,
+            online_checker=online_checker,
+            memory_limit=memory_limit,
+            transport=transport,
         )
 
         if output:
@@ -160,7 +204,10 @@ class StudentImplementation(Serializable):
         Load one or more student implementations from a cache.
 
         All files are combined into a single student implementation by default, but a list can be
-        returned instead by setting ``combine=False``.
+        returned instead by setting ``combine=False``. Implementations cached by
+        :py:class:`check` are stored in lazy containers (see
+        :py:func:`dump_lazy<pybryt.utils.dump_lazy>`), so the values in their memory footprints
+        aren't unpickled until they're used.
 
         Args:
             cache_dir (``str``, optional): the path to the cache directory
@@ -192,8 +239,12 @@ class StudentImplementation(Serializable):
     def _default_dump_dest(self) -> str:
         return "student.pkl"
 
-    def check(self, ref: Union[ReferenceImplementation, List[ReferenceImplementation]], group=None) -> \
-            Union[ReferenceResult, List[ReferenceResult]]:
+    def check(
+        self,
+        ref: Union[ReferenceImplementation, List[ReferenceImplementation]],
+        group: Optional[str] = None,
+        workers: Optional[int] = None,
+    ) -> Union[ReferenceResult, List[ReferenceResult]]:
         """
         Checks this student implementation against a single or list of reference implementations.
         Returns the :py:class:`ReferenceResult<pybryt.ReferenceResult>` object(s) resulting from 
@@ -203,15 +254,19 @@ class StudentImplementation(Serializable):
             ref (``ReferenceImplementation`` or ``list[ReferenceImplementation]``): the reference(s)
                 to run against
             group (``str``, optional): if specified, only annotations in this group will be run
+            workers (``int``, optional): if greater than 1, the number of processes to check the
+                annotations of each reference in
 
         Returns:
             ``ReferenceResult`` or ``list[ReferenceResult]``: the results of the reference 
             implementation checks
         """
         if isinstance(ref, ReferenceImplementation):
-            return ref.run(self.footprint, group=group)
+            return ref.run(self.footprint, group=group, workers=workers)
         elif isinstance(ref, list):
-            return [r.run(self.footprint, group=group) for r in ref]
+            # references checked against the same footprint share a check context
+            with check_context(self.footprint):
+                return [r.run(self.footprint, group=group, workers=workers) for r in ref]
         else:
             raise TypeError(f"check cannot take values of type {type(ref)}")
 
@@ -315,6 +370,13 @@ class check:
             by the block
         show_only (one of ``{'satisfied', 'unsatisfied', None}``, optional): which types of
             reference results to include in the report; if ``None``, all are included
+        cache (``bool``, optional): whether to cache the memory footprint and results
+        filter_values (``bool``, optional): whether to only capture values that could satisfy the
+            annotations in the references (see
+            :py:meth:`ReferenceImplementation.get_capture_filter<pybryt.ReferenceImplementation.get_capture_filter>`)
+        stop_early (``bool``, optional): whether to stop capturing values once the results of the
+            references are decided (see
+            :py:meth:`ReferenceImplementation.get_online_checker<pybryt.ReferenceImplementation.get_online_checker>`)
         **kwargs: additional keyword arguments passed to ``pybryt.execution.create_collector``
     """
 
@@ -349,6 +411,8 @@ class check:
         report_on_error: bool = True,
         show_only: Optional[str] = None,
         cache: bool = True,
+        filter_values: bool = False,
+        stop_early: bool = False,
         **kwargs,
     ):
         if isinstance(ref, str):
@@ -373,6 +437,14 @@ class check:
         self._cache = cache
         self._disabled = False
 
+        if filter_values:
+            self._kwargs["capture_filter"] = \
+                CaptureFilter.combine(*[r.get_capture_filter(group) for r in ref])
+
+        if stop_early:
+            self._kwargs["online_checker"] = \
+                OnlineChecker([ann for r in ref for ann in r._get_annotations(group)])
+
     def _cache_check(self, stu, res):
         """
         Cache the student implementation and reference results in the PyBryt cache directory.
@@ -393,7 +465,7 @@ class check:
 
         ref_hash = hashlib.sha1("".join(r.name for r in res).encode()).hexdigest()
         stu_path = os.path.join(CACHE_DIR_NAME, CACHE_STUDENT_IMPL_PREFIX.format(ref_hash))
-        stu.dump(stu_path)
+        stu.dump(stu_path, lazy=True)
 
     def __enter__(self):
         self._frame_tracer = FrameTracer(inspect.currentframe().f_back)
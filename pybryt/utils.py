@@ -1,25 +1,94 @@
 """Various utilities for PyBryt"""
 
+import io
 import os
 import json
+import mmap
 import random
 import base64
 import string
 import dill
+import struct
 import hashlib
+import stat
+import tempfile
 import time
+import pickle
 import nbformat
+import numpy as np
+import pandas as pd
 
 from abc import ABC, abstractmethod
-from typing import Any, List, Optional, Union
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Set, Union
 from IPython import get_ipython
 from IPython.display import publish_display_data
 
 
+FINGERPRINT_SIZE = 16
+
+OUT_OF_BAND_MAGIC = b"PYBRYT5\x00"
+OUT_OF_BAND_ALIGNMENT = 64
+
+_OUT_OF_BAND_HEADER = struct.Struct("<8sQQ")
+_OUT_OF_BAND_ENTRY = struct.Struct("<QQ")
+
+LAZY_MAGIC = b"PYBRYTL\x00"
+
+_LAZY_HEADER = struct.Struct("<8sQQ")
+
+
 class UnpickleableError(Exception):
     """
-    An exception to raise when :py:func:`pybryt.utils.pickle_and_hash` fails.
+    An exception to raise when :py:func:`pybryt.utils.pickle_and_hash` or
+    :py:func:`pybryt.utils.fingerprint` fails.
+    """
+
+
+_UNPICKLEABLE_TYPES: Set[type] = set()
+
+
+def _is_unpickleable_type(obj: Any) -> bool:
+    """
+    Determine whether an object that ``dill`` failed to pickle is of a type that can never be
+    pickled, i.e. whether the object can't even be reduced. Objects that can be reduced but contain
+    unpickleable objects (like instances of user-defined classes with a generator attribute) are
+    not.
+    """
+    try:
+        obj.__reduce_ex__(dill.settings["protocol"])
+    except TypeError:
+        return True
+    except:
+        pass
+    return False
+
+
+def pickle_object(obj: Any) -> bytes:
+    """
+    Pickle an object with ``dill``.
+
+    The types of objects that can never be pickled (see :py:func:`_is_unpickleable_type`) are
+    remembered so that later attempts to pickle objects of the same type fail without calling
+    ``dill``.
+
+    Args:
+        obj (``object``): the object to pickle
+
+    Returns:
+        ``bytes``: the pickled object
+
+    Raises:
+        :py:class:`pybryt.utils.UnpickleableError`: if the object cannot be pickled
     """
+    if type(obj) in _UNPICKLEABLE_TYPES:
+        raise UnpickleableError()
+
+    try:
+        return dill.dumps(obj)
+    except:
+        if _is_unpickleable_type(obj):
+            _UNPICKLEABLE_TYPES.add(type(obj))
+        raise UnpickleableError()
 
 
 def pickle_and_hash(obj: Any) -> str:
@@ -35,12 +104,231 @@ def pickle_and_hash(obj: Any) -> str:
     Raises:
         :py:class:`pybryt.utils.UnpickleableError`: if the object cannot be pickled
     """
+    return hashlib.sha512(pickle_object(obj)).hexdigest()
+
+
+class _FingerprintCycleError(Exception):
+    """
+    An exception raised when a container being fingerprinted contains itself.
+    """
+
+
+def _update_with_bytes(hasher: "hashlib._Hash", tag: bytes, data: bytes) -> None:
+    """
+    Feed a tagged, length-prefixed byte string into a hasher.
+    """
+    hasher.update(tag)
+    hasher.update(len(data).to_bytes(8, "little"))
+    hasher.update(data)
+
+
+def _update_with_int(hasher: "hashlib._Hash", obj: int, active: Set[int]) -> None:
+    _update_with_bytes(hasher, b"i", obj.to_bytes(obj.bit_length() // 8 + 1, "little", signed=True))
+
+
+def _update_with_float(hasher: "hashlib._Hash", obj: float, active: Set[int]) -> None:
+    hasher.update(b"f")
+    hasher.update(struct.pack("<d", obj))
+
+
+def _update_with_complex(hasher: "hashlib._Hash", obj: complex, active: Set[int]) -> None:
+    hasher.update(b"c")
+    hasher.update(struct.pack("<dd", obj.real, obj.imag))
+
+
+def _update_with_bool(hasher: "hashlib._Hash", obj: bool, active: Set[int]) -> None:
+    hasher.update(b"T" if obj else b"F")
+
+
+def _update_with_none(hasher: "hashlib._Hash", obj: None, active: Set[int]) -> None:
+    hasher.update(b"N")
+
+
+def _update_with_str(hasher: "hashlib._Hash", obj: str, active: Set[int]) -> None:
+    _update_with_bytes(hasher, b"s", obj.encode("utf-8", "surrogatepass"))
+
+
+def _update_with_bytes_obj(hasher: "hashlib._Hash", obj: bytes, active: Set[int]) -> None:
+    _update_with_bytes(hasher, b"b", obj)
+
+
+def _update_with_bytearray(hasher: "hashlib._Hash", obj: bytearray, active: Set[int]) -> None:
+    _update_with_bytes(hasher, b"B", bytes(obj))
+
+
+def _update_with_sequence(tag: bytes) -> Callable[["hashlib._Hash", Any, Set[int]], None]:
+    """
+    Create a function that feeds an ordered container into a hasher, recursing into its elements.
+    """
+    def update_with_sequence(hasher, obj, active):
+        if id(obj) in active:
+            raise _FingerprintCycleError()
+        active.add(id(obj))
+        hasher.update(tag)
+        hasher.update(len(obj).to_bytes(8, "little"))
+        for e in obj:
+            _update(hasher, e, active)
+        active.remove(id(obj))
+
+    return update_with_sequence
+
+
+def _update_with_dict(hasher: "hashlib._Hash", obj: dict, active: Set[int]) -> None:
+    if id(obj) in active:
+        raise _FingerprintCycleError()
+    active.add(id(obj))
+    hasher.update(b"d")
+    hasher.update(len(obj).to_bytes(8, "little"))
+    for k, v in obj.items():
+        _update(hasher, k, active)
+        _update(hasher, v, active)
+    active.remove(id(obj))
+
+
+def _update_with_set(tag: bytes) -> Callable[["hashlib._Hash", Any, Set[int]], None]:
+    """
+    Create a function that feeds an unordered container into a hasher. The digests of the elements
+    are sorted so that the result does not depend on iteration order.
+    """
+    def update_with_set(hasher, obj, active):
+        digests = []
+        for e in obj:
+            h = hashlib.sha256()
+            _update(h, e, active)
+            digests.append(h.digest())
+
+        hasher.update(tag)
+        hasher.update(len(obj).to_bytes(8, "little"))
+        for d in sorted(digests):
+            hasher.update(d)
+
+    return update_with_set
+
+
+def _update_with_ndarray(hasher: "hashlib._Hash", obj: np.ndarray, active: Set[int]) -> None:
+    if obj.dtype.fields is not None:
+        if obj.dtype.hasobject:
+            _update_with_pickle(hasher, obj, active)
+            return
+        dtype = str(obj.dtype.descr)
+    else:
+        dtype = obj.dtype.str
+
+    _update_with_bytes(hasher, b"a", dtype.encode())
+    hasher.update(struct.pack(f"<{obj.ndim + 1}q", obj.ndim, *obj.shape))
+    if obj.dtype.hasobject:
+        _update(hasher, obj.ravel().tolist(), active)
+    else:
+        hasher.update(np.ascontiguousarray(obj).data)
+
+
+def _update_with_numpy_scalar(hasher: "hashlib._Hash", obj: np.generic, active: Set[int]) -> None:
+    if obj.dtype.hasobject:
+        _update_with_pickle(hasher, obj, active)
+        return
+
+    _update_with_bytes(hasher, b"g", obj.dtype.str.encode())
+    hasher.update(obj.tobytes())
+
+
+def _update_with_pandas_values(hasher: "hashlib._Hash", obj: Union[pd.Series, pd.Index], active: Set[int]) -> None:
+    """
+    Feed the values of a single pandas column or index into a hasher.
+    """
+    _update_with_bytes(hasher, b"t", str(obj.dtype).encode())
+    if isinstance(obj, pd.RangeIndex):
+        hasher.update(struct.pack("<3q", obj.start, obj.stop, obj.step))
+    elif isinstance(obj.dtype, np.dtype):
+        _update_with_ndarray(hasher, obj.to_numpy(), active)
+    else:
+        hasher.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().data)
+
+
+def _update_with_series(hasher: "hashlib._Hash", obj: pd.Series, active: Set[int]) -> None:
+    hasher.update(b"S")
+    _update(hasher, obj.name, active)
+    _update(hasher, list(obj.index.names), active)
+    _update_with_pandas_values(hasher, obj.index, active)
+    _update_with_pandas_values(hasher, obj, active)
+
+
+def _update_with_dataframe(hasher: "hashlib._Hash", obj: pd.DataFrame, active: Set[int]) -> None:
+    hasher.update(b"D")
+    _update(hasher, list(obj.columns), active)
+    _update(hasher, list(obj.index.names), active)
+    _update_with_pandas_values(hasher, obj.index, active)
+    for _, col in obj.items():
+        _update_with_pandas_values(hasher, col, active)
+
+
+def _update_with_pickle(hasher: "hashlib._Hash", obj: Any, active: Set[int]) -> None:
+    _update_with_bytes(hasher, b"p", pickle_object(obj))
+
+
+_FINGERPRINT_UPDATERS: Dict[type, Callable[["hashlib._Hash", Any, Set[int]], None]] = {
+    int: _update_with_int,
+    float: _update_with_float,
+    complex: _update_with_complex,
+    bool: _update_with_bool,
+    type(None): _update_with_none,
+    str: _update_with_str,
+    bytes: _update_with_bytes_obj,
+    bytearray: _update_with_bytearray,
+    list: _update_with_sequence(b"l"),
+    tuple: _update_with_sequence(b"u"),
+    dict: _update_with_dict,
+    set: _update_with_set(b"e"),
+    frozenset: _update_with_set(b"z"),
+    np.ndarray: _update_with_ndarray,
+    pd.Series: _update_with_series,
+    pd.DataFrame: _update_with_dataframe,
+}
+
+
+def _update(hasher: "hashlib._Hash", obj: Any, active: Set[int]) -> None:
+    """
+    Feed an object into a hasher using the updater registered for its exact type, falling back to
+    NumPy scalars and then to ``dill``.
+    """
+    updater = _FINGERPRINT_UPDATERS.get(type(obj))
+    if updater is not None:
+        updater(hasher, obj, active)
+    elif isinstance(obj, np.generic):
+        _update_with_numpy_scalar(hasher, obj, active)
+    else:
+        _update_with_pickle(hasher, obj, active)
+
+
+def fingerprint(obj: Any) -> bytes:
+    """
+    Compute a compact digest of an object's value for detecting duplicate values.
+
+    The digest is computed by dispatching on the exact type of the object: primitives are hashed
+    from their native representation, NumPy arrays from their dtype, shape, and raw buffer,
+    DataFrames and Series column-by-column, and built-in containers recursively. Objects of any
+    other type (including subclasses of the types above) are pickled with ``dill``, as in
+    :py:func:`pickle_and_hash`. Self-referential containers are also pickled. Because of this, a
+    fingerprint can only be computed for objects whose parts that aren't hashed natively can be
+    pickled.
+
+    Args:
+        obj (``object``): the object to fingerprint
+
+    Returns:
+        ``bytes``: the first ``FINGERPRINT_SIZE`` bytes of the SHA-256 digest of the object
+
+    Raises:
+        :py:class:`pybryt.utils.UnpickleableError`: if the object or any object it contains must be
+            pickled and cannot be
+    """
+    hasher = hashlib.sha256()
     try:
-        s = dill.dumps(obj)
-    except:
-        raise UnpickleableError()
+        _update(hasher, obj, set())
+    except (_FingerprintCycleError, RecursionError):
+        hasher = hashlib.sha256()
+        _update_with_pickle(hasher, obj, set())
 
-    return hashlib.sha512(s).hexdigest()
+    return hasher.digest()[:FINGERPRINT_SIZE]
 
 
 def filter_pickleable_list(lst: List[Any]) -> None:
@@ -53,8 +341,8 @@ def filter_pickleable_list(lst: List[Any]) -> None:
     to_delete = []
     for i, v in enumerate(lst):
         try:
-            dill.dumps(v)
-        except:
+            pickle_object(v)
+        except UnpickleableError:
             to_delete.append(i)
     
     to_delete.reverse()
@@ -153,9 +441,421 @@ def get_stem(fp) -> str:
     return os.path.splitext(os.path.split(fp)[1])[0]
 
 
+class _OutOfBandPickler(dill.Pickler):
+    """
+    A ``dill`` pickler that pickles the buffers of contiguous NumPy arrays (including those
+    backing pandas objects) out-of-band with pickle protocol 5. ``dill`` otherwise pickles arrays
+    in-band regardless of the protocol.
+    """
+
+    def reducer_override(self, obj: Any) -> Any:
+        if type(obj) is np.ndarray and not obj.dtype.hasobject and \
+                (obj.flags.c_contiguous or obj.flags.f_contiguous):
+            return obj.__reduce_ex__(5)
+        return NotImplemented
+
+
+def _align(offset: int) -> int:
+    """
+    Round an offset up to a multiple of ``OUT_OF_BAND_ALIGNMENT``.
+    """
+    return -(-offset // OUT_OF_BAND_ALIGNMENT) * OUT_OF_BAND_ALIGNMENT
+
+
+def dump_out_of_band(obj: Any, f: BinaryIO) -> None:
+    """
+    Pickle an object to a file with the buffers of its NumPy arrays stored out-of-band.
+
+    The file starts with ``OUT_OF_BAND_MAGIC``, the length of the pickle, the number of buffers,
+    and the offset and length of each buffer, followed by the pickle and the buffers, each of
+    which starts at a multiple of ``OUT_OF_BAND_ALIGNMENT`` bytes so that it can be mapped into
+    memory (see :py:func:`load_out_of_band`).
+
+    Args:
+        obj (``object``): the object to pickle
+        f (``typing.BinaryIO``): the file to write to
+    """
+    buffers = []
+    data = io.BytesIO()
+    _OutOfBandPickler(data, protocol=5, buffer_callback=buffers.append).dump(obj)
+    data = data.getbuffer()
+    buffers = [b.raw() for b in buffers]
+
+    offset = _OUT_OF_BAND_HEADER.size + _OUT_OF_BAND_ENTRY.size * len(buffers) + len(data)
+    entries = []
+    for b in buffers:
+        offset = _align(offset)
+        entries.append((offset, b.nbytes))
+        offset += b.nbytes
+
+    f.write(_OUT_OF_BAND_HEADER.pack(OUT_OF_BAND_MAGIC, len(data), len(buffers)))
+    for entry in entries:
+        f.write(_OUT_OF_BAND_ENTRY.pack(*entry))
+    f.write(data)
+
+    pos = _OUT_OF_BAND_HEADER.size + _OUT_OF_BAND_ENTRY.size * len(buffers) + len(data)
+    for b, (offset, _) in zip(buffers, entries):
+        f.write(bytes(offset - pos))
+        f.write(b)
+        pos = offset + b.nbytes
+
+
+def dumps_out_of_band(obj: Any) -> bytes:
+    """
+    Pickle an object to bytes with the buffers of its NumPy arrays stored out-of-band (see
+    :py:func:`dump_out_of_band`).
+
+    Args:
+        obj (``object``): the object to pickle
+
+    Returns:
+        ``bytes``: the pickled object
+    """
+    f = io.BytesIO()
+    dump_out_of_band(obj, f)
+    return f.getvalue()
+
+
+def loads_out_of_band(data: Union[bytes, bytearray, memoryview, mmap.mmap]) -> Any:
+    """
+    Unpickle an object pickled with :py:func:`dumps_out_of_band` or with ``dill``.
+
+    The buffers of the object's NumPy arrays are views of ``data``, which is not copied; arrays are
+    only writable if ``data`` is.
+
+    Args:
+        data (``bytes``, ``bytearray``, ``memoryview``, or ``mmap.mmap``): the pickled object
+
+    Returns:
+        ``object``: the unpickled object
+    """
+    data = memoryview(data)
+    if data[:len(OUT_OF_BAND_MAGIC)] != OUT_OF_BAND_MAGIC:
+        return dill.loads(data)
+
+    _, length, n = _OUT_OF_BAND_HEADER.unpack_from(data)
+    buffers = []
+    for i in range(n):
+        offset, size = _OUT_OF_BAND_ENTRY.unpack_from(
+            data, _OUT_OF_BAND_HEADER.size + _OUT_OF_BAND_ENTRY.size * i)
+        buffers.append(data[offset:offset + size])
+
+    start = _OUT_OF_BAND_HEADER.size + _OUT_OF_BAND_ENTRY.size * n
+    return dill.loads(data[start:start + length], buffers=buffers)
+
+
+def load_out_of_band(path: str, map_buffers: bool = True) -> Any:
+    """
+    Unpickle an object from a file written by :py:func:`dump_out_of_band` or with ``dill``.
+
+    If ``map_buffers`` is true, the file is mapped into memory copy-on-write and the buffers of the
+    object's NumPy arrays are views of the mapping, so they are only read from disk as they are
+    accessed. Otherwise, the file is read into memory once and the arrays are views of it.
+
+    Args:
+        path (``str``): the path to the file
+        map_buffers (``bool``, optional): whether to map the file into memory
+
+    Returns:
+        ``object``: the unpickled object
+    """
+    with open(path, "rb") as f:
+        if f.read(len(OUT_OF_BAND_MAGIC)) != OUT_OF_BAND_MAGIC:
+            f.seek(0)
+            return dill.load(f)
+
+        if map_buffers:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        else:
+            f.seek(0)
+            data = bytearray(os.fstat(f.fileno()).st_size)
+            f.readinto(data)
+
+    return loads_out_of_band(data)
+
+
+def _identity(obj: Any) -> Any:
+    """
+    Return an object; used to pickle :py:class:`LazyValue` objects as the values they load.
+    """
+    return obj
+
+
+class LazyValue:
+    """
+    A placeholder for a value stored in a blob of a lazy container (see :py:func:`dump_lazy`) that
+    is only unpickled when :py:meth:`load` is called.
+
+    When a lazy value is pickled (other than by :py:func:`dump_lazy`), the value is loaded and
+    pickled in its place.
+
+    Args:
+        blobs (:py:class:`BlobReader`): the blobs of the container
+        offset (``int``): the offset of the blob in the container
+        length (``int``): the length of the blob
+        type_name (``str``): the qualified name of the type of the value
+    """
+
+    __slots__ = ("blobs", "offset", "length", "type_name")
+
+    blobs: "BlobReader"
+    """the blobs of the container"""
+
+    offset: int
+    """the offset of the blob in the container"""
+
+    length: int
+    """the length of the blob"""
+
+    type_name: str
+    """the qualified name of the type of the value"""
+
+    def __init__(self, blobs: "BlobReader", offset: int, length: int, type_name: str):
+        self.blobs = blobs
+        self.offset = offset
+        self.length = length
+        self.type_name = type_name
+
+    def __reduce__(self):
+        return _identity, (self.load(),)
+
+    def load(self) -> Any:
+        """
+        Unpickle the value.
+
+        Returns:
+            ``object``: the value
+        """
+        return self.blobs.load(self.offset, self.length)
+
+
+def get_type_name(type_: type) -> str:
+    """
+    Return the qualified name of a type, including its module.
+
+    Args:
+        type_ (``type``): the type
+
+    Returns:
+        ``str``: the qualified name
+    """
+    return f"{type_.__module__}.{type_.__qualname__}"
+
+
+class BlobReader:
+    """
+    The value blobs of a lazy container mapped into memory.
+
+    Args:
+        data (``memoryview``): the contents of the container
+    """
+
+    _data: memoryview
+    """the contents of the container"""
+
+    def __init__(self, data: memoryview):
+        self._data = data
+
+    def __reduce__(self):
+        raise TypeError("BlobReader objects cannot be pickled")
+
+    def load(self, offset: int, length: int) -> Any:
+        """
+        Unpickle the value in a blob.
+
+        Args:
+            offset (``int``): the offset of the blob
+            length (``int``): the length of the blob
+
+        Returns:
+            ``object``: the value
+        """
+        return loads_out_of_band(self._data[offset:offset + length])
+
+
+class _BlobWriter:
+    """
+    Appends value blobs to a lazy container as it is written.
+    """
+
+    _file: BinaryIO
+    """the file being written"""
+
+    def __init__(self, f: BinaryIO):
+        self._file = f
+
+    def dump(self, obj: Any) -> LazyValue:
+        """
+        Append a blob containing an object to the file and return a placeholder for it.
+        """
+        data = dumps_out_of_band(obj)
+        pos = self._file.tell()
+        offset = _align(pos)
+        self._file.write(bytes(offset - pos))
+        self._file.write(data)
+        return LazyValue(self, offset, len(data), get_type_name(type(obj)))
+
+
+class _LazyPickler(dill.Pickler):
+    """
+    A ``dill`` pickler that writes the index of a lazy container. Objects whose types define a
+    ``_lazy_copy`` method, which takes a :py:class:`_BlobWriter` and returns a copy of the object
+    whose values are :py:class:`LazyValue` placeholders, are pickled as those copies.
+    """
+
+    _blobs: _BlobWriter
+    """the writer for the container's blobs"""
+
+    def __init__(self, f: BinaryIO, blobs: _BlobWriter):
+        super().__init__(f)
+        self._blobs = blobs
+
+    def persistent_id(self, obj: Any) -> Optional[str]:
+        if obj is self._blobs:
+            return "blobs"
+        return None
+
+    def reducer_override(self, obj: Any) -> Any:
+        if type(obj) is LazyValue and obj.blobs is self._blobs:
+            return LazyValue, (obj.blobs, obj.offset, obj.length, obj.type_name)
+
+        lazy_copy = getattr(type(obj), "_lazy_copy", None)
+        if lazy_copy is not None:
+            return lazy_copy(obj, self._blobs).__reduce_ex__(self.proto)
+
+        return NotImplemented
+
+
+class _LazyUnpickler(dill.Unpickler):
+    """
+    A ``dill`` unpickler that reads the index of a lazy container.
+    """
+
+    _blobs: BlobReader
+    """the reader for the container's blobs"""
+
+    def __init__(self, f: BinaryIO, blobs: BlobReader):
+        super().__init__(f)
+        self._blobs = blobs
+
+    def persistent_load(self, pid: str) -> Any:
+        if pid == "blobs":
+            return self._blobs
+        raise pickle.UnpicklingError(f"Unsupported persistent ID: {pid}")
+
+
+def dump_lazy(obj: Any, f: BinaryIO) -> None:
+    """
+    Pickle an object to a lazy container, whose values can be unpickled individually on demand.
+
+    The container starts with ``LAZY_MAGIC`` and the offset and length of its index, followed by
+    the value blobs and the index. The index is a pickle of the object in which objects whose
+    types define a ``_lazy_copy`` method (like
+    :py:class:`MemoryFootprint<pybryt.execution.memory_footprint.MemoryFootprint>`) are replaced by
+    copies holding :py:class:`LazyValue` placeholders for the values stored in the blobs. Each
+    blob is pickled with :py:func:`dumps_out_of_band` and aligned to ``OUT_OF_BAND_ALIGNMENT``
+    bytes.
+
+    Args:
+        obj (``object``): the object to pickle
+        f (``typing.BinaryIO``): the file to write to, which must be seekable
+    """
+    start = f.tell()
+    f.write(bytes(_LAZY_HEADER.size))
+
+    index = io.BytesIO()
+    _LazyPickler(index, _BlobWriter(f)).dump(obj)
+    index = index.getbuffer()
+
+    offset = f.tell()
+    f.write(index)
+    f.seek(start)
+    f.write(_LAZY_HEADER.pack(LAZY_MAGIC, offset - start, len(index)))
+    f.seek(0, io.SEEK_END)
+
+
+def is_lazy_container(path: str) -> bool:
+    """
+    Determine whether a file is a lazy container written by :py:func:`dump_lazy`.
+
+    Args:
+        path (``str``): the path to the file
+
+    Returns:
+        ``bool``: whether the file is a lazy container
+    """
+    with open(path, "rb") as f:
+        return f.read(len(LAZY_MAGIC)) == LAZY_MAGIC
+
+
+def load_lazy(path: str) -> Any:
+    """
+    Unpickle an object from a lazy container written by :py:func:`dump_lazy`.
+
+    Only the index is unpickled: the container is mapped into memory copy-on-write, and the values
+    in its blobs are unpickled when the :py:class:`LazyValue` placeholders for them are loaded.
+
+    Args:
+        path (``str``): the path to the file
+
+    Returns:
+        ``object``: the unpickled object
+
+    Raises:
+        ``ValueError``: if the file is not a lazy container
+    """
+    with open(path, "rb") as f:
+        magic, offset, length = _LAZY_HEADER.unpack(f.read(_LAZY_HEADER.size))
+        if magic != LAZY_MAGIC:
+            raise ValueError(f"{path} is not a lazy container")
+        data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+
+    return _LazyUnpickler(io.BytesIO(data[offset:offset + length]), BlobReader(data)).load()
+
+
+def _replace_file(dest: str, write: Callable[[BinaryIO], None]) -> None:
+    """
+    Write a file by writing to a temporary file in the same directory and moving it over ``dest``.
+
+    ``dest`` is never truncated, so objects loaded from it whose buffers are mapped into memory
+    (see :py:func:`load_out_of_band` and :py:func:`load_lazy`) can be written back to it, and it's
+    left intact if writing fails.
+
+    Args:
+        dest (``str``): the path to the file
+        write (``callable[[typing.BinaryIO], None]``): a function that writes the file's contents
+    """
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(dest)), prefix=f".{os.path.basename(dest)}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+
+        # give the file the permissions that opening it would have
+        try:
+            mode = stat.S_IMODE(os.stat(dest).st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+
+        os.chmod(tmp, mode)
+        os.replace(tmp, dest)
+
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
 class Serializable(ABC):
     """
     A class that implements serialization using the ``dill`` library.
+
+    Objects can optionally be pickled with the buffers of their NumPy arrays stored out-of-band
+    (see :py:func:`dump_out_of_band`), which lets :py:meth:`load` map the arrays into memory
+    without copying them, or to a lazy container (see :py:func:`dump_lazy`), which lets
+    :py:meth:`load` defer unpickling the values of memory footprints until they're used. All
+    formats are detected when loading.
     """
 
     @property
@@ -166,41 +866,58 @@ class Serializable(ABC):
         """
         ... # pragma: no cover
 
-    def dump(self, dest: Optional[str] = None) -> None:
+    def dump(self, dest: Optional[str] = None, out_of_band: bool = False, lazy: bool = False) -> None:
         """
         Pickles this object to a file.
 
         Args:
             dest (``str``, optional): the path to the file
+            out_of_band (``bool``, optional): whether to store the buffers of NumPy arrays
+                out-of-band
+            lazy (``bool``, optional): whether to write a lazy container
         """
         if dest is None:
             dest = self._default_dump_dest
-        with open(dest, "wb+") as f:
-            dill.dump(self, f)
 
-    def dumps(self) -> str:
+        # dest may be mapped into memory if this object was loaded from it
+        if lazy:
+            _replace_file(dest, lambda f: dump_lazy(self, f))
+        elif out_of_band:
+            _replace_file(dest, lambda f: dump_out_of_band(self, f))
+        else:
+            _replace_file(dest, lambda f: dill.dump(self, f))
+
+    def dumps(self, out_of_band: bool = False) -> str:
         """
         Pickles this object to a base-64-encoded string.
 
+        Args:
+            out_of_band (``bool``, optional): whether to store the buffers of NumPy arrays
+                out-of-band
+
         Returns:
            ``str``: the pickled and encoded object
         """
-        bits = dill.dumps(self)
+        bits = dumps_out_of_band(self) if out_of_band else dill.dumps(self)
         return base64.b64encode(bits).decode("ascii")
 
     @classmethod
-    def load(cls, file: str) -> 'Serializable':
+    def load(cls, file: str, map_buffers: bool = True) -> 'Serializable':
         """
         Unpickles an object from a file.
 
         Args:
             file (``str``): the path to the file
+            map_buffers (``bool``, optional): whether to map the buffers of NumPy arrays pickled
+                out-of-band into memory instead of reading them
         
         Returns:
             ``Serializable``: the unpickled object
         """
-        with open(file, "rb") as f:
-            instance = dill.load(f)
+        if is_lazy_container(file):
+            instance = load_lazy(file)
+        else:
+            instance = load_out_of_band(file, map_buffers=map_buffers)
         if not isinstance(instance, cls):
             raise TypeError(f"Unpickled object is not of type {cls}")
         return instance
@@ -216,7 +933,7 @@ class Serializable(ABC):
         Returns:
             ``Serializable``: the unpickled object
         """
-        instance = dill.loads(base64.b64decode(data.encode("ascii")))
+        instance = loads_out_of_band(bytearray(base64.b64decode(data.encode("ascii"))))
         if not isinstance(instance, cls):
             raise TypeError(f"Unpickled object is not of type {cls}")
         return instance
@@ -1,8 +1,10 @@
 """Tests for type annotations"""
 
+import numbers
 import numpy as np
 import pytest
 
+from collections.abc import Sized
 from unittest import mock
 
 import pybryt
@@ -51,6 +53,11 @@ def test_forbid_type():
         "value": None,
     })
 
+    # instances of subclasses and virtual subclasses are forbidden
+    assert pybryt.ForbidType(object).check(footprint).satisfied is False
+    assert pybryt.ForbidType(numbers.Integral).check(footprint).satisfied is False
+    assert pybryt.ForbidType(Sized).check(footprint).satisfied is False
+
     # check constructor errors
     with pytest.raises(TypeError, match=f"1 is not a type"):
         pybryt.ForbidType(1)
@@ -1,14 +1,20 @@
 """Tests for value annotations"""
 
+import dill
+import numpy as np
+import pandas as pd
 import pytest
 
+from concurrent.futures import ThreadPoolExecutor
 from itertools import chain
 from unittest import mock
 
-from pybryt import Annotation, Attribute, debug_mode, InitialCondition, ReturnValue, structural, \
-    Value
+from pybryt import Annotation, Attribute, debug_mode, InitialCondition, ReferenceImplementation, \
+    ReturnValue, structural, Value
 from pybryt import invariants as inv
+from pybryt.annotations.context import check_context, get_check_context
 from pybryt.annotations.structural import _StructuralPattern
+from pybryt.annotations.value import _compile_comparator
 from pybryt.execution.memory_footprint import Event, MemoryFootprint, MemoryFootprintValue
 from pybryt.utils import pickle_and_hash
 
@@ -133,6 +139,204 @@ def test_value_annotation():
             v.check_against(1)
 
 
+def test_exact_matches():
+    """
+    Tests that values without tolerances are looked up by fingerprint.
+    """
+    footprint = MemoryFootprint()
+    for i, val in enumerate(["a", 1.0, 7, "b", 1, [1, 2]]):
+        footprint.add_value(val, i)
+
+    check_observed_values = Value._check_observed_values
+    with mock.patch.object(
+            Value, "_check_observed_values", autospec=True, side_effect=check_observed_values) as mocked:
+        res = Value("b").check(footprint)
+        assert res.satisfied and res.timestamp == 3
+        assert mocked.call_count == 1
+
+        mocked.reset_mock()
+        assert not Value("c").check(footprint).satisfied
+        assert mocked.call_count == 0
+
+        # earlier values of other types that are equal to the value satisfy it first
+        res = Value(1).check(footprint)
+        assert res.satisfied and res.timestamp == 1 and isinstance(res.value, float)
+        assert mocked.call_count == 2
+
+        res = Value([1, 2]).check(footprint)
+        assert res.satisfied and res.timestamp == 5
+
+    # values that weren't fingerprinted are checked
+    footprint.add_value("c", 6, allow_duplicates=True)
+    assert Value("c").check(footprint).timestamp == 6
+    footprint = MemoryFootprint.from_values(MemoryFootprintValue(2, 0, None))
+    assert Value(2).check(footprint).satisfied
+
+
+def test_tolerance_matches():
+    """
+    Tests that real scalar values with tolerances are looked up in the footprint's sorted index of
+    real scalars.
+    """
+    np.random.seed(42)
+    vals = [1, 2.5, "3", True, np.float64(3.2), np.int32(-4), np.float32(2.9), 2 ** 60, [3.1], 10 ** 400]
+    vals += np.random.uniform(-10, 10, size=100).tolist()
+    footprint = MemoryFootprint()
+    for i, val in enumerate(vals):
+        footprint.add_value(val, i)
+
+    # results match those of checking every value
+    for expected, kwargs in [
+        (3, {"atol": 0.2}),
+        (3.0, {"rtol": 0.1}),
+        (np.float64(3), {"atol": 0.3}),
+        (np.float32(3), {"atol": 0.15}),
+        (-4, {"atol": 1e-3}),
+        (1, {"atol": 1e-3}),
+        (2 ** 60, {"atol": 1}),
+        (100, {"atol": 1}),
+        (10 ** 400, {"atol": 1}),
+        (-10 ** 400, {"rtol": 0.1}),
+    ]:
+        v = Value(expected, **kwargs)
+        res = v.check(footprint)
+        satisfiers = [i for i, val in enumerate(vals) if v.check_values_equal(
+            expected, val, v.atol, v.rtol)]
+        assert res.satisfied is bool(satisfiers)
+        if satisfiers:
+            assert res.timestamp == satisfiers[0]
+
+
+def test_array_matches():
+    """
+    Tests that arrays are compared to stacks of arrays with the same shape.
+    """
+    np.random.seed(42)
+    vals = [np.random.normal(size=5) for _ in range(50)]
+    vals += [np.arange(5), np.arange(5.0), np.arange(5).astype(object), np.arange(6), list(range(5)),
+        np.array(["0", "1", "2", "3", "4"]), 1, np.zeros((5, 1)), np.array(1.5), np.array([])]
+    footprint = MemoryFootprint()
+    for i, val in enumerate(vals):
+        footprint.add_value(val, i)
+
+    # results match those of checking every value
+    for expected, kwargs in [
+        (vals[10] + 1e-3, {"atol": 1e-2}),
+        (vals[10] + 1e-3, {}),
+        (np.arange(5), {}),
+        (np.arange(5) + 0.1, {"atol": 0.2}),
+        (np.arange(5), {"rtol": 0.5}),
+        (np.array(1.5), {}),
+        (np.array([]), {}),
+        (np.ones(5), {"atol": 1}),
+        (np.array(["0", "1", "2", "3", "4"]), {}),
+    ]:
+        v = Value(expected, **kwargs)
+        res = v.check(footprint)
+        satisfiers = [i for i, val in enumerate(vals) if v.check_values_equal(
+            expected, val, v.atol, v.rtol)]
+        assert res.satisfied is bool(satisfiers)
+        if satisfiers:
+            assert res.timestamp == satisfiers[0]
+
+
+def test_compiled_comparators():
+    """
+    Tests that the comparators compiled for values agree with ``Value.check_values_equal``.
+    """
+    class Foo:
+        pass
+
+    vals = [
+        None, "", "abc", "1", b"abc", 0, 1, True, 1.0, 1.05, float("nan"), 2 ** 60, np.int64(1),
+        np.float32(1.05), np.bool_(True), np.float64(1), [], [1, 2], (1, 2), [1.0, 2.01], [1],
+        [1.05, float("inf")], [1, float("inf")], [1.0, float("nan")], [True, 2], [2 ** 60, 2],
+        ["a", "b"], [np.arange(2)], {1, 2}, {"a": 1}, np.arange(2), np.arange(2.0) + 1e-3,
+        np.array([1, 2]), np.array(1.0), np.array(["a", "b"]), np.arange(2).astype(object),
+        np.zeros((2, 1)), pd.Series([1, 2]), Foo(),
+    ]
+    for expected in vals:
+        for atol, rtol in [(None, None), (0.1, None), (None, 0.1), (1, 0)]:
+            comparator = _compile_comparator(expected, atol, rtol)
+            for observed in vals:
+                try:
+                    want = Value.check_values_equal(expected, observed, atol, rtol)
+                except Exception as e:
+                    with pytest.raises(type(e)):
+                        comparator(observed)
+                else:
+                    assert comparator(observed) == want, (expected, observed, atol, rtol)
+
+    # comparators are cached until the tolerances change
+    v = Value(1.0, atol=0.1)
+    assert v.check_against(1.05)
+    comparators = v._compiled.get_comparators()
+    assert v.check_against(1.08) and v._compiled.get_comparators() is comparators
+    v.atol = 0.01
+    assert not v.check_against(1.05)
+    assert v.check_against(1.005) and v._compiled.get_comparators() is not comparators
+
+    # compiled values are pickled without their comparators
+    v2 = dill.loads(dill.dumps(v))
+    assert v2._compiled.tolerance_bounds == v._compiled.tolerance_bounds
+    assert v2._compiled._comparators is None
+    assert v2._get_compiled() is v2._compiled and v2.check_against(1.005)
+
+    # stale compiled values aren't pickled
+    v.atol = 0.1
+    assert dill.loads(dill.dumps(v))._compiled is None
+
+
+def test_invariant_cache():
+    """
+    Tests that annotations run by a reference share the values produced by applying invariants to
+    the values in the footprint.
+    """
+    vals = [[i, i + 1, i + 2] for i in range(10)]
+    fp = MemoryFootprint.from_values(*(MemoryFootprintValue(v, i, None) for i, v in enumerate(vals)))
+    annots = [
+        Value([11, 10, 9], invariants=[inv.list_permutation]),
+        Value([9, 10, 11], invariants=[inv.list_permutation], name="foo"),
+        Value([2, 1, 0], invariants=[inv.list_permutation, inv.string_capitalization]),
+        Value([2, 1, 0]),
+    ]
+    ref = ReferenceImplementation("foo", annots)
+
+    with mock.patch.object(inv.list_permutation, "run", wraps=inv.list_permutation.run) as mocked_run:
+        expected = [a.check(fp) for a in annots]
+        num_calls = mocked_run.call_count
+        assert num_calls > 2 * len(vals)
+
+        mocked_run.reset_mock()
+        res = ref.run(fp)
+        assert [r.satisfied_at for r in res.results] == [r.satisfied_at for r in expected] == \
+            [9, 9, 0, -1]
+
+        # the permutations of each value are computed once, since the comparators for the expected
+        # values were compiled by the first checks
+        assert mocked_run.call_count == len(vals)
+
+        # the cache doesn't outlive the run
+        mocked_run.reset_mock()
+        with check_context(fp) as context:
+            assert get_check_context(fp) is context
+            assert get_check_context(MemoryFootprint()) is None
+            annots[0].check(fp)
+            with check_context(fp) as inner_context:
+                assert inner_context is context
+            annots[1].check(fp)
+
+        assert get_check_context(fp) is None
+        assert mocked_run.call_count == len(vals)
+
+    # contexts are only active in the thread that created them
+    with check_context(fp) as context:
+        with ThreadPoolExecutor(1) as executor:
+            assert executor.submit(get_check_context, fp).result() is None
+            assert executor.submit(lambda: ref.run(fp).results[0].satisfied_at).result() == 9
+        assert get_check_context(fp) is context
+
+
 def test_attribute_annotation():
     """
     """
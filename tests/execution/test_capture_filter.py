@@ -0,0 +1,127 @@
+"""Tests for capture filters"""
+
+import numpy as np
+import pandas as pd
+
+import pybryt
+
+from pybryt.execution.capture_filter import CaptureFilter, get_type_kind, get_value_kind
+from pybryt.execution.memory_footprint import _get_type_names
+
+
+def test_get_value_kind():
+    """
+    Tests for ``pybryt.execution.capture_filter.get_value_kind``.
+    """
+    assert get_value_kind(None) == "none"
+    assert get_value_kind("a") == "str"
+    assert get_value_kind(np.str_("a")) == "str"
+    assert get_value_kind(b"a") == "bytes"
+    assert get_value_kind(1) == "scalar"
+    assert get_value_kind(True) == "scalar"
+    assert get_value_kind(np.float64(1)) == "scalar"
+    assert get_value_kind([1]) == "container"
+    assert get_value_kind({1: 2}) == "container"
+    assert get_value_kind(np.arange(3)) == "shaped"
+    assert get_value_kind(pd.DataFrame({"a": [1]})) == "shaped"
+
+    class Foo:
+        pass
+
+    assert get_value_kind(Foo()) is None
+    assert get_value_kind(type("MyInt", (int,), {})(1)) is None
+
+    # types are classified like their values
+    for val in [None, "a", np.str_("a"), b"a", 1, np.float64(1), [1], np.arange(3), Foo(),
+            type("MyInt", (int,), {})(1)]:
+        assert get_type_kind(_get_type_names(type(val))) == get_value_kind(val)
+
+
+def test_capture_filter():
+    """
+    Tests for ``pybryt.execution.capture_filter.CaptureFilter``.
+    """
+    class Foo:
+        pass
+
+    capture_filter = CaptureFilter()
+    assert not capture_filter.accepts(1)
+    assert capture_filter.accepts(Foo())
+
+    capture_filter.accept_value(1)
+    assert capture_filter.accepts(1) and capture_filter.accepts(np.int64(2))
+    assert not capture_filter.accepts("a")
+    assert not capture_filter.accepts([1, 2])
+    assert not capture_filter.accepts(None)
+
+    capture_filter.accept_value(np.zeros((2, 3)))
+    assert capture_filter.accepts(np.ones((2, 3)))
+    assert capture_filter.accepts(pd.DataFrame(np.ones((2, 3))))
+    assert not capture_filter.accepts(np.ones(6))
+
+    assert capture_filter.accepts_type(_get_type_names(int))
+    assert capture_filter.accepts_type(_get_type_names(np.ndarray))
+    assert capture_filter.accepts_type(_get_type_names(Foo))
+    assert not capture_filter.accepts_type(_get_type_names(str))
+
+    capture_filter.accept_instances_of(str)
+    assert capture_filter.accepts("a")
+    assert capture_filter.accepts_type(_get_type_names(np.str_))
+
+    capture_filter = CaptureFilter()
+    capture_filter.accept_value([1, 2, 3])
+    assert capture_filter.accepts((1, 2, 3))
+    assert capture_filter.accepts("abc")
+    assert capture_filter.accepts(np.arange(3))
+    assert not capture_filter.accepts(1)
+
+    capture_filter = CaptureFilter()
+    capture_filter.accept_value(Foo())
+    assert capture_filter.accept_all and capture_filter.accepts(1)
+
+    f1, f2 = CaptureFilter(), CaptureFilter()
+    f1.accept_value(1)
+    f1.track_lines = True
+    f2.accept_value(np.zeros(4))
+    f2.accept_instances_of(str)
+    combined = CaptureFilter.combine(f1, f2)
+    assert combined.track_lines and not combined.accept_all
+    assert combined.kinds == {"scalar"}
+    assert combined.shapes == {(4,)}
+    assert combined.instance_types == (str,)
+    assert combined == CaptureFilter.combine(f2, f1)
+    assert combined != f1
+
+
+def test_annotation_capture_filters():
+    """
+    Tests for the capture filters created from annotations by
+    ``pybryt.ReferenceImplementation.get_capture_filter``.
+    """
+    ref = pybryt.ReferenceImplementation("foo", [
+        pybryt.Value(1, group="1"),
+        pybryt.Value(np.zeros(3)).before(pybryt.Value("a")),
+        pybryt.ReturnValue(None, group="2"),
+        pybryt.RequireImport("numpy", group="2"),
+        pybryt.ForbidType(list, group="3"),
+    ])
+
+    capture_filter = ref.get_capture_filter()
+    assert capture_filter.track_lines and not capture_filter.accept_all
+    assert capture_filter.kinds == {"scalar", "str", "none"}
+    assert capture_filter.shapes == {(3,)}
+    assert capture_filter.instance_types == (list,)
+
+    # imports are detected from the values referenced by lines, so import annotations track them
+    capture_filter = ref.get_capture_filter("2")
+    assert capture_filter.track_lines
+    assert capture_filter.kinds == {"none"}
+
+    ref = pybryt.ReferenceImplementation("foo", [
+        pybryt.Value(1, invariants=[pybryt.invariants.string_capitalization]),
+    ])
+    assert ref.get_capture_filter().accept_all
+
+    ref = pybryt.ReferenceImplementation("foo", [pybryt.Attribute(np.zeros(3), "T", enforce_type=True)])
+    capture_filter = ref.get_capture_filter()
+    assert capture_filter.track_lines and capture_filter.instance_types == (np.ndarray,)
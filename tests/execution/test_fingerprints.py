@@ -0,0 +1,56 @@
+"""Tests for fingerprint caching"""
+
+import gc
+import numpy as np
+
+from unittest import mock
+
+from pybryt.execution.fingerprints import FINGERPRINT_CACHE_MIN_LENGTH, FingerprintCache
+from pybryt.utils import fingerprint
+
+
+def test_fingerprint_cache():
+    """
+    Tests for ``pybryt.execution.fingerprints.FingerprintCache``.
+    """
+    cache = FingerprintCache(max_size=2)
+    arr = np.arange(100)
+    s = "a" * FINGERPRINT_CACHE_MIN_LENGTH
+    t = tuple(range(FINGERPRINT_CACHE_MIN_LENGTH))
+    l = list(range(FINGERPRINT_CACHE_MIN_LENGTH))
+
+    with mock.patch("pybryt.execution.fingerprints.fingerprint", wraps=fingerprint) as mocked_fp:
+        for _ in range(3):
+            assert cache.get_fingerprint(arr) == fingerprint(arr)
+            assert cache.get_fingerprint(s) == fingerprint(s)
+            assert cache.get_fingerprint(t) == fingerprint(t)
+        assert mocked_fp.call_count == 3
+        assert len(cache) == 3
+
+        # check that mutable objects without witnesses aren't cached
+        cache.get_fingerprint(l)
+        cache.get_fingerprint(l)
+        assert mocked_fp.call_count == 5
+
+        # check that changed arrays are re-fingerprinted
+        arr[0] = 100
+        assert cache.get_fingerprint(arr) == fingerprint(arr)
+        assert mocked_fp.call_count == 6
+
+        arr.shape = (10, 10)
+        assert cache.get_fingerprint(arr) == fingerprint(arr)
+        assert mocked_fp.call_count == 7
+
+        # check LRU eviction of immutable values
+        cache.get_fingerprint("b" * FINGERPRINT_CACHE_MIN_LENGTH)
+        cache.get_fingerprint(s)
+        assert mocked_fp.call_count == 9
+
+    # check that entries for garbage-collected arrays are removed
+    n = len(cache)
+    del arr, mocked_fp  # the mock holds references to its call arguments
+    gc.collect()
+    assert len(cache) == n - 1
+
+    cache.clear()
+    assert len(cache) == 0
@@ -1,6 +1,10 @@
 """Tests for memory footprint objects"""
 
+import dill
 import nbformat
+import numbers
+import numpy as np
+import os
 import pytest
 
 from copy import deepcopy
@@ -8,7 +12,8 @@ from itertools import chain
 from unittest import mock
 
 from pybryt.execution.memory_footprint import (
-    Counter, Event, MemoryFootprint, MemoryFootprintIterator, MemoryFootprintValue)
+    Counter, Event, EVENT_CODES, MemoryFootprint, MemoryFootprintIterator, MemoryFootprintValue)
+from pybryt.utils import fingerprint, UnpickleableError
 
 
 def generate_values():
@@ -113,13 +118,13 @@ def test_values():
     assert footprint.get_value(1).timestamp == 1
     assert footprint.get_value(1).event is None
 
-    footprint.add_value(3, 10)
+    assert footprint.add_value(3, 10) == 2
     assert len(footprint) == 3
     assert footprint.get_value(2).value == 3
     assert footprint.get_value(2).timestamp == 10
 
     footprint.increment_counter()
-    footprint.add_value(2, event=Event.LINE)
+    assert footprint.add_value(2, event=Event.LINE) == 1
     assert len(footprint) == 3
     assert footprint.get_value(1).event == Event.LINE
 
@@ -131,6 +136,55 @@ def test_values():
     assert len(footprint) == 3
     assert footprint.get_value(1).event == Event.LINE_AND_RETURN
 
+    # check that snapshots are only taken of new values
+    snapshot = mock.MagicMock(side_effect=lambda v: list(v))
+    val = [1, 2]
+    footprint.add_value(val, snapshot=snapshot)
+    footprint.add_value([1, 2], snapshot=snapshot)
+    snapshot.assert_called_once_with(val)
+    assert len(footprint) == 4
+    assert footprint.get_value(3).value == val and footprint.get_value(3).value is not val
+
+    # check that a failed snapshot doesn't leave the value indexed
+    snapshot.side_effect = Exception()
+    with pytest.raises(Exception):
+        footprint.add_value([3], snapshot=snapshot)
+    assert len(footprint) == 4
+    footprint.add_value([3])
+    assert len(footprint) == 5
+
+
+def test_memory_limit(tmp_path):
+    """
+    Tests for spilling values to disk in the ``MemoryFootprint`` class.
+    """
+    footprint = MemoryFootprint(memory_limit=100, spill_dir=str(tmp_path))
+    footprint.add_value("a" * 200, 1, Event.LINE)
+    footprint.add_value([1, 2], 2, Event.LINE)
+    footprint.add_value([1, 2], 3, Event.RETURN)
+    assert len(footprint) == 2
+    assert footprint.num_spilled == 1
+    assert len(os.listdir(tmp_path)) == 1
+    assert footprint.objects[0] == "a" * 200
+    assert footprint.get_value(1) == MemoryFootprintValue([1, 2], 2, Event.LINE_AND_RETURN)
+    assert footprint.get_fingerprint(1) == fingerprint([1, 2])
+
+    # spilled values are not snapshotted
+    snapshot = mock.MagicMock()
+    footprint.add_value({"a": 1}, 5, snapshot=snapshot)
+    snapshot.assert_not_called()
+
+    # unpickleable values stay in memory
+    footprint.add_value((i for i in range(3)), 6, Event.LINE, allow_duplicates=True)
+    assert len(footprint) == 4 and footprint.num_spilled == 2
+
+    footprint.filter_out_unpickleable_values()
+    assert [v.value for v in footprint] == ["a" * 200, [1, 2], {"a": 1}]
+
+    footprint2 = deepcopy(footprint)
+    assert footprint2 == footprint
+    assert footprint2.get_value(2).value == {"a": 1}
+
 
 def test_calls():
     """
@@ -176,7 +230,195 @@ def test_filter_out_unpickleable_values():
 
     with mock.patch("pybryt.execution.memory_footprint.filter_pickleable_list") as mocked_filter:
         footprint.filter_out_unpickleable_values()
-        mocked_filter.assert_called_once_with(footprint.values)
+        mocked_filter.assert_called_once_with(list(enumerate(footprint.objects)))
+
+    footprint.add_value((i for i in range(3)), 20, Event.LINE, allow_duplicates=True)
+    footprint.add_value(11, 8, Event.RETURN)
+    footprint.filter_out_unpickleable_values()
+    assert len(footprint) == len(vals) + 1
+    assert footprint.get_value(-1) == MemoryFootprintValue(11, 8, Event.RETURN)
+    assert footprint.num_steps == 8
+    assert footprint.add_value(11) == len(vals)
+
+
+def test_pickleability():
+    """
+    Tests that ``MemoryFootprint`` records the pickleability of values when they're fingerprinted
+    so that they aren't pickled again when unpickleable values are filtered out.
+    """
+    footprint = MemoryFootprint()
+    for i, v in enumerate([1, "a", np.arange(3), (1, 2)]):
+        footprint.add_value(v, i, Event.LINE)
+
+    with mock.patch("pybryt.execution.memory_footprint.filter_pickleable_list") as mocked_filter:
+        footprint.filter_out_unpickleable_values()
+        mocked_filter.assert_called_once_with([])
+
+    gen = (i for i in range(3))
+    footprint.add_value(gen, 4, Event.LINE, allow_duplicates=True)
+    footprint.add_value([5], 5, Event.LINE, allow_duplicates=True)
+    with pytest.raises(UnpickleableError):
+        footprint.get_fingerprint(4)
+
+    with mock.patch("pybryt.execution.memory_footprint.filter_pickleable_list") as mocked_filter:
+        footprint.filter_out_unpickleable_values()
+        mocked_filter.assert_called_once_with([(5, [5])])
+
+    footprint.filter_out_unpickleable_values()
+    assert len(footprint) == 5
+    assert footprint.get_value(-1) == MemoryFootprintValue([5], 5, Event.LINE)
+    assert footprint.add_value((1, 2)) == 3
+
+
+def test_columns():
+    """
+    Tests for the column views of the ``MemoryFootprint`` class.
+    """
+    footprint = MemoryFootprint.from_values(*generate_values())
+    assert footprint.objects == [10, "", True, None, 10039, 1e-4]
+    assert footprint.timestamps.tolist() == [1, 2, 3, 4, 5, 6]
+    assert footprint.event_codes.tolist() == [0] * 6
+    assert not footprint.fingerprints.any()
+    assert footprint.num_steps == 6
+
+    with pytest.raises(ValueError):
+        footprint.timestamps[0] = 2
+
+    # views keep their rows when values are added
+    timestamps = footprint.timestamps
+    footprint.add_value([1], 10, Event.LINE)
+    footprint.add_value([1], 11, Event.RETURN)
+    assert len(timestamps) == 6
+    assert footprint.timestamps.tolist() == [1, 2, 3, 4, 5, 6, 10]
+    assert footprint.event_codes[-1] == EVENT_CODES[Event.LINE_AND_RETURN]
+    assert footprint.fingerprints[-1].tobytes() == fingerprint([1])
+    assert footprint.num_steps == 10
+
+    # fingerprints are computed on demand
+    assert footprint.get_fingerprint(0) == fingerprint(10)
+    assert footprint.fingerprints[0].tobytes() == fingerprint(10)
+
+    footprint2 = dill.loads(dill.dumps(footprint))
+    assert footprint2 == footprint
+    assert footprint2.get_value(-1) == footprint.get_value(-1)
+
+    footprint.clear()
+    assert len(footprint) == 0 and len(footprint.timestamps) == 0 and footprint.num_steps == -1
+
+
+def test_type_index():
+    """
+    Tests for the index of values by type of the ``MemoryFootprint`` class.
+    """
+    class MyInt(int):
+        pass
+
+    footprint = MemoryFootprint.from_values(*generate_values())
+    footprint.add_value(MyInt(3), 7)
+    footprint.add_value((i for i in range(3)), 8, allow_duplicates=True)
+    footprint.add_value(np.arange(3), 9)
+    assert footprint.get_type_name(0) == "builtins.int"
+    assert footprint.get_type_name(6) == MyInt.__module__ + "." + MyInt.__qualname__
+
+    assert footprint.get_indices_of_type(int) == [0, 2, 4, 6]
+    assert footprint.get_indices_of_type(MyInt) == [6]
+    assert footprint.get_indices_of_type(bool) == [2]
+    assert footprint.get_indices_of_type(list) == []
+    assert footprint.get_indices_of_type(object) == list(range(len(footprint)))
+    assert footprint.get_indices_by_type(lambda names: names[0] == "builtins.int") == [0, 4]
+
+    # abstract base classes can have instances that aren't subclasses
+    assert footprint.get_indices_of_type(numbers.Integral) == list(range(len(footprint)))
+
+    # the index is kept up to date when values are filtered out and when footprints are combined
+    footprint.filter_out_unpickleable_values()
+    assert footprint.get_indices_of_type(np.ndarray) == [7]
+    assert footprint.get_indices_of_type(int) == [0, 2, 4, 6]
+
+    combined = MemoryFootprint.combine(footprint, MemoryFootprint.from_values(
+        MemoryFootprintValue(5, 1, None), MemoryFootprintValue("a", 2, None)))
+    assert combined.get_indices_of_type(int) == [0, 2, 4, 6, 8]
+    assert combined.get_indices_of_type(str) == [1, 9]
+
+    footprint.clear()
+    assert footprint.get_indices_of_type(int) == []
+
+
+def test_fingerprint_index():
+    """
+    Tests for looking up values by fingerprint in the ``MemoryFootprint`` class.
+    """
+    footprint = MemoryFootprint()
+    footprint.add_value(1, 1)
+    footprint.add_value("a", 2)
+    assert footprint.get_index_of_fingerprint(fingerprint("a")) == 1
+    assert footprint.get_index_of_fingerprint(fingerprint("b")) is None
+    assert footprint.are_fingerprints_indexed(str) and footprint.are_fingerprints_indexed(list)
+
+    footprint.add_value("b", 3, allow_duplicates=True)
+    assert footprint.get_index_of_fingerprint(fingerprint("b")) is None
+    assert not footprint.are_fingerprints_indexed(str) and footprint.are_fingerprints_indexed(int)
+
+    combined = MemoryFootprint.combine(footprint, MemoryFootprint.from_values(*generate_values()))
+    assert combined.get_index_of_fingerprint(fingerprint("b")) == 2
+    assert combined.are_fingerprints_indexed(str)
+
+    footprint = MemoryFootprint.from_values(*generate_values())
+    assert footprint.get_index_of_fingerprint(fingerprint(10)) is None
+    assert not footprint.are_fingerprints_indexed(int)
+
+
+def test_scalar_index():
+    """
+    Tests for looking up real scalars by value in the ``MemoryFootprint`` class.
+    """
+    footprint = MemoryFootprint()
+    for i, val in enumerate([3, 1.5, "2", np.int64(2), True, float("nan"), 2 ** 60, 2.0]):
+        footprint.add_value(val, i)
+
+    assert footprint.get_indices_in_range(1, 2) == [1, 3, 4, 6, 7]
+    assert footprint.get_indices_in_range(2.5, 10) == [0, 6]
+    assert footprint.get_indices_in_range(4, 3) == [6]
+
+    # the index is rebuilt when values are added
+    footprint.add_value(np.float32(9), 8)
+    footprint.add_value(9.5, 9)
+    assert footprint.get_indices_in_range(2.5, 10) == [0, 6, 8, 9]
+
+
+def test_stacked_arrays():
+    """
+    Tests for stacking arrays by shape and dtype in the ``MemoryFootprint`` class.
+    """
+    footprint = MemoryFootprint()
+    for i, val in enumerate([
+        np.zeros(3), np.ones((3, 1)), np.arange(3), np.ones(3), np.array(["a", "b", "c"]), [1, 2, 3],
+    ]):
+        footprint.add_value(val, i)
+
+    stacks, others = footprint.get_stacked_arrays((3,))
+    assert sorted((s.dtype, s.shape, idx) for s, idx in stacks) == sorted([
+        (np.dtype(float), (2, 3), [0, 3]),
+        (np.dtype(int), (1, 3), [2]),
+    ])
+    assert others == [4]
+    assert footprint.get_stacked_arrays((3,))[0] is stacks
+    assert footprint.get_stacked_arrays((2,)) == ([], [])
+
+    # the stacks are rebuilt when values are added
+    footprint.add_value(np.full(3, 2.0), 6)
+    stacks, _ = footprint.get_stacked_arrays((3,))
+    assert [idx for s, idx in stacks if s.dtype == float] == [[0, 3, 6]]
+
+    # the indices are caches, so they aren't pickled
+    footprint.get_indices_in_range(0, 1)
+    loaded = dill.loads(dill.dumps(footprint))
+    assert loaded._scalar_index is None and loaded._array_index is None
+    assert loaded._array_stacks == {}
+    assert len(dill.dumps(footprint)) < len(dill.dumps(footprint.__dict__))
+    stacks, others = loaded.get_stacked_arrays((3,))
+    assert [idx for s, idx in stacks if s.dtype == float] == [[0, 3, 6]]
+    assert others == [4]
 
 
 def test_eq():
@@ -191,6 +433,42 @@ def test_eq():
     assert f1 == f3
 
 
+def test_legacy_pickles():
+    """
+    Test that footprints pickled by versions that stored their values as a list of tuples can be
+    unpickled.
+    """
+    vals = generate_values()
+    nb = nbformat.v4.new_notebook()
+    fp = MemoryFootprint.__new__(MemoryFootprint)
+    fp.__dict__.update({
+        "counter": Counter(7),
+        "_value_indices_by_hash": {b"foo": 0},
+        "values": [(v.value, v.timestamp, v.event) for v in vals] + [(np.arange(3), 7, Event.RETURN)],
+        "calls": [("foo.py", "bar")],
+        "imports": {"numpy"},
+        "executed_notebook": nb,
+        "initial_conditions": {"foo": 1},
+    })
+
+    loaded = dill.loads(dill.dumps(fp))
+    assert list(loaded)[:6] == vals
+    assert np.array_equal(loaded.get_value(6).value, np.arange(3))
+    assert loaded.get_value(6).event is Event.RETURN
+    assert loaded.calls == [("foo.py", "bar")]
+    assert loaded.imports == {"numpy"}
+    assert loaded.executed_notebook == nb
+    assert loaded.get_initial_conditions() == {"foo": 1}
+    assert loaded.num_steps == 7
+    assert loaded.memory_limit is None
+    assert loaded.get_indices_of_type(np.ndarray) == [6]
+
+    # the values are indexed by their fingerprints, so duplicates aren't added
+    assert loaded.get_index_of_fingerprint(fingerprint("")) == 1
+    assert loaded.add_value("", event=Event.RETURN) == 1
+    assert len(loaded) == 7
+
+
 def test_misc_dunder_methods():
     """
     Tests for misc. dunder methods of ``MemoryFootprint``.
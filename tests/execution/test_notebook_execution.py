@@ -1,9 +1,12 @@
 """Tests for PyBryt execution internals"""
 
+import base64
 import dill
 import nbformat
 import numpy as np
+import os
 import pathlib
+import pytest
 import random
 import tempfile
 
@@ -11,6 +14,8 @@ from unittest import mock
 
 import pybryt.execution
 
+from pybryt.execution.monitoring import is_monitoring_available
+
 
 def generate_test_notebook():
     """
@@ -40,3 +45,49 @@ def test_notebook_execution():
             assert len(footprint) > 0
             assert all(i in footprint.imports for i in ["pandas", "numpy", "matplotlib"])
             assert len(footprint.calls) > 0
+
+
+def test_tracing_args():
+    """
+    Tests that the capture filter and online checker are passed to the kernel in a file that it
+    removes, instead of in the executed notebook.
+    """
+    nb = generate_test_notebook()
+    ref = pybryt.ReferenceImplementation("foo", [pybryt.Value(np.arange(3))])
+    online_checker = ref.get_online_checker()
+
+    paths = []
+    mkstemp = tempfile.mkstemp
+    def record_mkstemp(*args, **kwargs):
+        fd, path = mkstemp(*args, **kwargs)
+        paths.append(path)
+        return fd, path
+
+    with mock.patch("pybryt.execution.mkstemp", side_effect=record_mkstemp):
+        footprint = pybryt.execution.execute_notebook(nb, "", online_checker=online_checker)
+
+    assert len(footprint) > 0
+    assert len(paths) == 2 and not any(os.path.exists(p) for p in paths)
+    assert not any(
+        type(v.value) is type(online_checker) or isinstance(v.value, dict) and \
+            "online_checker" in v.value for v in footprint)
+
+    pickled = base64.b64encode(dill.dumps(online_checker)).decode()
+    source = "\n".join(c.source for c in footprint.executed_notebook.cells)
+    assert pickled not in source and "b64decode" not in source
+
+
+@pytest.mark.skipif(not is_monitoring_available(), reason="sys.monitoring requires Python 3.12+")
+def test_monitoring_backend():
+    """
+    Tests that notebooks executed with the ``sys.monitoring`` backend produce the same footprint.
+    """
+    nb = generate_test_notebook()
+    footprint = pybryt.execution.execute_notebook(nb, "")
+    monitoring_footprint = pybryt.execution.execute_notebook(nb, "", backend="monitoring")
+
+    assert len(monitoring_footprint) == len(footprint)
+    assert monitoring_footprint.num_steps == footprint.num_steps
+    for expected, actual in zip(footprint, monitoring_footprint):
+        assert expected.timestamp == actual.timestamp
+        assert expected.event == actual.event
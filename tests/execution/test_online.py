@@ -0,0 +1,83 @@
+"""Tests for online annotation checking"""
+
+import dill
+import numpy as np
+
+import pybryt
+
+from pybryt.execution import create_collector, Event, MemoryFootprint, OnlineChecker
+
+from .utils import generate_mocked_frame
+
+
+def test_online_checker():
+    """
+    Tests for ``pybryt.execution.online.OnlineChecker``.
+    """
+    v1, v2 = pybryt.Value(1), pybryt.ReturnValue(np.arange(3))
+    checker = OnlineChecker([v1.before(v2), pybryt.ForbidType(str)])
+    assert checker.decidable and not checker.decided
+
+    footprint = MemoryFootprint()
+    assert not checker.update(footprint, footprint.add_value(2, 1, Event.LINE))
+    assert not checker.update(footprint, footprint.add_value(1, 2, Event.LINE))
+    assert not checker.update(footprint, footprint.add_value(np.arange(3), 3, Event.LINE))
+    assert not checker.update(footprint, footprint.add_value(np.arange(3), 4, Event.RETURN))
+    assert not checker.decided
+    assert checker.update(footprint, footprint.add_value("a", 5, Event.LINE))
+    assert checker.decided
+
+    # only the first value satisfying a return value annotation is considered
+    checker = OnlineChecker([pybryt.ReturnValue(1.0, atol=0.5)])
+    footprint = MemoryFootprint()
+    assert not checker.update(footprint, footprint.add_value(1.1, 1, Event.LINE))
+    assert not checker.update(footprint, footprint.add_value(1.2, 2, Event.RETURN))
+    assert checker.update(footprint, footprint.add_value(1.1, 3, Event.RETURN))
+
+    checker = OnlineChecker([pybryt.Attribute(np.arange(3), "T", enforce_type=True)])
+    footprint = MemoryFootprint()
+    assert not checker.update(footprint, footprint.add_value([0, 1, 2], 1, Event.LINE))
+    assert checker.update(footprint, footprint.add_value(np.arange(3), 2, Event.LINE))
+
+    checker = OnlineChecker([pybryt.RequireImport("numpy")])
+    footprint = MemoryFootprint()
+    assert not checker.update(footprint, footprint.add_value(1, 1, Event.LINE))
+    footprint.add_imports("numpy")
+    assert checker.update(footprint, footprint.add_value(2, 2, Event.LINE))
+
+    # annotations whose results can't be decided early
+    checker = OnlineChecker([pybryt.Value(1), pybryt.Value(1, name="foo") | pybryt.ForbidType(str),
+        pybryt.TimeComplexity(pybryt.complexities.linear, name="foo")])
+    assert not checker.decidable
+    footprint = MemoryFootprint()
+    assert not checker.update(footprint, footprint.add_value(1, 1, Event.LINE))
+    assert not checker.decided
+
+    # unpickled checkers are reset
+    checker = OnlineChecker([pybryt.Value(1)])
+    footprint = MemoryFootprint()
+    checker.update(footprint, footprint.add_value(1, 1, Event.LINE))
+    assert checker.decided
+    checker2 = dill.loads(dill.dumps(checker))
+    assert checker2.annotations == checker.annotations and not checker2.decided
+
+
+def test_early_stopping():
+    """
+    Tests for the ``online_checker`` argument of ``pybryt.execution.tracing.create_collector``.
+    """
+    frame = generate_mocked_frame("<ipython-abc123>", "foo", 3)
+    ref = pybryt.ReferenceImplementation("foo", [pybryt.Value(1), pybryt.Value(2)])
+    footprint, cir = create_collector(online_checker=ref.get_online_checker())
+
+    cir(frame, "return", 1)
+    cir(frame, "return", 3)
+    cir(frame, "return", 2)
+    assert len(footprint) == 3
+
+    # values are no longer captured, but steps are still counted
+    cir(frame, "return", 4)
+    cir(frame, "call", None)
+    assert len(footprint) == 3
+    assert footprint.counter.get_value() == 5
+    assert ref.run(footprint).correct
@@ -0,0 +1,65 @@
+"""Tests for segment files"""
+
+import dill
+import numpy as np
+import os
+import pandas as pd
+import sys
+
+from unittest import mock
+
+from pybryt.execution.segments import estimate_size, SegmentFile, SpilledValue
+from pybryt.utils import dump_out_of_band, dumps_out_of_band, load_out_of_band, loads_out_of_band
+
+
+def test_estimate_size():
+    """
+    Tests for ``pybryt.execution.segments.estimate_size``.
+    """
+    arr = np.zeros(1000)
+    assert estimate_size(arr) >= arr.nbytes
+    assert estimate_size(arr[:500]) >= 500 * arr.itemsize
+    assert estimate_size(pd.Series(arr)) >= arr.nbytes
+    assert estimate_size(pd.DataFrame({"a": arr})) >= arr.nbytes
+    assert estimate_size(1) == sys.getsizeof(1)
+    assert estimate_size(["a" * 100]) > 100
+    assert estimate_size({"a": "b" * 100}) > 100
+
+
+def test_segment_file(tmp_path):
+    """
+    Tests for ``pybryt.execution.segments.SegmentFile``.
+    """
+    segment = SegmentFile(str(tmp_path))
+    assert os.path.dirname(segment.path) == str(tmp_path)
+
+    spilled = [segment.dump(v) for v in [1, "a", np.arange(10)]]
+    assert all(isinstance(s, SpilledValue) for s in spilled)
+    assert segment.load(spilled[1]) == "a"
+    assert np.array_equal(segment.load(spilled[2]), np.arange(10))
+    assert segment.load(spilled[0]) == 1
+
+    segment2 = dill.loads(dill.dumps(segment))
+    assert segment2.path != segment.path and segment2.size == segment.size
+    assert segment2.load(dill.loads(dill.dumps(spilled[1]))) == "a"
+
+    # out-of-band pickles map the contents from the file instead of reading them
+    with mock.patch.object(segment._file, "read", wraps=segment._file.read) as mocked_read:
+        data = dumps_out_of_band(segment)
+        mocked_read.assert_not_called()
+
+    segment3 = loads_out_of_band(data)
+    assert segment3.size == segment.size
+    assert np.array_equal(segment3.load(spilled[2]), np.arange(10))
+
+    path = tmp_path / "segment.pkl"
+    with open(path, "wb") as f:
+        dump_out_of_band(segment, f)
+    assert load_out_of_band(str(path)).load(spilled[1]) == "a"
+
+    empty = loads_out_of_band(dumps_out_of_band(SegmentFile(str(tmp_path))))
+    assert empty.size == 0
+
+    path = segment.path
+    del segment
+    assert not os.path.exists(path)
@@ -0,0 +1,57 @@
+"""Tests for snapshot strategies"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pybryt.execution.snapshots import (
+    buffer_snapshot, deep_snapshot, get_snapshot_strategy, shallow_snapshot, SNAPSHOT_STRATEGIES)
+
+
+def test_snapshot_strategies():
+    """
+    Tests for the snapshot functions in ``pybryt.execution.snapshots``.
+    """
+    arr = np.arange(10)
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    val = [arr, {"df": df, "n": 1}, (arr, "a")]
+
+    snapshot = shallow_snapshot(val)
+    assert snapshot is not val and snapshot[0] is arr
+
+    snapshot = deep_snapshot(val)
+    assert snapshot[0] is not arr and snapshot[1]["df"] is not df
+
+    snapshot = buffer_snapshot(val)
+    assert snapshot is not val
+    assert snapshot[0] is not arr and np.array_equal(snapshot[0], arr)
+    assert snapshot[1]["df"] is not df and snapshot[1]["df"].equals(df)
+    assert snapshot[2][0] is not arr and snapshot[2][1] == "a"
+
+    arr[0] = 100
+    df.loc[0, "a"] = 100
+    assert snapshot[0][0] == 0
+    assert snapshot[1]["df"].loc[0, "a"] == 1
+
+    # check that self-referential containers are shallow-copied
+    l = [arr]
+    l.append(l)
+    snapshot = buffer_snapshot(l)
+    assert snapshot is not l and snapshot[0] is arr
+
+    assert buffer_snapshot(1) == 1
+    assert buffer_snapshot(np.float64(1.5)) == 1.5
+
+
+def test_get_snapshot_strategy():
+    """
+    Tests for ``pybryt.execution.snapshots.get_snapshot_strategy``.
+    """
+    for name, fn in SNAPSHOT_STRATEGIES.items():
+        assert get_snapshot_strategy(name) is fn
+
+    fn = lambda val: val
+    assert get_snapshot_strategy(fn) is fn
+
+    with pytest.raises(ValueError, match="Invalid snapshot strategy"):
+        get_snapshot_strategy("foo")
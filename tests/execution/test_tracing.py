@@ -1,13 +1,18 @@
 """"""
 
 import numpy as np
+import pytest
 import sys
 
 from unittest import mock
 
-from pybryt import MemoryFootprint, no_tracing, set_initial_conditions
-from pybryt.execution import create_collector, FrameTracer, tracing_off, tracing_on
+from pybryt import (
+    ForbidImport, MemoryFootprint, no_tracing, ReferenceImplementation, ReturnValue,
+    set_initial_conditions)
+from pybryt.execution import CaptureFilter, create_collector, FrameTracer, tracing_off, tracing_on
 from pybryt.execution.memory_footprint import Event
+from pybryt.execution.monitoring import is_monitoring_available
+from pybryt.execution.tracing import get_line_info
 
 from .utils import generate_mocked_frame
 
@@ -37,9 +42,12 @@ def test_trace_function():
     assert len(footprint) == 1
 
     # test pickling error
+    class Foo:
+        pass
+
     with mock.patch("dill.dumps") as mocked_dumps:
         mocked_dumps.side_effect = Exception()
-        cir(frame, "return", 1)
+        cir(frame, "return", Foo())
     
     assert len(footprint) == 1
 
@@ -56,8 +64,15 @@ def test_trace_function():
     # check line processing working
     with mock.patch("linecache.getline") as mocked_linecache:
 
+        def set_line(line):
+            """
+            Set the mocked source line and clear the line cache so that the new line is read.
+            """
+            mocked_linecache.return_value = line
+            get_line_info.cache_clear()
+
         # check eval call for attributes
-        mocked_linecache.return_value = "data.T"
+        set_line("data.T")
         cir(frame, "line", None)
         assert len(footprint) == 2
         assert np.allclose(footprint.get_value(1).value, arr.T)
@@ -65,36 +80,36 @@ def test_trace_function():
         assert footprint.get_value(1).event == Event.LINE
 
         # check failed eval call for attributes
-        mocked_linecache.return_value = "data.doesnt_exist"
+        set_line("data.doesnt_exist")
         cir(frame, "line", None)
         assert len(footprint) == 2
 
         # check looking in frame locals + globals
         frame.f_globals["more_data"] = np.random.uniform(-100, 100, size=(100, 100))
         frame.f_locals["more_data"] = np.random.uniform(-100, 100, size=(100, 100))
-        mocked_linecache.return_value = "more_data"
+        set_line("more_data")
         cir(frame, "line", None)
         assert len(footprint) == 3
         assert np.allclose(footprint.get_value(2).value, frame.f_locals["more_data"])
         assert footprint.get_value(2).timestamp == 7
 
         # check that we track assignment statements on function return
-        mocked_linecache.return_value = "even_more_data = more_data ** 2"
+        set_line("even_more_data = more_data ** 2")
         cir(frame, "line", None)
         assert len(footprint) == 3
 
-        mocked_linecache.return_value = "even_more_data_2 = more_data ** 3"
+        set_line("even_more_data_2 = more_data ** 3")
         cir(frame, "line", None)
         assert len(footprint) == 3
 
         # check that floats aren't added with the eval call
-        mocked_linecache.return_value = "event_more_data_3 = [2.1, 1000, 100.3]"
+        set_line("event_more_data_3 = [2.1, 1000, 100.3]")
         cir(frame, "line", None)
         assert len(footprint) == 3
 
         frame.f_locals["even_more_data"] = frame.f_locals["more_data"] ** 2
         frame.f_globals["even_more_data_2"] = frame.f_locals["more_data"] ** 3
-        mocked_linecache.return_value = ""
+        set_line("")
         cir(frame, "return", None)
         assert len(footprint) == 6
         assert footprint.get_value(3).value is None
@@ -113,7 +128,7 @@ def test_trace_function():
         # check that addl_filenames respected
         frame = generate_mocked_frame(tracked_filepath, "bar", 100, f_back=frame)
         frame.f_locals["data"] = arr
-        mocked_linecache.return_value = "arr = -1 * data"
+        set_line("arr = -1 * data")
         cir(frame, "line", None)
         frame.f_locals["arr"] = -1 * arr
         cir(frame, "return", None) # run a return since arr shows up in vars_not_found
@@ -160,6 +175,255 @@ def test_trace_function():
         mocked_add_imports.assert_called_with(np.__name__)
 
 
+def test_line_info():
+    """
+    Tests for ``pybryt.execution.tracing.get_line_info``.
+    """
+    get_line_info.cache_clear()
+    with mock.patch("linecache.getline") as mocked_linecache:
+        mocked_linecache.return_value = "x = foo.bar(y, 1.5) + 2"
+        info = get_line_info("<ipython-abc123>", 1)
+        assert [t for t, _ in info.tokens] == ["bar", "foo", "foo.bar", "x", "y"]
+        assert [t for t, e in info.tokens if e is not None] == ["foo.bar"]
+        assert info.assignment_target == "x"
+
+        # check that the line is only read once
+        assert get_line_info("<ipython-abc123>", 1) is info
+        mocked_linecache.assert_called_once_with("<ipython-abc123>", 1)
+
+        mocked_linecache.return_value = "print(x)"
+        info = get_line_info("<ipython-abc123>", 2)
+        assert info.assignment_target is None
+
+    get_line_info.cache_clear()
+
+
+def _generate_squares(n):
+    for i in range(n):
+        yield i ** 2
+
+
+def _function_to_trace(n):
+    squares = list(_generate_squares(n))
+    try:
+        total = sum(squares) / (n - n)
+    except ZeroDivisionError:
+        total = sum(squares)
+    arr = np.array(squares)
+    return np.sqrt(arr) / total
+
+
+def _accumulate():
+    total = yield
+    while True:
+        try:
+            total += yield total
+        except ValueError:
+            total = 0
+
+
+def _function_with_jumps(n):
+    # loops on one line only jump backward to the same line, and generators are resumed by throw
+    # and close and exhausted by next
+    total = 0
+    for i in range(n): total += i
+    while total > n: total -= n
+    acc = _accumulate()
+    next(acc)
+    acc.send(total)
+    reset = acc.throw(ValueError())
+    acc.close()
+    squares = iter(_generate_squares(2))
+    first = [s for s in squares]
+    try:
+        next(squares)
+    except StopIteration:
+        pass
+    return total, reset, first
+
+
+@pytest.mark.skipif(not is_monitoring_available(), reason="sys.monitoring requires Python 3.12+")
+@pytest.mark.parametrize("fn", [_function_to_trace, _function_with_jumps])
+def test_monitoring_backend(fn):
+    """
+    Tests that the ``sys.monitoring`` backend produces the same footprint as ``sys.settrace``.
+    """
+    footprint, cir = create_collector(addl_filenames=[__file__])
+    sys.settrace(cir)
+    fn(10)
+    sys.settrace(None)
+
+    monitoring_footprint, collector = create_collector(
+        addl_filenames=[__file__], backend="monitoring")
+    collector.enable()
+    fn(10)
+    collector.disable()
+    assert not collector.enabled
+
+    assert len(footprint) > 0
+    assert len(monitoring_footprint) == len(footprint)
+    assert monitoring_footprint.counter.get_value() == footprint.counter.get_value()
+    for expected, actual in zip(footprint, monitoring_footprint):
+        assert type(expected.value) is type(actual.value)
+        assert np.all(expected.value == actual.value)
+        assert expected.timestamp == actual.timestamp
+        assert expected.event == actual.event
+
+    assert all(c in monitoring_footprint.calls for c in footprint.calls)
+
+
+def test_tracing_scope():
+    """
+    Tests for the ``scope`` argument of ``pybryt.execution.tracing.create_collector``.
+    """
+    tracked_filepath = "/path/to/tracked/file.py"
+    footprint, cir = create_collector(addl_filenames=[tracked_filepath], scope="student")
+
+    frame = generate_mocked_frame("<ipython-abc123>", "foo", 3)
+    assert cir(frame, "call", None) is cir
+    assert footprint.counter.get_value() == 1
+
+    # check that library frames aren't traced but are charged for
+    frame = generate_mocked_frame("/path/to/foo.py", "bar", 100, f_back=frame)
+    assert cir(frame, "call", None) is None
+    assert footprint.counter.get_value() == 2
+    assert footprint.calls[-1] == ("/path/to/foo.py", "bar")
+
+    # check that return values of library frames called from addl_filenames are tracked
+    frame = generate_mocked_frame(
+        "/path/to/foo.py", "bar", 100, f_back=generate_mocked_frame(tracked_filepath, "baz", 1))
+    local_trace = cir(frame, "call", None)
+    assert local_trace is not None and local_trace is not cir
+    assert not frame.f_trace_lines
+    assert footprint.counter.get_value() == 3
+
+    local_trace(frame, "return", [1, 2, 3])
+    assert len(footprint) == 1
+    assert footprint.get_value(0).value == [1, 2, 3]
+    assert footprint.get_value(0).timestamp == 3
+    assert footprint.get_value(0).event == Event.RETURN
+
+    # check callable costs
+    footprint, cir = create_collector(scope="student", library_call_cost=lambda frame: 10)
+    cir(generate_mocked_frame("/path/to/foo.py", "bar", 100), "call", None)
+    assert footprint.counter.get_value() == 10
+
+    # check that the default scope is unchanged
+    footprint, cir = create_collector()
+    assert cir(generate_mocked_frame("/path/to/foo.py", "bar", 100), "call", None) is cir
+    assert footprint.counter.get_value() == 0
+
+    footprint, cir = create_collector(addl_filenames=[__file__])
+    sys.settrace(cir)
+    _function_to_trace(10)
+    sys.settrace(None)
+
+    scoped_footprint, cir = create_collector(addl_filenames=[__file__], scope="student")
+    sys.settrace(cir)
+    _function_to_trace(10)
+    sys.settrace(None)
+
+    assert len(scoped_footprint) == len(footprint)
+    for expected, actual in zip(footprint, scoped_footprint):
+        assert np.all(expected.value == actual.value)
+        assert expected.event == actual.event
+
+    with pytest.raises(ValueError, match="Invalid tracing scope"):
+        create_collector(scope="foo")
+
+
+def test_snapshot():
+    """
+    Tests for the ``snapshot`` argument of ``pybryt.execution.tracing.create_collector``.
+    """
+    frame = generate_mocked_frame("<ipython-abc123>", "foo", 3)
+    snapshot = mock.MagicMock(side_effect=lambda v: v.copy())
+    footprint, cir = create_collector(snapshot=snapshot)
+
+    arr = np.arange(10)
+    cir(frame, "return", arr)
+    cir(frame, "return", arr)
+    snapshot.assert_called_once_with(arr)
+    assert len(footprint) == 1
+    assert footprint.get_value(0).value is not arr
+
+    footprint, cir = create_collector(snapshot="buffer")
+    arr = [np.arange(10)]
+    cir(frame, "return", arr)
+    assert footprint.get_value(0).value[0] is not arr[0]
+
+    with pytest.raises(ValueError, match="Invalid snapshot strategy"):
+        create_collector(snapshot="foo")
+
+
+def test_capture_filter():
+    """
+    Tests for the ``capture_filter`` argument of ``pybryt.execution.tracing.create_collector``.
+    """
+    frame = generate_mocked_frame("<ipython-abc123>", "foo", 3, {"x": 1, "s": "a"})
+    capture_filter = CaptureFilter()
+    capture_filter.accept_value(2)
+    footprint, cir = create_collector(capture_filter=capture_filter)
+
+    cir(frame, "return", "a")
+    cir(frame, "return", np.arange(3))
+    assert len(footprint) == 0
+
+    cir(frame, "return", 1)
+    assert len(footprint) == 1
+
+    # line events are ignored unless the filter tracks lines
+    with mock.patch("linecache.getline") as mocked_linecache:
+        mocked_linecache.return_value = "x + 1"
+        get_line_info.cache_clear()
+
+        cir(frame, "line", None)
+        assert len(footprint) == 1
+        assert footprint.counter.get_value() == 4
+
+        capture_filter.track_lines = True
+        footprint, cir = create_collector(capture_filter=capture_filter)
+        cir(frame, "line", None)
+        assert len(footprint) == 1
+        assert footprint.get_value(0).value == 1
+
+    get_line_info.cache_clear()
+
+
+def _sum_with_numpy():
+    return int(np.sum([1, 3]))
+
+
+def test_capture_filter_imports():
+    """
+    Tests that imports are tracked with the capture filters of references with import annotations.
+    """
+    ref = ReferenceImplementation("foo", [ForbidImport("numpy"), ReturnValue(4)])
+    capture_filter = ref.get_capture_filter()
+    assert capture_filter.track_lines
+
+    footprint, cir = create_collector(addl_filenames=[__file__], capture_filter=capture_filter)
+    sys.settrace(cir)
+    _sum_with_numpy()
+    sys.settrace(None)
+
+    assert "numpy" in footprint.imports
+    assert not ref.run(footprint).correct
+
+
+def test_tracing_backends():
+    """
+    Tests for backend validation in ``pybryt.execution.tracing.create_collector``.
+    """
+    with pytest.raises(ValueError, match="Invalid tracing backend"):
+        create_collector(backend="foo")
+
+    with mock.patch("pybryt.execution.tracing.is_monitoring_available") as mocked_available:
+        mocked_available.return_value = False
+        with pytest.raises(ValueError, match="requires Python 3.12"):
+            create_collector(backend="monitoring")
+
+
 def test_tracing_control():
     """
     """
@@ -0,0 +1,81 @@
+"""Tests for streaming memory footprints"""
+
+import dill
+import nbformat
+import numpy as np
+import socket
+
+import pybryt.execution
+
+from pybryt.execution.memory_footprint import Event, MemoryFootprint
+from pybryt.execution.transport import _send_frame, FootprintReceiver, FootprintSender
+
+from .test_notebook_execution import generate_test_notebook
+
+
+def test_stream_footprint():
+    """
+    Tests that footprints streamed from a ``FootprintSender`` are rebuilt by a
+    ``FootprintReceiver``.
+    """
+    receiver = FootprintReceiver()
+    sender = FootprintSender(receiver.address, receiver.token, chunk_size=2)
+
+    footprint = MemoryFootprint()
+    for i, val in enumerate([1, "a", np.arange(10), (1, 2)]):
+        footprint.increment_counter()
+        sender.update(footprint, footprint.add_value(val, i, Event.LINE))
+
+    # a duplicate seen in a return event updates the event of the existing row
+    sender.update(footprint, footprint.add_value(1, 5, Event.RETURN))
+    sender.update(footprint, footprint.add_value(
+        (i for i in range(3)), 6, Event.LINE, allow_duplicates=True))
+
+    footprint.add_value("b", 7, Event.RETURN)
+    footprint.add_call("foo.py", "bar")
+    footprint.add_imports("numpy")
+    footprint.set_initial_conditions({"x": 1})
+    sender.close(footprint)
+
+    received = receiver.get_footprint(timeout=10)
+    footprint.filter_out_unpickleable_values()
+    assert received == footprint
+    assert received.get_value(0).event is Event.LINE_AND_RETURN
+    assert received.num_steps == footprint.num_steps
+    assert received.counter.get_value() == footprint.counter.get_value()
+    assert received.get_initial_conditions() == {"x": 1}
+
+
+def test_receiver_authentication():
+    """
+    Tests that ``FootprintReceiver`` ignores connections with the wrong token and returns an empty
+    footprint if no sender connects.
+    """
+    receiver = FootprintReceiver()
+    with socket.create_connection(receiver.address) as sock:
+        _send_frame(sock, b"WRONG")
+        try:
+            _send_frame(sock, dill.dumps([("row", 0, 1, 1, 1, bytes(16))]))
+        except OSError:
+            pass
+
+    footprint = receiver.get_footprint(timeout=10)
+    assert len(footprint) == 0
+
+
+def test_stream_transport():
+    """
+    Tests that notebooks executed with the ``"stream"`` transport produce the same footprint.
+    """
+    nb = generate_test_notebook()
+    footprint = pybryt.execution.execute_notebook(nb, "")
+    streamed_footprint = pybryt.execution.execute_notebook(nb, "", transport="stream")
+
+    # calls made by the kernel itself vary between executions, so only the values are compared
+    assert len(streamed_footprint) == len(footprint)
+    assert streamed_footprint.num_steps == footprint.num_steps
+    assert streamed_footprint.imports == footprint.imports
+    assert np.array_equal(streamed_footprint.timestamps, footprint.timestamps)
+    assert np.array_equal(streamed_footprint.event_codes, footprint.event_codes)
+    assert np.array_equal(streamed_footprint.fingerprints, footprint.fingerprints)
+    assert isinstance(streamed_footprint.executed_notebook, nbformat.NotebookNode)
@@ -17,6 +17,7 @@ from unittest import mock
 
 from pybryt import ReferenceImplementation
 from pybryt.integrations.otter import OtterPlugin
+from pybryt.utils import loads_out_of_band
 
 from ..test_reference import generate_reference_notebook
 from ..test_student import generate_student_notebook
@@ -98,7 +99,7 @@ def test_during_generate():
         cfg = otter_config["plugins"][0][OtterPlugin.IMPORTABLE_NAME]
         assert "reference_bytes" in cfg
 
-        refs = dill.loads(base64.b64decode(cfg["reference_bytes"]))
+        refs = loads_out_of_band(base64.b64decode(cfg["reference_bytes"]))
         assert isinstance(refs, list)
         assert len(refs) == 1
         assert isinstance(refs[0], ReferenceImplementation)
@@ -111,7 +112,7 @@ def test_during_generate():
         cfg = otter_config["plugins"][0][OtterPlugin.IMPORTABLE_NAME]
         assert "reference_bytes" in cfg
 
-        refs = dill.loads(base64.b64decode(cfg["reference_bytes"]))
+        refs = loads_out_of_band(base64.b64decode(cfg["reference_bytes"]))
         assert isinstance(refs, list)
         assert len(refs) == 1
         assert isinstance(refs[0], ReferenceImplementation)
@@ -31,6 +31,11 @@ def test_check():
             mocked_ref.compile.assert_called_with(ref_ntf.name)
             mocked_stu.assert_called_with(stu_ntf.name, output=None)
             mocked_stu.return_value.check.return_value.dump.assert_called_with(get_stem(stu_ntf.name) + "_results.pkl")
+            mocked_stu.return_value.check.assert_called_with(mocked_ref.compile.return_value, workers=None)
+
+            result = runner.invoke(click_cli, ["check", ref_ntf.name, stu_ntf.name, "-w", "4"])
+            assert result.exit_code == 0
+            mocked_stu.return_value.check.assert_called_with(mocked_ref.compile.return_value, workers=4)
 
         with tempfile.NamedTemporaryFile(mode="w+", suffix=".pkl") as ref_ntf, \
                 tempfile.NamedTemporaryFile(mode="w+", suffix=".pkl") as stu_ntf:
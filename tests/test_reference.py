@@ -1,18 +1,24 @@
 """"""
 
 import dill
+import gc
 import json
+import multiprocessing
 import nbformat
 import numpy as np
 import os
 import pkg_resources
 import pytest
 import tempfile
+import weakref
 
 from copy import deepcopy
 from textwrap import dedent
+from unittest import mock
 
-from pybryt import generate_report, MemoryFootprint, ReferenceImplementation, Value
+from pybryt import (
+    generate_report, invariants, MemoryFootprint, ReferenceImplementation, StudentImplementation,
+    Value)
 from pybryt.execution import execute_notebook, MemoryFootprintValue
 
 
@@ -67,6 +73,7 @@ def test_reference_construction():
         ReferenceImplementation.compile(nb)
 
     ref = ReferenceImplementation.compile(nb, name="foo")
+    assert all(a._compiled is not None for a in ref.annotations)
 
     # test ReferenceImplementation.get
     sorted_annots = ref.get("sorted")
@@ -264,6 +271,219 @@ def test_run_and_results():
     assert res.messages == ["sm1", "fm2", "fm3"]
 
 
+def test_precompute():
+    """
+    """
+    before = Value(1).before(Value([3, 2, 1], invariants=[invariants.list_permutation]))
+    annots = [Value(np.arange(3.0), atol=1e-3), Value(2.0, rtol=0.1), Value("abc"), before]
+    annots += [Value(10 ** 400), Value(-10 ** 400, atol=1)]  # integers outside the range of floats
+    ref = ReferenceImplementation("foo", annots)
+    footprint = MemoryFootprint.from_values(*(MemoryFootprintValue(v, i, None) for i, v in \
+        enumerate([np.arange(3.0) + 1e-4, 1, "abc", [1, 2, 3], 2.1, 10 ** 400, 1 - 10 ** 400])))
+
+    expected = ref.run(footprint)
+    assert expected.correct
+
+    # precomputed annotations are pickled with the reference and aren't recompiled when it's run
+    ref = ReferenceImplementation("foo", deepcopy(annots))
+    ref.precompute()
+    loaded = ReferenceImplementation.loads(ref.dumps())
+    with mock.patch("pybryt.annotations.value._CompiledValue") as mocked_compiled:
+        res = loaded.run(footprint)
+        mocked_compiled.assert_not_called()
+
+    assert [(r.satisfied, r.timestamp) for r in res.results] == \
+        [(r.satisfied, r.timestamp) for r in expected.results]
+
+    # the tolerance bounds of arrays are computed when they're needed and aren't pickled, so
+    # precomputing doesn't grow references with large arrays
+    arrs = [np.random.rand(200, 200), np.random.rand(200, 200)]
+    arr_ref = ReferenceImplementation("foo", [Value(arrs[0]), Value(arrs[1], atol=1e-3)])
+    size = len(arr_ref.dumps())
+    arr_ref.precompute()
+    assert len(arr_ref.dumps()) < size * 1.1
+    arr_footprint = MemoryFootprint.from_values(MemoryFootprintValue(arrs[1] + 1e-4, 0, None))
+    res = ReferenceImplementation.loads(arr_ref.dumps()).run(arr_footprint)
+    assert res.to_array().tolist() == [0, 1]
+    compiled = arr_ref.annotations[0]._compiled
+    assert all(b is compiled.value for b in compiled.get_tolerance_bounds())
+
+    # annotations that change after they're precomputed are recompiled
+    loaded.annotations[2].value = "abcd"
+    assert not loaded.run(footprint).results[2].satisfied
+
+
+def test_shared_annotations():
+    """
+    """
+    v1, v2, v3 = Value(1), Value(2), Value(3)
+    annots = [v1, v2, v3, v1.before(v2), v2.before(v3), (v1 & v3) | v2, ~v3]
+    ref = ReferenceImplementation("foo", annots)
+    footprint = MemoryFootprint.from_values(
+        *(MemoryFootprintValue(v, i, None) for i, v in enumerate([2, 1, 3])))
+
+    expected = [a.check(footprint) for a in annots]
+
+    # each annotation is checked once per run, and its result is shared by its parents
+    check = Value.check
+    with mock.patch.object(Value, "check", autospec=True, side_effect=check) as mocked_check:
+        res = ref.run(footprint)
+        assert mocked_check.call_count == 3
+
+    assert [r.satisfied for r in res.results] == [r.satisfied for r in expected] == \
+        [True, True, True, False, True, True, False]
+    assert res.results[3].children[0] is res.results[0]
+    assert res.results[4].children[0] is res.results[3].children[1]
+
+    # results aren't shared between runs
+    assert ref.run(footprint).results[0] is not res.results[0]
+
+
+def test_short_circuit():
+    """
+    """
+    v1, v2, v3, v4 = Value(1), Value(2), Value(3), Value(4)
+    annots = [v1 | v2, v4 & v3, v4.before(v1), Value(5) | Value(6)]
+    footprint = MemoryFootprint.from_values(
+        *(MemoryFootprintValue(v, i, None) for i, v in enumerate([2, 1, 3])))
+    expected = ReferenceImplementation("foo", annots).run(footprint)
+
+    check = Value.check
+    for ref, kwargs in [
+        (ReferenceImplementation("foo", annots), {"short_circuit": True}),
+        (ReferenceImplementation("foo", annots, short_circuit=True), {}),
+    ]:
+        with mock.patch.object(Value, "check", autospec=True, side_effect=check) as mocked_check:
+            res = ref.run(footprint, **kwargs)
+            assert res.to_array().tolist() == expected.to_array().tolist() == [1, 0, 0, 0]
+            assert mocked_check.call_count == 4
+
+            # skipped annotations are checked when their results are accessed
+            assert res.messages == expected.messages
+            assert res.to_dict() == expected.to_dict()
+            assert mocked_check.call_count == 6
+
+    # skipped annotations are pickled as their results
+    res = ReferenceImplementation("foo", annots).run(footprint, short_circuit=True)
+    assert type(res.results[0].children[1]).__name__ == "_LazyAnnotationResult"
+    res2 = dill.loads(dill.dumps(res))
+    assert type(res2.results[0].children[1]) is type(expected.results[0].children[1])
+    assert res2.to_dict() == expected.to_dict()
+
+    # placeholders keep the footprint, but not the values produced by invariants
+    perm = Value([1, 2], invariants=[invariants.list_permutation])
+    res = ReferenceImplementation("foo", [perm | v2]).run(MemoryFootprint.from_values(
+        MemoryFootprintValue([2, 1], 0, None)), short_circuit=True)
+    assert res.results[0].children[1]._context._invariant_values == {}
+    assert not res.results[0].children[1].satisfied
+
+    # the reference's setting can be overridden for a run
+    ref = ReferenceImplementation("foo", annots, short_circuit=True)
+    with mock.patch.object(Value, "check", autospec=True, side_effect=check) as mocked_check:
+        ref.run(footprint, short_circuit=False)
+        assert mocked_check.call_count == 6
+
+
+def test_parallel_run():
+    """
+    """
+    v1, v2, v3, v4 = Value(1), Value(2), Value(3), Value(4)
+    annots = [v1 | v2, v4 & v3, v4.before(v1), Value(5) | Value(6), v1, v2]
+    ref = ReferenceImplementation("foo", annots)
+    footprint = MemoryFootprint.from_values(
+        *(MemoryFootprintValue(v, i, None) for i, v in enumerate([2, 1, 3])))
+    expected = ref.run(footprint)
+
+    for workers in [2, 10]:
+        res = ref.run(footprint, workers=workers)
+        assert res.to_dict() == expected.to_dict()
+
+        # results are for the annotations in the reference, not copies of them
+        assert all(r.annotation is a for r, a in zip(res.results, annots))
+        assert res.results[0].children[0].annotation is v1
+
+    # skipped annotations are checked on demand
+    res = ref.run(footprint, short_circuit=True, workers=3)
+    lazy = res.results[0].children[1]
+    assert type(lazy).__name__ == "_LazyAnnotationResult" and lazy.annotation is v2
+    assert res.to_dict() == expected.to_dict()
+
+    # workers don't rely on inheriting the reference and footprint from a forked process
+    spawn = multiprocessing.get_context("spawn")
+    with mock.patch("pybryt.reference.mp.get_context", return_value=spawn):
+        res = ref.run(footprint, short_circuit=True, workers=2)
+        assert res.to_dict() == expected.to_dict()
+        assert res.results[4].annotation is v1
+
+        # references are pickled with dill, so their annotations can have lambda equivalence_fns
+        equiv_annots = [Value(i, equivalence_fn=lambda a, b: a == b) for i in range(1, 5)]
+        equiv_ref = ReferenceImplementation("foo", equiv_annots)
+        res = equiv_ref.run(footprint, workers=2)
+        assert res.to_array().tolist() == [1, 1, 1, 0]
+        assert all(r.annotation is a for r, a in zip(res.results, equiv_annots))
+
+    # references with a single annotation are run in this process
+    with mock.patch("pybryt.reference.mp") as mocked_mp:
+        ReferenceImplementation("foo", annots[:1]).run(footprint, workers=4)
+        mocked_mp.get_context.assert_not_called()
+
+
+def test_run_many():
+    """
+    """
+    v1, v2, v3 = Value(1), Value(2), Value(3)
+    annots = [v1, v2.before(v3), v1 | v2]
+    ref = ReferenceImplementation("foo", annots)
+    footprints = [
+        MemoryFootprint.from_values(*(MemoryFootprintValue(v, i, None) for i, v in enumerate(vals)))
+        for vals in [[1, 2, 3], [3, 2], [2], []]
+    ]
+    expected = [ref.run(fp) for fp in footprints]
+
+    with tempfile.NamedTemporaryFile(suffix=".pkl") as ntf:
+        StudentImplementation.from_footprint(footprints[2]).dump(ntf.name)
+        cohort = [footprints[0], StudentImplementation.from_footprint(footprints[1]), ntf.name,
+            footprints[3]]
+
+        for workers in [None, 2]:
+            completed = []
+            matrix, results = ref.run_many(
+                cohort, workers=workers, short_circuit=True,
+                callback=lambda i, res: completed.append((i, res)))
+
+            assert matrix.tolist() == [[1, 1, 1], [0, 0, 1], [0, 0, 1], [0, 0, 0]]
+            assert [r.to_dict() for r in results] == [r.to_dict() for r in expected]
+            assert all(r.reference is ref for r in results)
+            assert results[2].results[1].children[0].annotation is v2
+            assert sorted(completed, key=lambda t: t[0]) == list(enumerate(results))
+
+        # workers that aren't forked receive the reference and footprints pickled with dill
+        equiv_ref = ReferenceImplementation(
+            "foo", [Value(i, equivalence_fn=lambda a, b: a == b) for i in range(1, 4)])
+        spawn = multiprocessing.get_context("spawn")
+        with mock.patch("pybryt.reference.mp.get_context", return_value=spawn):
+            matrix, _ = equiv_ref.run_many(cohort + [MemoryFootprint.from_values(
+                MemoryFootprintValue(lambda: 1, 0, None), MemoryFootprintValue(1, 1, None))],
+                workers=2)
+        assert matrix.tolist() == [[1, 1, 1], [0, 1, 1], [0, 1, 0], [0, 0, 0], [1, 0, 0]]
+
+    # the results of skipped annotations don't keep the footprints alive
+    footprint = MemoryFootprint.from_values(MemoryFootprintValue(1, 0, None))
+    footprint_ref = weakref.ref(footprint)
+    _, results = ref.run_many([footprint], short_circuit=True)
+    del footprint
+    gc.collect()
+    assert footprint_ref() is None
+    assert results[0].results[2].children[1].annotation is v2
+    assert not results[0].results[2].children[1].satisfied
+
+    matrix, results = ref.run_many([])
+    assert matrix.shape == (0, 3) and results == []
+
+    with pytest.raises(TypeError, match="run_many cannot take values of type <class 'int'>"):
+        ref.run_many([footprints[0], 1])
+
+
 def test_generate_report():
     """
     """
@@ -12,8 +12,10 @@ from textwrap import dedent
 from unittest import mock
 
 from pybryt import (
-    check, generate_student_impls, ReferenceImplementation, ReferenceResult, StudentImplementation)
+    check, generate_student_impls, ReferenceImplementation, ReferenceResult, StudentImplementation,
+    Value)
 from pybryt.execution.memory_footprint import MemoryFootprint
+from pybryt.utils import get_type_name
 
 from .test_reference import generate_reference_notebook
 
@@ -103,6 +105,45 @@ def test_load_and_dump():
     assert len(stu.footprint) == len(stu2.footprint)
     assert stu.footprint.num_steps == stu2.footprint.num_steps
 
+    # test out-of-band serialization
+    with tempfile.NamedTemporaryFile() as ntf:
+        stu.dump(ntf.name, out_of_band=True)
+        for map_buffers in [True, False]:
+            stu2 = StudentImplementation.load(ntf.name, map_buffers=map_buffers)
+            assert stu2.footprint == stu.footprint
+
+    stu2 = StudentImplementation.loads(stu.dumps(out_of_band=True))
+    assert stu2.footprint == stu.footprint
+
+    # test lazy containers
+    with tempfile.NamedTemporaryFile() as ntf:
+        stu.dump(ntf.name, lazy=True)
+        stu2 = StudentImplementation.load(ntf.name)
+        assert stu2.footprint.num_unloaded == len(stu.footprint)
+        assert stu2.footprint.get_type_name(0) == get_type_name(type(stu.footprint.get_value(0).value))
+        assert stu2.footprint.num_unloaded == len(stu.footprint)
+
+        # combining implementations doesn't load their values
+        comb = StudentImplementation.combine([stu2, stu2])
+        assert comb.footprint.num_unloaded == len(stu.footprint)
+
+        assert stu2.footprint.get_value(0) == stu.footprint.get_value(0)
+        assert stu2.footprint.num_unloaded == len(stu.footprint) - 1
+        assert stu2.footprint == stu.footprint
+        assert stu2.errors == stu.errors
+
+        # pickling lazy values pickles the values they load
+        stu3 = StudentImplementation.loads(comb.dumps())
+        assert stu3.footprint.num_unloaded == 0
+        assert stu3.footprint.get_value(-1) == stu.footprint.get_value(-1)
+
+        # lazy containers can be dumped to the file they were loaded from
+        for lazy in [True, False]:
+            stu4 = StudentImplementation.load(ntf.name)
+            stu4.dump(ntf.name, lazy=lazy)
+            assert stu4.footprint == stu.footprint
+            assert StudentImplementation.load(ntf.name).footprint == stu.footprint
+
 
 def test_check():
     """
@@ -204,6 +245,18 @@ def test_check_cm(capsys):
 
                 mocked_ff.return_value.check.assert_called_with([ref], group=run_group)
 
+        # check capture filters and online checkers passed to the tracer
+        with mock.patch.object(StudentImplementation, "from_footprint"), \
+                mock.patch("pybryt.student.FrameTracer") as mocked_frame_tracer, \
+                mock.patch("pybryt.student.generate_report"):
+            value_ref = ReferenceImplementation("foo", [Value(1)])
+            with check(value_ref, filter_values=True, stop_early=True, cache=False):
+                pass
+
+            kwargs = mocked_frame_tracer.return_value.start_trace.call_args.kwargs
+            assert kwargs["capture_filter"] == value_ref.get_capture_filter()
+            assert kwargs["online_checker"].annotations == value_ref.annotations
+
     # check caching
     with mock.patch("pybryt.student.FrameTracer") as mocked_frame_tracer:
         with mock.patch("pybryt.student.StudentImplementation") as mocked_stu, \
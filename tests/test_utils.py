@@ -1,5 +1,8 @@
 """"""
 
+import dill
+import numpy as np
+import pandas as pd
 import pytest
 import random
 import tempfile
@@ -25,6 +28,189 @@ def test_filter_pickleable_list():
         assert len(l) == 0
 
 
+def test_pickle_object():
+    """
+    Tests for ``pybryt.utils.pickle_object``.
+    """
+    class Foo:
+        pass
+
+    foo = Foo()
+    foo.gen = (i for i in range(3))
+
+    with mock.patch("pybryt.utils._UNPICKLEABLE_TYPES", set()) as unpickleable_types:
+        assert pickle_object(1) == dill.dumps(1)
+
+        # types that can't be reduced are remembered
+        with pytest.raises(UnpickleableError):
+            pickle_object((i for i in range(3)))
+        with pytest.raises(UnpickleableError):
+            fingerprint([foo])
+        assert unpickleable_types == {type(foo.gen)}
+
+        with mock.patch("dill.dumps") as mocked_dill:
+            with pytest.raises(UnpickleableError):
+                pickle_object((i for i in range(3)))
+            mocked_dill.assert_not_called()
+
+            # objects that contain unpickleable values are still pickled each time
+            mocked_dill.side_effect = Exception()
+            with pytest.raises(UnpickleableError):
+                pickle_object(foo)
+            mocked_dill.assert_called_once()
+
+
+def test_out_of_band_serialization(tmp_path):
+    """
+    Tests for ``pybryt.utils.dumps_out_of_band`` and related functions.
+    """
+    obj = {
+        "arr": np.arange(100, dtype=float),
+        "fortran": np.asfortranarray(np.arange(12).reshape(3, 4)),
+        "strided": np.arange(10)[::2],
+        "objects": np.array([1, "a"], dtype=object),
+        "df": pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}),
+        "fn": lambda x: x + 1,
+    }
+
+    def check(loaded):
+        assert np.array_equal(loaded["arr"], obj["arr"])
+        assert np.array_equal(loaded["fortran"], obj["fortran"])
+        assert loaded["fortran"].flags.f_contiguous
+        assert np.array_equal(loaded["strided"], obj["strided"])
+        assert list(loaded["objects"]) == [1, "a"]
+        assert loaded["df"].equals(obj["df"])
+        assert loaded["fn"](1) == 2
+
+    data = dumps_out_of_band(obj)
+    assert data.startswith(OUT_OF_BAND_MAGIC)
+    # the array buffers are stored out-of-band at aligned offsets
+    assert obj["arr"].tobytes() in data
+    assert data.index(obj["arr"].tobytes()) % OUT_OF_BAND_ALIGNMENT == 0
+    check(loads_out_of_band(data))
+    assert not loads_out_of_band(data)["arr"].flags.writeable
+    assert loads_out_of_band(bytearray(data))["arr"].flags.writeable
+
+    path = tmp_path / "obj.pkl"
+    with open(path, "wb") as f:
+        dump_out_of_band(obj, f)
+
+    for map_buffers in [True, False]:
+        loaded = load_out_of_band(str(path), map_buffers=map_buffers)
+        check(loaded)
+
+        # mapped buffers are copy-on-write
+        loaded["arr"][0] = -1
+        assert load_out_of_band(str(path))["arr"][0] == 0
+
+    # in-band pickles are also loaded
+    assert loads_out_of_band(dill.dumps([1, 2])) == [1, 2]
+    with open(path, "wb") as f:
+        dill.dump([1, 2], f)
+    assert load_out_of_band(str(path)) == [1, 2]
+
+
+def test_out_of_band_redump(tmp_path):
+    """
+    Tests that objects loaded with their buffers mapped into memory can be dumped to the file they
+    were loaded from.
+    """
+    from pybryt import ReferenceImplementation, Value
+
+    ref = ReferenceImplementation("foo", [Value(np.arange(1000, dtype=float))])
+    path = str(tmp_path / "ref.pkl")
+    ref.dump(path, out_of_band=True)
+
+    for out_of_band in [True, False]:
+        loaded = ReferenceImplementation.load(path)
+        loaded.dump(path, out_of_band=out_of_band)
+        assert ReferenceImplementation.load(path) == ref
+        assert loaded == ref
+
+    # no temporary files are left behind, even if pickling fails
+    with mock.patch("pybryt.utils.dill.dump", side_effect=ValueError()):
+        with pytest.raises(ValueError):
+            ref.dump(path)
+
+    assert ReferenceImplementation.load(path) == ref
+    assert [p.name for p in tmp_path.iterdir()] == ["ref.pkl"]
+
+
+def test_lazy_container(tmp_path):
+    """
+    Tests for ``pybryt.utils.dump_lazy`` and ``pybryt.utils.load_lazy``.
+    """
+    from pybryt.execution import MemoryFootprint
+
+    footprint = MemoryFootprint()
+    footprint.add_value(np.arange(100), 1)
+    footprint.add_value("a", 2)
+    obj = {"footprint": footprint, "other": [1, 2, 3]}
+
+    path = tmp_path / "obj.pkl"
+    with open(path, "wb+") as f:
+        dump_lazy(obj, f)
+
+    assert is_lazy_container(str(path))
+    loaded = load_lazy(str(path))
+    assert loaded["other"] == [1, 2, 3]
+    assert all(type(v) is LazyValue for v in loaded["footprint"].objects)
+    assert [v.type_name for v in loaded["footprint"].objects] == ["numpy.ndarray", "builtins.str"]
+    assert loaded["footprint"] == footprint
+
+    with open(path, "wb+") as f:
+        dill.dump(obj, f)
+
+    assert not is_lazy_container(str(path))
+    with pytest.raises(ValueError, match="is not a lazy container"):
+        load_lazy(str(path))
+
+
+def test_fingerprint():
+    """
+    Tests for ``pybryt.utils.fingerprint``.
+    """
+    arr = np.arange(12, dtype=float).reshape(3, 4)
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    values = [
+        1, 1.0, True, None, 1 + 0j, "1", b"1", [1], (1,), {1}, {1: 1}, np.int64(1), np.float64(1),
+        arr, arr.astype(int), arr.reshape(4, 3), df, df.rename(columns={"a": "c"}), df["a"],
+        pd.Series([1, 2, 3]), [1, "1"], ["1", 1], {"a": 1, "b": 2}, {"b": 2, "a": 1},
+    ]
+
+    fingerprints = [fingerprint(v) for v in values]
+    assert all(isinstance(f, bytes) and len(f) == FINGERPRINT_SIZE for f in fingerprints)
+    assert len(set(fingerprints)) == len(values)
+
+    # check that equal values have equal fingerprints
+    assert fingerprint(arr) == fingerprint(arr.copy(order="F"))
+    assert fingerprint(arr.T) == fingerprint(np.ascontiguousarray(arr.T))
+    assert fingerprint(df) == fingerprint(df.copy())
+    assert fingerprint({1, 2, 3, "a"}) == fingerprint({"a", 3, 2, 1})
+    assert fingerprint([[1, 2], {"a": (3, 4.5)}]) == fingerprint([[1, 2], {"a": (3, 4.5)}])
+    assert fingerprint(np.array([[1, "a"]], dtype=object)) == \
+        fingerprint(np.array([[1, "a"]], dtype=object))
+
+    # check that self-referential containers are pickled
+    l = [1, 2]
+    l.append(l)
+    assert fingerprint(l) == fingerprint(l)
+
+    # check that other objects are pickled with dill
+    with mock.patch("dill.dumps") as mocked_dill:
+        mocked_dill.return_value = b"foo"
+        fingerprint(1)
+        fingerprint([1, "a", np.arange(3)])
+        mocked_dill.assert_not_called()
+
+        fingerprint([1, ValueError()])
+        mocked_dill.assert_called_once()
+
+        mocked_dill.side_effect = Exception()
+        with pytest.raises(UnpickleableError):
+            fingerprint([1, ValueError()])
+
+
 def test_notebook_to_string():
     """
     """